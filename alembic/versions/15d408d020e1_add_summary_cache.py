@@ -0,0 +1,46 @@
+"""add summary cache
+
+Revision ID: 15d408d020e1
+Revises: 3c31a05a49ec
+Create Date: 2026-10-18 19:16:57.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15d408d020e1'
+down_revision: Union[str, None] = '3c31a05a49ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'summary_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(length=64), nullable=True),
+        sa.Column('text_hash', sa.String(length=64), nullable=True),
+        sa.Column('model', sa.String(length=100), nullable=True),
+        sa.Column('summary_type', sa.String(length=50), nullable=True),
+        sa.Column('max_length', sa.Integer(), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('key_points', sa.JSON(), nullable=True),
+        sa.Column('topics', sa.JSON(), nullable=True),
+        sa.Column('sentiment', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_summary_cache_id'), 'summary_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_summary_cache_cache_key'), 'summary_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_summary_cache_text_hash'), 'summary_cache', ['text_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_summary_cache_text_hash'), table_name='summary_cache')
+    op.drop_index(op.f('ix_summary_cache_cache_key'), table_name='summary_cache')
+    op.drop_index(op.f('ix_summary_cache_id'), table_name='summary_cache')
+    op.drop_table('summary_cache')
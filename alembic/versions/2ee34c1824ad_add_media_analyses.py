@@ -0,0 +1,39 @@
+"""add media analyses
+
+Revision ID: 2ee34c1824ad
+Revises: 9ac76acc3ed7
+Create Date: 2026-10-18 19:08:15.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ee34c1824ad'
+down_revision: Union[str, None] = '9ac76acc3ed7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_analyses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=80), nullable=True),
+        sa.Column('language', sa.String(length=10), nullable=True),
+        sa.Column('language_probability', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_media_analyses_id'), 'media_analyses', ['id'], unique=False)
+    op.create_index(op.f('ix_media_analyses_content_hash'), 'media_analyses', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_media_analyses_content_hash'), table_name='media_analyses')
+    op.drop_index(op.f('ix_media_analyses_id'), table_name='media_analyses')
+    op.drop_table('media_analyses')
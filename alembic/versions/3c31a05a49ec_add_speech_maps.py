@@ -0,0 +1,34 @@
+"""add speech maps
+
+Revision ID: 3c31a05a49ec
+Revises: ffaf45c9bf9e
+Create Date: 2026-10-18 19:14:28.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c31a05a49ec'
+down_revision: Union[str, None] = 'ffaf45c9bf9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media_analyses', sa.Column('duration', sa.Float(), nullable=True))
+    op.add_column('media_analyses', sa.Column('speech_seconds', sa.Float(), nullable=True))
+    op.add_column('media_analyses', sa.Column('speech_map', sa.LargeBinary(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('speech_duration', sa.Float(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('processing_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_tasks', 'processing_seconds')
+    op.drop_column('transcription_tasks', 'speech_duration')
+    op.drop_column('media_analyses', 'speech_map')
+    op.drop_column('media_analyses', 'speech_seconds')
+    op.drop_column('media_analyses', 'duration')
@@ -0,0 +1,26 @@
+"""add transcription checkpoint
+
+Revision ID: 6dc6bb7a9215
+Revises: b3c48b50de05
+Create Date: 2026-10-18 18:56:14.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6dc6bb7a9215'
+down_revision: Union[str, None] = 'b3c48b50de05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('checkpoint_time', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_tasks', 'checkpoint_time')
@@ -0,0 +1,40 @@
+"""add transcription task queue
+
+Revision ID: 7f08de687488
+Revises: de87e2d2c255
+Create Date: 2026-10-18 18:52:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f08de687488'
+down_revision: Union[str, None] = 'de87e2d2c255'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('video_path', sa.String(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('language', sa.String(length=10), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('model', sa.String(length=50), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('attempts', sa.Integer(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('worker_id', sa.String(length=100), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_transcription_tasks_queue', 'transcription_tasks', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcription_tasks_queue', table_name='transcription_tasks')
+    op.drop_column('transcription_tasks', 'heartbeat_at')
+    op.drop_column('transcription_tasks', 'lease_expires_at')
+    op.drop_column('transcription_tasks', 'worker_id')
+    op.drop_column('transcription_tasks', 'attempts')
+    op.drop_column('transcription_tasks', 'model')
+    op.drop_column('transcription_tasks', 'language')
+    op.drop_column('transcription_tasks', 'video_path')
@@ -0,0 +1,27 @@
+"""add task segment count
+
+Revision ID: 9ac76acc3ed7
+Revises: e9b3ea8b1f54
+Create Date: 2026-10-18 19:04:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9ac76acc3ed7'
+down_revision: Union[str, None] = 'e9b3ea8b1f54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有任务保持 NULL，状态接口此时按实际片段数计算
+    op.add_column('transcription_tasks', sa.Column('segment_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_tasks', 'segment_count')
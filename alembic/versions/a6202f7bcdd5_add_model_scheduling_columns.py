@@ -0,0 +1,30 @@
+"""add model scheduling columns
+
+Revision ID: a6202f7bcdd5
+Revises: 6dc6bb7a9215
+Create Date: 2026-10-18 18:57:48.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6202f7bcdd5'
+down_revision: Union[str, None] = '6dc6bb7a9215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('requested_model', sa.String(length=50), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('schedule_reason', sa.String(), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('duration', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_tasks', 'duration')
+    op.drop_column('transcription_tasks', 'schedule_reason')
+    op.drop_column('transcription_tasks', 'requested_model')
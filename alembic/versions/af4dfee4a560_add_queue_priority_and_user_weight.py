@@ -0,0 +1,35 @@
+"""add queue priority and user weight
+
+Revision ID: af4dfee4a560
+Revises: a6202f7bcdd5
+Create Date: 2026-10-18 18:59:28.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af4dfee4a560'
+down_revision: Union[str, None] = 'a6202f7bcdd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('priority', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('queue_weight', sa.Float(), nullable=True))
+    # 已有的任务按普通优先级、用户按默认权重参与调度
+    op.execute("UPDATE transcription_tasks SET priority = 1")
+    op.execute("UPDATE users SET queue_weight = 1.0")
+    op.drop_index('ix_transcription_tasks_queue', table_name='transcription_tasks')
+    op.create_index('ix_transcription_tasks_queue', 'transcription_tasks', ['status', 'priority', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcription_tasks_queue', table_name='transcription_tasks')
+    op.create_index('ix_transcription_tasks_queue', 'transcription_tasks', ['status', 'created_at'], unique=False)
+    op.drop_column('users', 'queue_weight')
+    op.drop_column('transcription_tasks', 'priority')
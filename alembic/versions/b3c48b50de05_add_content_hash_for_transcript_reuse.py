@@ -0,0 +1,36 @@
+"""add content hash for transcript reuse
+
+Revision ID: b3c48b50de05
+Revises: 7f08de687488
+Create Date: 2026-10-18 18:55:39.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c48b50de05'
+down_revision: Union[str, None] = '7f08de687488'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('content_hash', sa.String(length=80), nullable=True))
+    op.add_column('video_transcripts', sa.Column('title', sa.String(), nullable=True))
+    op.add_column('video_transcripts', sa.Column('labels', sa.JSON(), nullable=True))
+    op.add_column('video_transcripts', sa.Column('model', sa.String(length=50), nullable=True))
+    op.add_column('video_transcripts', sa.Column('content_hash', sa.String(length=80), nullable=True))
+    op.create_index(op.f('ix_video_transcripts_content_hash'), 'video_transcripts', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_video_transcripts_content_hash'), table_name='video_transcripts')
+    op.drop_column('video_transcripts', 'content_hash')
+    op.drop_column('video_transcripts', 'model')
+    op.drop_column('video_transcripts', 'labels')
+    op.drop_column('video_transcripts', 'title')
+    op.drop_column('transcription_tasks', 'content_hash')
@@ -0,0 +1,131 @@
+"""initial schema
+
+Revision ID: de87e2d2c255
+Revises:
+Create Date: 2026-10-18 18:52:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'de87e2d2c255'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_superuser', sa.Boolean(), nullable=True),
+        sa.Column('settings', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_index(op.f('ix_users_phone'), 'users', ['phone'], unique=True)
+
+    op.create_table(
+        'video_sources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('path', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path')
+    )
+    op.create_index(op.f('ix_video_sources_id'), 'video_sources', ['id'], unique=False)
+    op.create_index(op.f('ix_video_sources_name'), 'video_sources', ['name'], unique=False)
+
+    op.create_table(
+        'video_transcripts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=True),
+        sa.Column('video_path', sa.String(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('segments', sa.JSON(), nullable=True),
+        sa.Column('language', sa.String(length=10), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['source_id'], ['video_sources.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_video_transcripts_id'), 'video_transcripts', ['id'], unique=False)
+    op.create_index(op.f('ix_video_transcripts_video_path'), 'video_transcripts', ['video_path'], unique=False)
+
+    op.create_table(
+        'transcription_tasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('segments', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['source_id'], ['video_sources.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transcription_tasks_id'), 'transcription_tasks', ['id'], unique=False)
+
+    op.create_table(
+        'video_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transcript_id', sa.Integer(), nullable=True),
+        sa.Column('source_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('summary_type', sa.Enum('GENERAL', 'DETAILED', 'BULLET_POINTS', name='summarytype'), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('key_points', sa.JSON(), nullable=True),
+        sa.Column('topics', sa.JSON(), nullable=True),
+        sa.Column('sentiment', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['source_id'], ['video_sources.id']),
+        sa.ForeignKeyConstraint(['transcript_id'], ['video_transcripts.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_video_summaries_id'), 'video_summaries', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_video_summaries_id'), table_name='video_summaries')
+    op.drop_table('video_summaries')
+    op.drop_index(op.f('ix_transcription_tasks_id'), table_name='transcription_tasks')
+    op.drop_table('transcription_tasks')
+    op.drop_index(op.f('ix_video_transcripts_video_path'), table_name='video_transcripts')
+    op.drop_index(op.f('ix_video_transcripts_id'), table_name='video_transcripts')
+    op.drop_table('video_transcripts')
+    op.drop_index(op.f('ix_video_sources_name'), table_name='video_sources')
+    op.drop_index(op.f('ix_video_sources_id'), table_name='video_sources')
+    op.drop_table('video_sources')
+    op.drop_index(op.f('ix_users_phone'), table_name='users')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
+    sa.Enum(name='summarytype').drop(op.get_bind(), checkfirst=True)
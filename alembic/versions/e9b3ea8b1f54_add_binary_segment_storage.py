@@ -0,0 +1,54 @@
+"""add binary segment storage
+
+Revision ID: e9b3ea8b1f54
+Revises: af4dfee4a560
+Create Date: 2026-10-18 19:03:09.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b3ea8b1f54'
+down_revision: Union[str, None] = 'af4dfee4a560'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 旧的 text / segments 列保留，已有数据仍按旧格式读取
+    op.add_column('video_transcripts', sa.Column('segments_blob', sa.LargeBinary(), nullable=True))
+    with op.batch_alter_table('transcription_tasks') as batch_op:
+        batch_op.add_column(sa.Column('segments_blob', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('transcript_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'transcription_tasks_transcript_id_fkey', 'video_transcripts',
+            ['transcript_id'], ['id'], ondelete='SET NULL'
+        )
+    op.create_table(
+        'transcription_segment_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('start_index', sa.Integer(), nullable=False),
+        sa.Column('end_index', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['transcription_tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_transcription_segment_batches_task', 'transcription_segment_batches',
+        ['task_id', 'start_index'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcription_segment_batches_task', table_name='transcription_segment_batches')
+    op.drop_table('transcription_segment_batches')
+    with op.batch_alter_table('transcription_tasks') as batch_op:
+        batch_op.drop_constraint('transcription_tasks_transcript_id_fkey', type_='foreignkey')
+        batch_op.drop_column('transcript_id')
+        batch_op.drop_column('segments_blob')
+    op.drop_column('video_transcripts', 'segments_blob')
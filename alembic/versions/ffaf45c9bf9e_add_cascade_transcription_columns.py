@@ -0,0 +1,30 @@
+"""add cascade transcription columns
+
+Revision ID: ffaf45c9bf9e
+Revises: 2ee34c1824ad
+Create Date: 2026-10-18 19:11:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffaf45c9bf9e'
+down_revision: Union[str, None] = '2ee34c1824ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transcription_tasks', sa.Column('cascade_model', sa.String(length=50), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('mode', sa.String(length=20), nullable=True))
+    op.add_column('transcription_tasks', sa.Column('segments_revision', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_tasks', 'segments_revision')
+    op.drop_column('transcription_tasks', 'mode')
+    op.drop_column('transcription_tasks', 'cascade_model')
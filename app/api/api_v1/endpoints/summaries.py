@@ -4,11 +4,11 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.summary import VideoSummary, SummaryType
 from app.models.video_source import VideoTranscript
-from app.services.summary import SummaryService
+from app.services.summary import new_summary
+from app.services import summary_jobs
 from app.schemas.summary import SummaryCreate, SummaryResponse
 
 router = APIRouter()
-summary_service = SummaryService()
 
 @router.post("/{transcript_id}", response_model=SummaryResponse)
 async def create_summary(
@@ -17,7 +17,7 @@ async def create_summary(
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ):
-    """生成视频摘要"""
+    """提交视频摘要任务，立即返回摘要记录（status 为 pending）"""
     # 检查转录记录是否存在
     transcript = db.query(VideoTranscript).filter(
         VideoTranscript.id == transcript_id
@@ -29,30 +29,38 @@ async def create_summary(
             detail="Transcript not found"
         )
 
-    # 检查是否已存在摘要
+    # 检查是否已存在摘要，失败的摘要重新排队
     existing_summary = db.query(VideoSummary).filter(
         VideoSummary.transcript_id == transcript_id,
         VideoSummary.summary_type == summary_type
     ).first()
 
-    if existing_summary:
+    if existing_summary and existing_summary.status != "error":
         return existing_summary
 
-    try:
-        summary = await summary_service.generate_summary(
-            text=transcript.text,
-            transcript_id=transcript_id,
-            source_id=transcript.source_id,
-            user_id=current_user.id,
-            summary_type=summary_type,
-            db=db
-        )
-        return summary
-    except Exception as e:
+    # 摘要在后台线程中生成，这里立即返回排队中的记录，
+    # 之后通过 /summaries/status/{id} 轮询或订阅 /videos/events 获取结果
+    summary = existing_summary or new_summary(transcript, current_user.id, summary_type)
+    return summary_jobs.enqueue(db, summary)
+
+@router.get("/status/{summary_id}", response_model=SummaryResponse)
+def get_summary_status(
+    summary_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """获取摘要任务的状态和结果"""
+    summary = db.query(VideoSummary).filter(
+        VideoSummary.id == summary_id,
+        VideoSummary.user_id == current_user.id
+    ).first()
+
+    if not summary:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Summary not found"
         )
+    return summary
 
 @router.get("/{transcript_id}", response_model=List[SummaryResponse])
 def get_summaries(
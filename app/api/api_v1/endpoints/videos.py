@@ -1,10 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Header
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Header, Query, Request, Response
+from sqlalchemy.orm import Session, defer
+import hashlib
 import os
 import json
 from pathlib import Path
-import cv2
 import base64
 import numpy as np
 from datetime import datetime, timedelta
@@ -16,11 +16,32 @@ import os.path
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import time
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi import FastAPI
-from app.services.transcription import TranscriptionService, transcribe_video_task
+from app.services.transcription import (
+    find_reusable_transcript,
+    reuse_transcript,
+    save_transcript
+)
+from app.services.fingerprint import content_fingerprint
+from app.services.audio_cache import probe_duration
+from app.services.scheduler import (
+    historical_rtf,
+    queue_position,
+    remaining_seconds,
+    route_model,
+    schedule_model
+)
+from app.services.speech_map import cached_analysis, is_silent
+from app.services.language_detection import cached_language
+from app.services.cascade import CASCADE_MODEL
+from app.services.model_registry import model_registry
+from app.services import job_queue
+from app.services.events import event_broker
 from app.core.config import settings
 from app.schemas.transcription import (
+    TranscriptionRefineRequest,
     TranscriptionRequest,
     TranscriptionResponse,
     TranscriptionStatus
@@ -42,8 +63,6 @@ thread_pool = ThreadPoolExecutor(max_workers=2)
 # 创建一个视频文件服务实例
 video_files = StaticFiles(directory=None)
 
-transcription_service = TranscriptionService()
-
 def get_thumbnail_root(source_path: str) -> Path:
     """获取缩略图根目录（隐藏文件夹）"""
     source_dir = Path(source_path)
@@ -94,6 +113,8 @@ def clean_orphaned_thumbnails(base_path: str) -> None:
 
 def generate_thumbnail(file_path: str, thumbnail_path: str) -> None:
     """在后台生成视频缩略图"""
+    # cv2 导入较慢，只在生成缩略图时导入
+    import cv2
     try:
         # 如果视频文件不存在，不生成缩略图
         if not os.path.exists(file_path):
@@ -197,6 +218,8 @@ def get_video_info(file_path: str, source_path: str, background_tasks: Backgroun
                 thumbnail_data = base64.b64encode(f.read()).decode('utf-8')
                 return None, f"data:image/jpeg;base64,{thumbnail_data}"
         
+        import cv2
+
         # 尝试不同的方式打开视频
         cap = None
         methods = [
@@ -549,7 +572,6 @@ async def get_related_videos(
 @router.post("/transcript", response_model=schemas.TranscriptionResponse)
 async def create_transcript(
     request: schemas.TranscriptionRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
@@ -571,27 +593,25 @@ async def create_transcript(
         if not video_path.exists():
             raise HTTPException(status_code=404, detail="视频文件不存在")
 
-        # 创建转录任务
+        # 读取时长需要启动 ffprobe，放到线程池中，不阻塞事件循环
+        duration = await run_in_threadpool(probe_duration, str(video_path))
+
+        # 创建转录任务，由独立的 worker 进程领取执行
         task = models.TranscriptionTask(
-            video_path=str(video_path),
+            source_id=source.id,
+            video_path=request.relativePath,
             user_id=current_user.id,
-            status="pending"
-        )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
-
-        # 在后台开始转录任务
-        background_tasks.add_task(
-            transcription_service.process_video,
-            str(video_path),
-            task.id,
-            db
+            language=request.language,
+            model=request.model,
+            priority=job_queue.PRIORITY_CLASSES.get(request.priority, job_queue.DEFAULT_PRIORITY),
+            duration=duration
         )
+        schedule_model(db, task)
+        task = job_queue.enqueue(db, task)
 
         return {
             "taskId": task.id,
-            "status": "processing",
+            "status": task.status,
             "message": "转录任务已创建"
         }
 
@@ -599,16 +619,36 @@ async def create_transcript(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+def _status_etag(task: TranscriptionTask, segment_count: int, queue_pos: Optional[int]) -> str:
+    """由客户端可见的状态字段生成 ETag，心跳等内部字段变化不影响"""
+    raw = (
+        f"{task.id}:{task.status}:{task.progress}:{segment_count}:"
+        f"{task.segments_revision}:{task.model}:{queue_pos}"
+    )
+    return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+
 @router.get("/transcript/{task_id}", response_model=schemas.TranscriptionStatus)
 async def get_transcript_status(
     task_id: int,
+    response: Response,
+    since_segment: Optional[int] = Query(None, ge=0, description="只返回该序号及之后的片段"),
+    revision: Optional[int] = Query(None, description="客户端已有片段的版本"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
     """
     获取转录任务状态
+
+    传入 since_segment 时只返回新增片段且不返回全文；带上 If-None-Match 且状态未变化时返回 304。
+    片段被整体替换后 revision 与客户端不一致，此时从第一个片段开始返回。
     """
-    task = db.query(models.TranscriptionTask).filter(
+    # 片段和全文较大，只有确实需要返回时才加载
+    task = db.query(models.TranscriptionTask).options(
+        defer(models.TranscriptionTask.segments_blob),
+        defer(models.TranscriptionTask.legacy_segments),
+        defer(models.TranscriptionTask.legacy_text)
+    ).filter(
         models.TranscriptionTask.id == task_id,
         models.TranscriptionTask.user_id == current_user.id
     ).first()
@@ -616,19 +656,115 @@ async def get_transcript_status(
     if not task:
         raise HTTPException(status_code=404, detail="转录任务不存在")
 
+    # 排队中的任务返回排队位置和预计开始时间，未完成的任务按历史实时率估算完成时间
+    queue_pos, estimated_start, estimated_finish = None, None, None
+    if task.status in ("pending", "processing"):
+        remaining = remaining_seconds(task, historical_rtf(db))
+        if task.status == "pending":
+            queue_pos, wait = queue_position(db, task)
+            estimated_start = datetime.utcnow() + timedelta(seconds=wait)
+            remaining += wait
+        estimated_finish = datetime.utcnow() + timedelta(seconds=remaining)
+
+    # 旧数据没有记录片段数时现场统计
+    segment_count = task.segment_count
+    if segment_count is None:
+        segment_count = len(task.segments)
+
+    current_revision = task.segments_revision or 0
+    if since_segment and revision is not None and revision != current_revision:
+        since_segment = 0
+
+    etag = _status_etag(task, segment_count, queue_pos)
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    # 处理中也返回已写入的部分片段
+    partial = task.status in ("processing", "success")
+    if not partial:
+        text, segments = None, []
+    elif since_segment is None:
+        text, segments = task.text, task.segments
+    else:
+        text = None
+        segments = task.segments_from(since_segment) if since_segment < segment_count else []
+
     return {
         "taskId": task.id,
         "status": task.status,
-        "text": task.text if task.status == "success" else None,
-        "segments": task.segments if task.status == "success" else [],
+        "text": text,
+        "segments": segments,
+        "sinceSegment": since_segment or 0,
+        "segmentCount": segment_count,
+        "revision": current_revision,
         "error": task.error if task.status == "error" else None,
-        "progress": task.progress
-    } 
+        "progress": task.progress,
+        "model": task.model,
+        "scheduleReason": task.schedule_reason,
+        "queuePosition": queue_pos,
+        "estimatedStart": estimated_start,
+        "estimatedFinish": estimated_finish,
+        "speechSeconds": task.speech_duration
+    }
+
+@router.post("/transcript/{task_id}/cancel")
+async def cancel_transcription(
+    task_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """
+    取消转录任务：排队中的直接取消，处理中的由 worker 在片段之间停止
+    """
+    task = db.query(models.TranscriptionTask).filter(
+        models.TranscriptionTask.id == task_id,
+        models.TranscriptionTask.user_id == current_user.id
+    ).first()
+
+    if not task:
+        raise HTTPException(status_code=404, detail="转录任务不存在")
+
+    if task.status in ("pending", "processing"):
+        job_queue.cancel(db, task)
+
+    return {"taskId": task.id, "status": task.status}
+
+@router.post("/transcript/refine", response_model=TranscriptionResponse)
+async def refine_transcript(
+    request: TranscriptionRefineRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """
+    用较大的模型只重转已有转录中置信度低的片段，结果写回原转录记录
+    """
+    transcript = db.query(VideoTranscript).join(models.VideoSource).filter(
+        VideoTranscript.id == request.transcriptId,
+        models.VideoSource.user_id == current_user.id
+    ).first()
+    if not transcript:
+        raise HTTPException(status_code=404, detail="转录记录不存在")
+
+    task = models.TranscriptionTask(
+        user_id=current_user.id,
+        source_id=transcript.source_id,
+        video_path=transcript.video_path,
+        language=transcript.language,
+        model=transcript.model,
+        cascade_model=request.model or CASCADE_MODEL or "large-v3",
+        mode="refine",
+        transcript_id=transcript.id,
+        segment_count=transcript.count_segments(),
+        content_hash=transcript.content_hash
+    )
+    task = job_queue.enqueue(db, task)
+    return {"taskId": task.id}
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_video(
     request: TranscriptionRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
@@ -656,7 +792,7 @@ async def transcribe_video(
 
         # 如果是强制重新转录，删除所有相关的旧记录
         if request.force:
-            # 删除旧的转录任务
+            # 删除旧的转录任务，仍在运行的旧任务会被 worker 检测到并停止
             db.query(models.TranscriptionTask).filter(
                 models.TranscriptionTask.video_path == request.relativePath,
                 models.TranscriptionTask.user_id == current_user.id
@@ -670,39 +806,62 @@ async def transcribe_video(
             
             db.commit()
         else:
-            # 检查是否已存在转录任务
+            # 检查是否已存在转录任务，已取消或失败的任务重新提交
             existing_task = db.query(models.TranscriptionTask).filter(
                 models.TranscriptionTask.video_path == request.relativePath,
-                models.TranscriptionTask.user_id == current_user.id
-            ).first()
+                models.TranscriptionTask.user_id == current_user.id,
+                models.TranscriptionTask.status.notin_(("cancelled", "error"))
+            ).order_by(models.TranscriptionTask.created_at.desc()).first()
 
             if existing_task:
                 return {"taskId": existing_task.id}
 
-        # 创建新的转录任务
         task = models.TranscriptionTask(
             user_id=current_user.id,
             source_id=source.id,
-            status="pending",
-            progress=0,
             video_path=request.relativePath,
-            language=request.language or "zh",
-            model=request.model  # 保存选择的模型
-        )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
-
-        # 启动后台转录任务
-        background_tasks.add_task(
-            transcribe_video_task,
-            task.id,
-            str(video_path),
-            request.language,
-            request.model,  # 传递模型参数
-            db
+            language=request.language,  # 为空时由 worker 自动检测
+            model=request.model,  # 保存选择的模型
+            priority=job_queue.PRIORITY_CLASSES.get(request.priority, job_queue.DEFAULT_PRIORITY),
+            cascade_model=request.cascadeModel or CASCADE_MODEL or None,
+            content_hash=await run_in_threadpool(content_fingerprint, str(video_path))
         )
 
+        # 未指定语言时沿用相同内容之前检测到的语言，并据此选择模型
+        if not task.language:
+            task.language = cached_language(db, task.content_hash)
+            task.model = route_model(task.model, task.language)
+
+        # 相同内容已用相同模型和语言转录过时直接复用，不再排队
+        if not request.force:
+            transcript = find_reusable_transcript(
+                db, task.content_hash, task.model, task.language
+            )
+            if transcript:
+                task = reuse_transcript(db, task, transcript)
+                return {"taskId": task.id}
+
+        # 相同内容已有语音区间图时据此估算耗时并跳过静音文件；否则只读取时长，
+        # 解码和 VAD 由 worker 在转录前完成
+        analysis = cached_analysis(db, task.content_hash)
+        if analysis is not None:
+            task.duration = analysis.duration
+            task.speech_duration = analysis.speech_seconds
+        else:
+            task.duration = await run_in_threadpool(probe_duration, str(video_path))
+
+        if analysis is not None and is_silent(analysis):
+            task.schedule_reason = f"no speech ({analysis.speech_seconds:.1f}s)"
+            db.add(task)
+            save_transcript(task, db)
+            return {"taskId": task.id}
+
+        # 根据语音时长和当前积压选择模型，高峰期降级以保证周转时间
+        schedule_model(db, task)
+
+        # 创建新的转录任务并放入队列，由独立的 worker 进程领取执行
+        task = job_queue.enqueue(db, task)
+
         return {"taskId": task.id}
 
     except Exception as e:
@@ -712,37 +871,50 @@ async def transcribe_video(
             detail=str(e)
         )
 
-@router.get("/transcript/{task_id}", response_model=TranscriptionStatus)
-async def get_transcription_status(
-    task_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
-):
-    """获取转录任务状态"""
-    try:
-        task = db.query(models.TranscriptionTask).filter(
-            models.TranscriptionTask.id == task_id,
-            models.TranscriptionTask.user_id == current_user.id
-        ).first()
+# 无事件时发送注释行保活，避免代理断开空闲连接
+EVENTS_KEEPALIVE_SECONDS = 15
 
-        if not task:
-            raise HTTPException(status_code=404, detail="转录任务不存在")
+@router.get("/events")
+async def job_events(
+    request: Request,
+    current_user: models.User = Depends(deps.get_stream_user)
+):
+    """
+    推送当前用户所有任务的进度、新片段和最终状态（Server-Sent Events）
 
-        return TranscriptionStatus(
-            taskId=task.id,
-            status=task.status,
-            text=task.text if task.status == "success" else None,
-            segments=task.segments if task.status == "success" else [],
-            error=task.error if task.status == "error" else None,
-            progress=task.progress
-        )
+    一个连接复用该用户的全部任务，事件名为任务类型；收到 resync 时客户端应重新拉取状态。
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="未登录")
+    user_id = current_user.id
+    queue = event_broker.subscribe(user_id)
 
-    except Exception as e:
-        logger.error(f"Error getting transcription status: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        ) 
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                name = event.get("job", "resync")
+                yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            event_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/models/stats")
+async def get_model_stats(
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """获取已加载模型的加载耗时和内存占用"""
+    return model_registry.stats()
 
 @router.get("/transcript/exists/{source_id}/{video_path:path}")
 async def check_transcript_exists(
@@ -1,5 +1,5 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -42,4 +42,18 @@ async def get_current_user(
     user = db.query(User).filter(User.id == token_data.sub).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user 
\ No newline at end of file
+    return user 
+
+async def get_stream_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    access_token: Optional[str] = Query(None)
+) -> Optional[User]:
+    """长连接接口使用：EventSource 无法设置请求头，允许通过查询参数传递令牌
+
+    只在认证时短暂占用数据库会话，不在整个连接期间持有。
+    """
+    db = SessionLocal()
+    try:
+        return await get_current_user(db, token or access_token)
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+import os
+
+from dotenv import load_dotenv
+
+# 与 app.services.summary 一致，从 app/.env 读取配置，已设置的环境变量优先
+load_dotenv("app/.env")
+
+
+class Settings:
+    PROJECT_NAME: str = os.getenv("PROJECT_NAME", "视频摘要助手")
+    API_V1_STR: str = os.getenv("API_V1_STR", "/api")
+
+    # JWT
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", str(60 * 24 * 8)))
+
+    # 数据库
+    POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
+    POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
+    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
+    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "")
+    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "summary")
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self) -> str:
+        """设置了 DATABASE_URL 时直接使用（例如测试中的 sqlite://），否则由 POSTGRES_* 拼接"""
+        return os.getenv("DATABASE_URL") or (
+            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+
+
+settings = Settings()
@@ -0,0 +1,147 @@
+"""转录片段的紧凑二进制编码
+
+格式：头部 (魔数, 标志位, 片段数) 之后依次是 float32 开始时间数组、float32 结束时间数组、
+可选的三个 float32 置信度数组、uint32 文本偏移数组和 UTF-8 文本。文本部分就是用换行
+拼接的全文，因此不解码片段也能直接取得全文。安装了 zstandard 时整个正文会被压缩。
+"""
+import math
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，未安装时不压缩
+    zstandard = None
+
+MAGIC = b"SEG1"
+HEADER = struct.Struct("<4sBI")
+
+FLAG_ZSTD = 1
+FLAG_CONFIDENCE = 2
+
+# 每个片段可选的置信度字段，缺失时编码为 NaN
+CONFIDENCE_KEYS = ("avg_logprob", "no_speech_prob", "compression_ratio")
+
+# 正文小于该字节数时不压缩
+COMPRESS_MIN_BYTES = 4096
+ZSTD_LEVEL = 3
+
+
+def segment_dict(segment, offset: float = 0.0) -> dict:
+    """把 faster-whisper 的 Segment 转为片段字典，带上置信度"""
+    result = {
+        "start": float(segment.start) + offset,
+        "end": float(segment.end) + offset,
+        "text": segment.text.strip()
+    }
+    for key in CONFIDENCE_KEYS:
+        value = getattr(segment, key, None)
+        if value is not None:
+            result[key] = float(value)
+    return result
+
+
+def _section_size(count: int, flags: int) -> int:
+    """文本之前的数值数组总字节数"""
+    columns = 2 + (len(CONFIDENCE_KEYS) if flags & FLAG_CONFIDENCE else 0)
+    return count * 4 * columns + (count + 1) * 4
+
+
+def encode_segments(segments: List[dict]) -> bytes:
+    """把 [{start, end, text, 置信度...}, ...] 编码为二进制"""
+    count = len(segments)
+    starts = np.array([segment["start"] for segment in segments], dtype="<f4")
+    ends = np.array([segment["end"] for segment in segments], dtype="<f4")
+    arrays = [starts.tobytes(), ends.tobytes()]
+
+    flags = 0
+    if any(key in segment for segment in segments for key in CONFIDENCE_KEYS):
+        flags |= FLAG_CONFIDENCE
+        for key in CONFIDENCE_KEYS:
+            values = np.array([segment.get(key, math.nan) for segment in segments], dtype="<f4")
+            arrays.append(values.tobytes())
+
+    texts = [segment["text"].encode("utf-8") for segment in segments]
+    # offsets[i] 是第 i 个片段的起始字节，片段之间隔一个换行符
+    offsets = np.zeros(count + 1, dtype="<u4")
+    if count:
+        offsets[1:] = np.cumsum([len(text) + 1 for text in texts])
+
+    body = b"".join(arrays + [offsets.tobytes(), b"\n".join(texts)])
+    if zstandard is not None and len(body) >= COMPRESS_MIN_BYTES:
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+        flags |= FLAG_ZSTD
+    return HEADER.pack(MAGIC, flags, count) + body
+
+
+def _read(data: bytes):
+    magic, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an encoded segment blob")
+    body = memoryview(data)[HEADER.size:]
+    if flags & FLAG_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to decode compressed segments")
+        body = zstandard.ZstdDecompressor().decompress(bytes(body))
+    return count, flags, body
+
+
+def segment_count(data: Optional[bytes]) -> int:
+    """只读头部取得片段数量"""
+    if not data:
+        return 0
+    return HEADER.unpack_from(data)[2]
+
+
+def decode_segments(data: Optional[bytes], start: int = 0) -> List[dict]:
+    """解码第 start 个及之后的片段"""
+    if not data:
+        return []
+    count, flags, body = _read(data)
+    if start >= count:
+        return []
+
+    columns = [np.frombuffer(body, dtype="<f4", count=count)]
+    columns.append(np.frombuffer(body, dtype="<f4", count=count, offset=count * 4))
+    keys = CONFIDENCE_KEYS if flags & FLAG_CONFIDENCE else ()
+    for index in range(len(keys)):
+        columns.append(np.frombuffer(body, dtype="<f4", count=count, offset=count * 4 * (index + 2)))
+    position = count * 4 * len(columns)
+    offsets = np.frombuffer(body, dtype="<u4", count=count + 1, offset=position)
+    text = bytes(body[_section_size(count, flags):])
+
+    segments = []
+    for i in range(start, count):
+        segment = {
+            "start": round(float(columns[0][i]), 3),
+            "end": round(float(columns[1][i]), 3),
+            "text": text[offsets[i]:offsets[i + 1] - 1].decode("utf-8")
+        }
+        for key, column in zip(keys, columns[2:]):
+            if not math.isnan(column[i]):
+                segment[key] = round(float(column[i]), 4)
+        segments.append(segment)
+    return segments
+
+
+def decode_text(data: Optional[bytes]) -> Optional[str]:
+    """取得换行拼接的全文，不构造片段对象"""
+    if not data:
+        return None
+    count, flags, body = _read(data)
+    return bytes(body[_section_size(count, flags):]).decode("utf-8")
+
+
+def encode_intervals(intervals: Sequence[Tuple[float, float]]) -> bytes:
+    """把 [(开始, 结束), ...]（秒）编码为毫秒精度的 uint32 数组"""
+    values = np.asarray(intervals, dtype=np.float64).reshape(-1)
+    return np.round(values * 1000).astype("<u4").tobytes()
+
+
+def decode_intervals(data: Optional[bytes]) -> List[Tuple[float, float]]:
+    if not data:
+        return []
+    values = np.frombuffer(data, dtype="<u4").reshape(-1, 2) / 1000
+    return [(float(start), float(end)) for start, end in values]
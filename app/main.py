@@ -1,8 +1,11 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.api_v1.api import api_router
 from app.core.config import settings
 from app.api.deps import get_current_user
+from app.services.warmup import readiness
+from app.services import summary_jobs
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -39,7 +42,21 @@ async def auth_middleware(request: Request, call_next):
 # 包含 API 路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# 启动后在后台预热模型，应用无需等待模型加载即可接收请求
+@app.on_event("startup")
+async def warm_up_models():
+    readiness.start()
+    # 重新提交上次退出前尚未执行或未执行完的摘要任务，之后定期检查
+    summary_jobs.resume_pending()
+    summary_jobs.watch_stale()
+
 # 健康检查端点
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"} 
\ No newline at end of file
+    return {"status": "ok"}
+
+# 就绪检查端点，模型预热完成前返回 503
+@app.get("/ready")
+async def readiness_check():
+    content = {"ready": readiness.ready, "models": readiness.state()}
+    return JSONResponse(content=content, status_code=200 if readiness.ready else 503) 
\ No newline at end of file
@@ -1,7 +1,9 @@
 from .user import User
 from .video_source import VideoSource, VideoTranscript
-from .transcription import TranscriptionTask
+from .transcription import TranscriptionTask, TranscriptionSegmentBatch
 from .summary import VideoSummary
+from .media_analysis import MediaAnalysis
+from .summary_cache import SummaryCacheEntry
 
 # 导出所有模型
-__all__ = ["User", "VideoSource", "VideoTranscript", "TranscriptionTask", "VideoSummary"]
+__all__ = ["User", "VideoSource", "VideoTranscript", "TranscriptionTask", "TranscriptionSegmentBatch", "VideoSummary", "MediaAnalysis", "SummaryCacheEntry"]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, LargeBinary
+from app.core.segment_codec import decode_intervals
+from app.db.base_class import Base
+from datetime import datetime
+from typing import List, Tuple
+
+class MediaAnalysis(Base):
+    """按文件内容缓存的预分析结果，同一内容只分析一次"""
+    __tablename__ = "media_analyses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(80), unique=True, index=True)
+    language = Column(String(10))  # 检测到的语言
+    language_probability = Column(Float)
+    duration = Column(Float)  # 音频总时长（秒）
+    speech_seconds = Column(Float)  # VAD 检测到的语音总时长（秒）
+    speech_map = Column(LargeBinary)  # 语音区间，见 app.core.segment_codec.encode_intervals
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def speech_intervals(self) -> List[Tuple[float, float]]:
+        return decode_intervals(self.speech_map)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Enum
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+from datetime import datetime
+import enum
+
+class SummaryType(str, enum.Enum):
+    GENERAL = "GENERAL"  # 一般摘要
+    DETAILED = "DETAILED"  # 详细摘要
+    BULLET_POINTS = "BULLET_POINTS"  # 要点摘要
+
+class VideoSummary(Base):
+    __tablename__ = "video_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    transcript_id = Column(Integer, ForeignKey("video_transcripts.id"))
+    source_id = Column(Integer, ForeignKey("video_sources.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    title = Column(String)
+    summary_type = Column(Enum(SummaryType))
+    summary = Column(Text)
+    key_points = Column(JSON)
+    topics = Column(JSON)
+    sentiment = Column(JSON)
+    status = Column(String)  # pending, processing, success, error
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 关联关系
+    transcript = relationship("VideoTranscript", back_populates="summaries")
+    user = relationship("User", back_populates="summaries")
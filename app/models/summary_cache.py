@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text
+from app.db.base_class import Base
+from datetime import datetime
+
+class SummaryCacheEntry(Base):
+    """按文本内容和生成参数缓存的摘要结果，不依赖具体的转录记录"""
+    __tablename__ = "summary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True)  # 文本哈希、模型、摘要类型和生成参数的哈希
+    text_hash = Column(String(64), index=True)
+    model = Column(String(100))
+    summary_type = Column(String(50))
+    max_length = Column(Integer)
+    summary = Column(Text)
+    key_points = Column(JSON)
+    topics = Column(JSON)
+    sentiment = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float, Index, LargeBinary
+from sqlalchemy.orm import object_session, relationship
+from app.core.segment_codec import decode_segments, decode_text, encode_segments, segment_count
 from app.db.base_class import Base
 from datetime import datetime
+from typing import List, Optional
 
 class TranscriptionTask(Base):
     __tablename__ = "transcription_tasks"
@@ -9,14 +11,133 @@ class TranscriptionTask(Base):
     id = Column(Integer, primary_key=True, index=True)
     source_id = Column(Integer, ForeignKey("video_sources.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
-    status = Column(String)  # idle, processing, success, error
-    text = Column(Text)
-    segments = Column(JSON)
+    status = Column(String)  # idle, pending, processing, success, error, cancelled
+    video_path = Column(String)  # 相对于视频源的路径
+    language = Column(String(10))
+    model = Column(String(50))
+    # 调度器可能根据时长和积压降级模型，保留用户请求的模型和决策原因
+    requested_model = Column(String(50))
+    schedule_reason = Column(String)
+    # 级联转录：先用 model 快速转录，再用 cascade_model 重转置信度低的片段
+    cascade_model = Column(String(50))
+    mode = Column(String(20), default="transcribe")  # transcribe, refine（只精修已有转录的弱片段）
+    duration = Column(Float)  # 音频时长（秒）
+    speech_duration = Column(Float)  # 需要转录的语音时长（秒），来自语音区间图
+    processing_seconds = Column(Float)  # 实际转录耗时（秒），用于统计各模型的实时率
+    content_hash = Column(String(80))
+    # 旧版以 JSON 和全文保存的结果，只读
+    legacy_text = Column("text", Text)
+    legacy_segments = Column("segments", JSON)
+    # 整体写入的片段（二进制编码），完成后移交给 transcript
+    segments_blob = Column(LargeBinary)
+    segment_count = Column(Integer, default=0)  # 已写入的片段数（含 segment_batches），供增量轮询使用
+    segments_revision = Column(Integer, default=0)  # 片段被整体替换（如级联精修）时递增，客户端需全量重取
+    transcript_id = Column(Integer, ForeignKey("video_transcripts.id", ondelete="SET NULL"))
     error = Column(String)
     progress = Column(Integer, default=0)
+    priority = Column(Integer, default=1)  # 0 交互, 1 普通, 2 批量导入
+    checkpoint_time = Column(Float)  # 已完成片段的结束时间（秒），用于断点续转
+    # 任务队列租约
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 关联关系
     source = relationship("VideoSource", back_populates="transcription_tasks")
-    user = relationship("User", back_populates="transcription_tasks") 
\ No newline at end of file
+    user = relationship("User", back_populates="transcription_tasks")
+    transcript = relationship("VideoTranscript")
+    # 转录过程中追加写入的片段，接在 segments_blob 之后，完成时合并
+    segment_batches = relationship(
+        "TranscriptionSegmentBatch",
+        lazy="dynamic",
+        order_by="TranscriptionSegmentBatch.start_index",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index("ix_transcription_tasks_queue", "status", "priority", "created_at"),
+    )
+
+    def _batches_from(self, start: int):
+        if self.id is None:
+            # 尚未写入数据库时追加的批次都在内存中
+            return [batch for batch in self.segment_batches if batch.end_index > start]
+        return self.segment_batches.filter(TranscriptionSegmentBatch.end_index > start)
+
+    def segments_from(self, start: int = 0) -> List[dict]:
+        """已转录的第 start 个及之后的片段：进行中取任务自身的数据，完成后取关联的转录记录"""
+        if self.legacy_segments is not None:
+            return self.legacy_segments[start:]
+        if self.segments_blob is None and self.transcript is not None:
+            return self.transcript.segments_from(start)
+        segments = decode_segments(self.segments_blob, start)
+        for batch in self._batches_from(max(start, segment_count(self.segments_blob))):
+            segments += decode_segments(batch.data, max(start - batch.start_index, 0))
+        return segments
+
+    @property
+    def segments(self) -> List[dict]:
+        return self.segments_from(0)
+
+    @segments.setter
+    def segments(self, segments: Optional[List[dict]]) -> None:
+        session = object_session(self)
+        if session is not None and self.id is not None:
+            # 先写入尚未提交的批次，再一并删除
+            session.flush()
+            self.segment_batches.order_by(None).delete(synchronize_session=False)
+        else:
+            for batch in list(self.segment_batches):
+                self.segment_batches.remove(batch)
+        self.segments_blob = encode_segments(segments or [])
+        self.segment_count = len(segments or [])
+        self.legacy_segments = None
+        self.legacy_text = None
+        self.transcript_id = None
+
+    def append_segments(self, segments: List[dict]) -> None:
+        """追加一批片段，只写入新片段，不重写已保存的部分"""
+        if not segments:
+            return
+        start = self.segment_count or 0
+        self.segment_batches.append(TranscriptionSegmentBatch(
+            start_index=start,
+            end_index=start + len(segments),
+            data=encode_segments(segments)
+        ))
+        self.segment_count = start + len(segments)
+
+    def compact_segments(self) -> None:
+        """把追加写入的片段合并进 segments_blob，没有追加的片段时不做任何事"""
+        if self.segments_blob is None or (self.segment_count or 0) != segment_count(self.segments_blob):
+            self.segments = self.segments
+
+    @property
+    def text(self) -> Optional[str]:
+        """全文即片段文本按行拼接，直接从编码数据中读取"""
+        if self.legacy_text is not None:
+            return self.legacy_text
+        if self.segments_blob is None and self.transcript is not None:
+            return self.transcript.text
+        parts = [decode_text(self.segments_blob)] if segment_count(self.segments_blob) else []
+        parts += [decode_text(batch.data) for batch in self._batches_from(0)]
+        return "\n".join(parts) if parts else None
+
+
+class TranscriptionSegmentBatch(Base):
+    """转录过程中一次写入的一批片段，按 start_index 顺序拼接"""
+    __tablename__ = "transcription_segment_batches"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("transcription_tasks.id", ondelete="CASCADE"), nullable=False)
+    start_index = Column(Integer, nullable=False)  # 本批第一个片段的序号
+    end_index = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # 二进制编码，见 app.core.segment_codec
+
+    __table_args__ = (
+        Index("ix_transcription_segment_batches_task", "task_id", "start_index"),
+    )
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, LargeBinary
 from sqlalchemy.orm import relationship
+from app.core.segment_codec import decode_segments, decode_text, encode_segments, segment_count
 from app.db.base_class import Base
 from datetime import datetime
+from typing import List, Optional
 
 class VideoSource(Base):
     __tablename__ = "video_sources"
@@ -24,12 +26,44 @@ class VideoTranscript(Base):
     id = Column(Integer, primary_key=True, index=True)
     source_id = Column(Integer, ForeignKey("video_sources.id"))
     video_path = Column(String, index=True)
-    text = Column(Text)
-    segments = Column(JSON)
+    title = Column(String)
+    legacy_text = Column("text", Text)  # 旧版单独保存的全文，只读
+    legacy_segments = Column("segments", JSON)  # 旧版 JSON 格式，只读
+    segments_blob = Column(LargeBinary)  # 二进制编码的片段，见 app.core.segment_codec
+    labels = Column(JSON)
     language = Column(String(10))
+    model = Column(String(50))
+    content_hash = Column(String(80), index=True)  # 文件内容指纹，用于跨来源复用转录
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 关联关系
     source = relationship("VideoSource", back_populates="transcripts")
-    summaries = relationship("VideoSummary", back_populates="transcript") 
\ No newline at end of file
+    summaries = relationship("VideoSummary", back_populates="transcript")
+
+    def segments_from(self, start: int = 0) -> List[dict]:
+        if self.segments_blob is not None:
+            return decode_segments(self.segments_blob, start)
+        return (self.legacy_segments or [])[start:]
+
+    def count_segments(self) -> int:
+        if self.segments_blob is not None:
+            return segment_count(self.segments_blob)
+        return len(self.legacy_segments or [])
+
+    @property
+    def segments(self) -> List[dict]:
+        return self.segments_from(0)
+
+    @segments.setter
+    def segments(self, segments: Optional[List[dict]]) -> None:
+        self.segments_blob = encode_segments(segments or [])
+        self.legacy_segments = None
+        self.legacy_text = None
+
+    @property
+    def text(self) -> Optional[str]:
+        """全文由片段文本按行拼接得到，精修片段后自动一致"""
+        if self.segments_blob is not None:
+            return decode_text(self.segments_blob)
+        return self.legacy_text
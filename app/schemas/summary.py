@@ -32,5 +32,5 @@ class SummaryRequest(BaseModel):
     text: str
     max_length: Optional[int] = 150
 
-class SummaryResponse(BaseModel):
+class TextSummaryResponse(BaseModel):
     summary: str 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from datetime import datetime
 
 class TranscriptionSegment(BaseModel):
@@ -14,6 +14,20 @@ class TranscriptionRequest(BaseModel):
     language: Optional[str] = None
     force: Optional[bool] = False
     model: Optional[str] = "base"
+    priority: Optional[str] = "normal"  # interactive, normal, bulk
+    cascadeModel: Optional[str] = None  # 级联精修模型，为空时使用服务端默认配置
+
+    @validator('language', pre=True)
+    def normalize_language(cls, v):
+        """auto 或空字符串表示自动检测"""
+        if not v or v == "auto":
+            return None
+        return v
+
+class TranscriptionRefineRequest(BaseModel):
+    """只重转已有转录中置信度低的片段"""
+    transcriptId: int
+    model: Optional[str] = None
 
 class TranscriptionResponse(BaseModel):
     taskId: int
@@ -23,8 +37,17 @@ class TranscriptionStatus(BaseModel):
     status: str
     text: Optional[str] = None
     segments: Optional[List[Dict[str, Any]]] = []
+    sinceSegment: Optional[int] = 0  # segments 中第一个片段的序号
+    segmentCount: Optional[int] = 0
+    revision: Optional[int] = 0  # 片段被整体替换时递增
     error: Optional[str] = None
     progress: Optional[int] = 0
+    model: Optional[str] = None
+    scheduleReason: Optional[str] = None
+    queuePosition: Optional[int] = None
+    estimatedStart: Optional[datetime] = None
+    estimatedFinish: Optional[datetime] = None
+    speechSeconds: Optional[float] = None  # 需要转录的语音时长
 
 class TranscriptionResult(BaseModel):
     """转录结果模型"""
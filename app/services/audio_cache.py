@@ -0,0 +1,129 @@
+import os
+import hashlib
+import logging
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper 要求 16kHz 单声道
+SAMPLE_RATE = 16000
+
+# 解码后音频的缓存目录和容量上限
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "./cache/audio")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(20 * 1024**3)))
+
+
+def cache_key(video_path: str) -> str:
+    """根据路径、修改时间和大小生成缓存键，文件变更后自动失效"""
+    stat = os.stat(video_path)
+    raw = f"{os.path.abspath(video_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def cache_path(video_path: str) -> Path:
+    return Path(AUDIO_CACHE_DIR) / f"{cache_key(video_path)}.f32"
+
+
+def _decode_to_file(video_path: str, dest: Path) -> None:
+    """将视频中的音频解码为 16kHz 单声道 float32 PCM"""
+    if shutil.which("ffmpeg"):
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-v", "error",
+            "-i", video_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", str(SAMPLE_RATE),
+            "-f", "f32le",
+            "-y", str(dest)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {video_path}: {result.stderr.strip()}")
+    else:
+        # 没有 ffmpeg 命令时退回 faster-whisper 自带的 PyAV 解码
+        from faster_whisper import decode_audio
+        decode_audio(video_path, sampling_rate=SAMPLE_RATE).astype(np.float32).tofile(dest)
+
+
+def _evict(keep: Path) -> None:
+    """超出容量上限时按最近使用时间淘汰旧缓存"""
+    entries = []
+    total = 0
+    for entry in Path(AUDIO_CACHE_DIR).glob("*.f32"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+        total += stat.st_size
+
+    for _, size, entry in sorted(entries):
+        if total <= AUDIO_CACHE_MAX_BYTES:
+            break
+        if entry == keep:
+            continue
+        try:
+            entry.unlink()
+            total -= size
+            logger.info(f"Evicted cached audio {entry.name}")
+        except FileNotFoundError:
+            pass
+
+
+def load_audio(video_path: str) -> np.ndarray:
+    """获取视频的解码音频
+
+    首次调用时解码并写入缓存，之后直接以内存映射方式读取，重新转录不再重复解码。
+    """
+    path = cache_path(video_path)
+    if path.exists():
+        # 更新修改时间，作为 LRU 淘汰依据
+        os.utime(path)
+        logger.debug(f"Audio cache hit for {video_path}")
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            _decode_to_file(video_path, Path(tmp))
+            # 原子替换，避免并发的 worker 读到不完整的文件
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        logger.info(f"Decoded audio for {video_path} ({path.stat().st_size / 1024**2:.1f}MB)")
+        _evict(keep=path)
+
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="r")
+
+
+def audio_duration(audio: np.ndarray) -> float:
+    return len(audio) / SAMPLE_RATE
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """用 ffprobe 读取容器中的时长（秒），不解码音频"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        video_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Failed to probe duration of {video_path}: {str(e)}")
+    return None
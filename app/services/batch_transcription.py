@@ -0,0 +1,146 @@
+import os
+import bisect
+import logging
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from sqlalchemy.orm import Session
+
+from app.core.segment_codec import segment_dict
+from app.models.transcription import TranscriptionTask
+from app.services.audio_cache import audio_duration
+from app.services.language_detection import detect_language_cached
+from app.services.model_registry import model_registry
+from app.services.scheduler import route_model
+from app.services.speech_map import Interval, analyze_speech, is_silent
+from app.services.transcription import save_transcript
+
+logger = logging.getLogger(__name__)
+
+# 时长不超过该值的视频才参与批量转录（秒）
+BATCH_MAX_SECONDS = float(os.getenv("TRANSCRIPTION_BATCH_MAX_SECONDS", "180"))
+# 一次编码/解码的窗口数
+BATCH_SIZE = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", "16"))
+# Whisper 单个窗口的最大长度
+WINDOW_SECONDS = 30.0
+
+
+def speech_windows(intervals: List[Interval]) -> List[Tuple[float, float]]:
+    """把一段音频的语音区间（秒）合并成不超过 30 秒的窗口"""
+    windows = []
+    start = end = None
+    for speech_start, speech_end in intervals:
+        if start is not None and speech_end - start > WINDOW_SECONDS:
+            windows.append((start, end))
+            start = None
+        if start is None:
+            start = speech_start
+        end = speech_end
+        # 单段语音超过窗口长度时按窗口长度截断
+        while end - start > WINDOW_SECONDS:
+            windows.append((start, start + WINDOW_SECONDS))
+            start += WINDOW_SECONDS
+    if start is not None:
+        windows.append((start, end))
+    return windows
+
+
+def transcribe_batch(
+    clips: List[np.ndarray],
+    intervals: List[List[Interval]],
+    language: str,
+    model_name: str
+) -> List[List[dict]]:
+    """将多个短音频的语音窗口拼成批次一起推理，结果按输入顺序分发回各音频
+
+    intervals 为各音频的语音区间图，与 clips 一一对应。
+    """
+    offsets = []
+    clip_timestamps = []
+    position = 0.0
+    for clip, clip_intervals in zip(clips, intervals):
+        offsets.append(position)
+        clip_timestamps.extend(
+            {"start": position + start, "end": position + end}
+            for start, end in speech_windows(clip_intervals)
+        )
+        position += audio_duration(clip)
+
+    results = [[] for _ in clips]
+    if not clip_timestamps:
+        return results
+
+    model = model_registry.get(model_name)
+    pipeline = BatchedInferencePipeline(model=model)
+    segments, _ = pipeline.transcribe(
+        np.concatenate(clips),
+        language=language,
+        task="transcribe",
+        beam_size=5,
+        batch_size=BATCH_SIZE,
+        vad_filter=False,
+        clip_timestamps=clip_timestamps
+    )
+
+    for segment in segments:
+        # 窗口不会跨越音频边界，按起始时间即可找到所属音频
+        index = bisect.bisect_right(offsets, segment.start) - 1
+        results[index].append(segment_dict(segment, -offsets[index]))
+    return results
+
+
+def transcribe_batch_tasks(
+    items: List[Tuple[TranscriptionTask, np.ndarray]],
+    model_name: str,
+    db: Session
+) -> None:
+    """批量转录一组短视频任务
+
+    按语言分组后每组一次批量推理，再把片段写回各自的任务和转录记录。
+    使用按内容缓存的语音区间图，静音的视频直接完成。
+    """
+    groups: Dict[str, List[Tuple[TranscriptionTask, np.ndarray, List[Interval]]]] = defaultdict(list)
+    for task, audio in items:
+        analysis = analyze_speech(db, task.content_hash, audio)
+        task.status = "processing"
+        task.progress = 0
+        task.segments = []
+        task.duration = analysis.duration
+        task.speech_duration = analysis.speech_seconds
+        if is_silent(analysis):
+            logger.info(f"Task {task.id} has no speech, skipping")
+            save_transcript(task, db)
+            continue
+        intervals = analysis.speech_intervals
+        # 批量推理要求同一批使用同一种语言，未指定时逐个检测（按内容缓存）
+        task.language = task.language or detect_language_cached(
+            db, task.content_hash, audio, intervals
+        )
+        groups[task.language].append((task, audio, intervals))
+    db.commit()
+
+    for language, group in groups.items():
+        # 英文专用模型遇到其他语言时换用多语言模型
+        group_model = route_model(model_name, language)
+        logger.info(f"Batch transcribing {len(group)} tasks ({language}) with '{group_model}'")
+        results = transcribe_batch(
+            [audio for _, audio, _ in group],
+            [intervals for _, _, intervals in group],
+            language,
+            group_model
+        )
+        for (task, _, _), segments in zip(group, results):
+            task.model = group_model
+            # 推理期间被取消的任务不保存结果
+            db.refresh(task, ["status"])
+            if task.status != "processing":
+                logger.info(f"Skipping result of task {task.id} ({task.status})")
+                continue
+            task.segments = segments
+            save_transcript(task, db)
+
+
+def is_batchable(audio: np.ndarray) -> bool:
+    return audio_duration(audio) <= BATCH_MAX_SECONDS
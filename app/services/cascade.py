@@ -0,0 +1,105 @@
+import os
+import logging
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.segment_codec import segment_dict
+from app.services.audio_cache import SAMPLE_RATE, audio_duration
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# 级联转录的精修模型，为空时不启用
+CASCADE_MODEL = os.getenv("TRANSCRIPTION_CASCADE_MODEL", "")
+# 置信度阈值，与 Whisper 自身的回退条件一致
+LOGPROB_THRESHOLD = float(os.getenv("CASCADE_LOGPROB_THRESHOLD", "-1.0"))
+NO_SPEECH_THRESHOLD = float(os.getenv("CASCADE_NO_SPEECH_THRESHOLD", "0.6"))
+COMPRESSION_THRESHOLD = float(os.getenv("CASCADE_COMPRESSION_THRESHOLD", "2.4"))
+# 重转区域向两侧扩展的长度（秒），不会越过相邻片段
+REGION_PAD_SECONDS = 0.5
+
+
+def is_weak(segment: dict) -> bool:
+    """片段的任一置信度指标越过阈值；没有置信度的片段不算弱"""
+    return (
+        segment.get("avg_logprob", 0.0) < LOGPROB_THRESHOLD
+        or segment.get("no_speech_prob", 0.0) > NO_SPEECH_THRESHOLD
+        or segment.get("compression_ratio", 0.0) > COMPRESSION_THRESHOLD
+    )
+
+
+def weak_regions(segments: List[dict]) -> List[Tuple[int, int]]:
+    """把相邻的弱片段合并成区域，返回 [(首个片段序号, 末个片段序号), ...]"""
+    regions = []
+    for index, segment in enumerate(segments):
+        if not is_weak(segment):
+            continue
+        if regions and regions[-1][1] == index - 1:
+            regions[-1] = (regions[-1][0], index)
+        else:
+            regions.append((index, index))
+    return regions
+
+
+def refine_segments(
+    audio: np.ndarray,
+    segments: List[dict],
+    language: Optional[str],
+    model_name: str,
+    check: Optional[Callable[[], None]] = None
+) -> Tuple[List[dict], int]:
+    """用较大的模型重新转录弱片段所在的区域，拼回原结果
+
+    返回 (新的片段列表, 重转的区域数)。check 在每个区域之前调用，可抛出异常中止。
+    """
+    regions = weak_regions(segments)
+    if not regions:
+        return segments, 0
+
+    total = audio_duration(audio)
+    weak = sum(last - first + 1 for first, last in regions)
+    logger.info(
+        f"Refining {weak}/{len(segments)} weak segments in {len(regions)} regions with '{model_name}'"
+    )
+
+    result: List[dict] = []
+    cursor = 0
+    with model_registry.acquire(model_name) as model:
+        for first, last in regions:
+            if check:
+                check()
+            start = max(
+                segments[first]["start"] - REGION_PAD_SECONDS,
+                segments[first - 1]["end"] if first > 0 else 0.0
+            )
+            end = min(
+                segments[last]["end"] + REGION_PAD_SECONDS,
+                segments[last + 1]["start"] if last + 1 < len(segments) else total
+            )
+            # 用区域前的最后一句作为提示，保持上下文连贯
+            prompt = segments[first - 1]["text"] if first > 0 else None
+            refined, _ = model.transcribe(
+                audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)],
+                language=language,
+                task="transcribe",
+                beam_size=5,
+                vad_filter=False,
+                condition_on_previous_text=False,
+                initial_prompt=prompt
+            )
+            refined = [segment_dict(segment, start) for segment in refined]
+
+            originals = segments[first:last + 1]
+            result.extend(segments[cursor:first])
+            # 精修模型没有输出时，原片段若都像静音幻觉则丢弃，否则保留
+            if refined or all(
+                segment.get("no_speech_prob", 0.0) > NO_SPEECH_THRESHOLD for segment in originals
+            ):
+                result.extend(refined)
+            else:
+                result.extend(originals)
+            cursor = last + 1
+
+    result.extend(segments[cursor:])
+    return result, len(regions)
@@ -0,0 +1,182 @@
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.segment_codec import segment_dict
+from app.services.audio_cache import SAMPLE_RATE
+from app.services.model_registry import model_registry, default_device
+from app.services.speech_map import Interval, clip_intervals, transcribe_speech
+
+logger = logging.getLogger(__name__)
+
+# 并行转录的进程数，0 或 1 表示不启用
+PARALLEL_WORKERS = int(os.getenv("TRANSCRIPTION_PARALLEL_WORKERS", "0"))
+# 音频时长超过该值才启用并行转录（秒）
+PARALLEL_MIN_SECONDS = float(os.getenv("TRANSCRIPTION_PARALLEL_MIN_SECONDS", "600"))
+
+# 每个 (模型, 设备, 精度) 一个进程池，子进程内模型只加载一次
+_pools: Dict[Tuple[str, str, str], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def use_parallel(duration: float) -> bool:
+    return PARALLEL_WORKERS > 1 and duration >= PARALLEL_MIN_SECONDS
+
+
+def split_at_silences(
+    audio: np.ndarray,
+    chunk_seconds: float,
+    start: int = 0,
+    intervals: Optional[List[Interval]] = None
+) -> List[Tuple[int, int]]:
+    """按目标长度切分音频，切点落在 VAD 检测到的静音处
+
+    返回 [(起始采样点, 结束采样点), ...]，覆盖从 start 到结尾的音频。
+    传入预先计算的语音区间（秒）时不再运行 VAD。
+    """
+    total = len(audio)
+    chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+    if total - start <= chunk_samples:
+        return [(start, total)]
+
+    if intervals is None:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        speeches = [
+            {"start": speech["start"] + start, "end": speech["end"] + start}
+            for speech in get_speech_timestamps(audio[start:], VadOptions(min_silence_duration_ms=500))
+        ]
+    else:
+        speeches = [
+            {"start": int(s * SAMPLE_RATE), "end": int(e * SAMPLE_RATE)}
+            for s, e in clip_intervals(intervals, start / SAMPLE_RATE)
+        ]
+    chunks = []
+    chunk_start = start
+    for current, following in zip(speeches, speeches[1:]):
+        if current["end"] - chunk_start >= chunk_samples:
+            # 在两段语音之间的静音中点切分
+            cut = (current["end"] + following["start"]) // 2
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    chunks.append((chunk_start, total))
+    return chunks
+
+
+def _init_chunk_worker(model_name: str, device: str, compute_type: str, cpu_threads: int) -> None:
+    """子进程初始化：按分配的线程数预加载模型"""
+    model_registry.model_kwargs["cpu_threads"] = cpu_threads
+    model_registry.get(model_name, device, compute_type)
+
+
+def _transcribe_chunk(
+    audio_path: str,
+    start: int,
+    end: int,
+    language: Optional[str],
+    model_name: str,
+    device: str,
+    compute_type: str,
+    intervals: Optional[List[Interval]] = None
+) -> Tuple[List[dict], str]:
+    """在子进程中转录一个分片，返回校正到整段音频时间轴的片段
+
+    传入分片内的语音区间时只转录这些部分。
+    """
+    # 子进程直接映射缓存文件，避免在进程间传输音频数据
+    audio = np.memmap(audio_path, dtype=np.float32, mode="r")
+    model = model_registry.get(model_name, device, compute_type)
+
+    if intervals is not None:
+        segments, info = transcribe_speech(
+            model, audio, intervals,
+            language=language,
+            task="transcribe",
+            beam_size=5
+        )
+        return list(segments), info.language if info else language
+
+    audio = audio[start:end]
+    offset = start / SAMPLE_RATE
+    segments, info = model.transcribe(
+        audio,
+        language=language,
+        task="transcribe",
+        beam_size=5,
+        vad_filter=True
+    )
+    return [segment_dict(segment, offset) for segment in segments], info.language
+
+
+def _chunk_pool(model_name: str, device: str, compute_type: str) -> ProcessPoolExecutor:
+    key = (model_name, device, compute_type)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            cpu_threads = max((os.cpu_count() or 1) // PARALLEL_WORKERS, 1)
+            logger.info(
+                f"Starting {PARALLEL_WORKERS} transcription processes for '{model_name}' "
+                f"with {cpu_threads} threads each"
+            )
+            pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS,
+                # CTranslate2 不支持 fork 后继续使用，使用 spawn 启动子进程
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(model_name, device, compute_type, cpu_threads)
+            )
+            _pools[key] = pool
+        return pool
+
+
+def transcribe_chunked(
+    audio: np.memmap,
+    language: Optional[str],
+    model_name: str,
+    chunk_seconds: float,
+    offset: float = 0.0,
+    intervals: Optional[List[Interval]] = None
+) -> Tuple[str, Iterator[dict]]:
+    """将长音频在静音处切分后多进程并行转录
+
+    返回 (语言, 按时间顺序的片段迭代器)。未指定语言时先用第一个分片检测，
+    其余分片使用同一语言，避免各分片检测结果不一致。offset 之前的音频跳过。
+    传入语音区间图时按它切分，各分片只转录语音部分。
+    """
+    device, compute_type = default_device()
+    pool = _chunk_pool(model_name, device, compute_type)
+    chunks = split_at_silences(
+        audio, chunk_seconds, start=int(offset * SAMPLE_RATE), intervals=intervals
+    )
+    logger.info(f"Transcribing {len(chunks)} chunks of ~{chunk_seconds}s in parallel")
+
+    def submit(chunk, lang):
+        # 只把落在分片内的语音区间传给子进程
+        chunk_intervals = None if intervals is None else clip_intervals(
+            intervals, chunk[0] / SAMPLE_RATE, chunk[1] / SAMPLE_RATE
+        )
+        return pool.submit(
+            _transcribe_chunk, audio.filename, chunk[0], chunk[1],
+            lang, model_name, device, compute_type, chunk_intervals
+        )
+
+    futures = [submit(chunks[0], language)]
+    if language is None:
+        language = futures[0].result()[1]
+    futures.extend(submit(chunk, language) for chunk in chunks[1:])
+
+    def iter_segments():
+        try:
+            for future in futures:
+                yield from future.result()[0]
+        finally:
+            # 中途出错时取消尚未开始的分片
+            for future in futures:
+                future.cancel()
+
+    return language, iter_segments()
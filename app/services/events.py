@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import select
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# worker 通过 Postgres NOTIFY 发布任务事件，API 进程 LISTEN 后推送给浏览器
+EVENTS_CHANNEL = os.getenv("JOB_EVENTS_CHANNEL", "job_events")
+# NOTIFY 负载上限为 8000 字节，超出时去掉片段，由客户端增量拉取
+MAX_PAYLOAD_BYTES = 7500
+# 每个连接最多积压的事件数
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def publish(db: Session, user_id: Optional[int], event: dict) -> None:
+    """在当前事务中发布事件，事务提交后才会送达，回滚则不发送"""
+    if user_id is None or db.get_bind().dialect.name != "postgresql":
+        return
+    event = dict(event, userId=user_id)
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        event.pop("segments", None)
+        event["resync"] = True
+        payload = json.dumps(event, ensure_ascii=False, default=str)
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": EVENTS_CHANNEL, "payload": payload}
+    )
+
+
+def publish_task(
+    db: Session,
+    task,
+    segments: Optional[List[dict]] = None,
+    since_segment: Optional[int] = None
+) -> None:
+    """发布转录任务的状态、进度和新增片段"""
+    event = {
+        "job": "transcription",
+        "taskId": task.id,
+        "status": task.status,
+        "progress": task.progress,
+        "segmentCount": task.segment_count,
+        "revision": task.segments_revision or 0,
+        "error": task.error if task.status == "error" else None,
+    }
+    if segments is not None:
+        event["segments"] = segments
+        event["sinceSegment"] = since_segment
+    publish(db, task.user_id, event)
+
+
+def publish_summary(db: Session, summary) -> None:
+    """发布摘要任务的状态"""
+    publish(db, summary.user_id, {
+        "job": "summary",
+        "summaryId": summary.id,
+        "transcriptId": summary.transcript_id,
+        "summaryType": getattr(summary.summary_type, "value", summary.summary_type),
+        "status": summary.status,
+        "error": summary.error if summary.status == "error" else None,
+    })
+
+
+Subscriber = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+
+class EventBroker:
+    """监听任务事件并按用户分发
+
+    每个 API 进程只占用一个数据库连接做 LISTEN，同一用户的所有连接共享同一路通知，
+    不轮询数据库。
+    """
+
+    def __init__(self, channel: str = EVENTS_CHANNEL):
+        self.channel = channel
+        self._subscribers: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="job-events", daemon=True)
+                self._thread.start()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if not subscribers:
+                return
+            subscribers.difference_update({item for item in subscribers if item[1] is queue})
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 客户端消费过慢时清空积压，通知它重新拉取完整状态
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"resync": True})
+
+    def _broadcast(self, event: dict, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                targets = [item for items in self._subscribers.values() for item in items]
+            else:
+                targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed job event: {payload[:200]}")
+            return
+        user_id = event.pop("userId", None)
+        if user_id is not None:
+            self._broadcast(event, user_id)
+
+    def _listen(self) -> None:
+        from app.db.session import engine
+
+        conn = engine.raw_connection()
+        # 从连接池摘出，LISTEN 连接需要长期独占
+        conn.detach()
+        try:
+            dbapi = conn.dbapi_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            logger.info(f"Listening for job events on '{self.channel}'")
+
+            while True:
+                if select.select([dbapi], [], [], 5.0) == ([], [], []):
+                    continue
+                dbapi.poll()
+                while dbapi.notifies:
+                    self._dispatch(dbapi.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Job event listener failed, reconnecting: {str(e)}")
+                # 断线期间的事件已丢失，让所有连接重新同步
+                self._broadcast({"resync": True})
+                time.sleep(2)
+
+
+event_broker = EventBroker()
@@ -0,0 +1,25 @@
+import os
+import hashlib
+
+# 采样块数量和每块大小
+SAMPLE_BLOCKS = 16
+BLOCK_SIZE = 64 * 1024
+
+
+def content_fingerprint(path: str) -> str:
+    """计算文件内容指纹
+
+    对文件大小加上均匀分布的若干数据块做哈希，只读取约 1MB 数据，
+    同一文件在不同路径、不同用户下得到相同指纹。
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        if size <= SAMPLE_BLOCKS * BLOCK_SIZE:
+            digest.update(f.read())
+        else:
+            step = (size - BLOCK_SIZE) // (SAMPLE_BLOCKS - 1)
+            for i in range(SAMPLE_BLOCKS):
+                f.seek(i * step)
+                digest.update(f.read(BLOCK_SIZE))
+    return f"{size:x}-{digest.hexdigest()[:40]}"
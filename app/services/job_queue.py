@@ -0,0 +1,333 @@
+import os
+import time
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.transcription import TranscriptionTask
+from app.models.user import User
+from app.services.events import publish_task
+
+logger = logging.getLogger(__name__)
+
+# 租约时长，worker 需要在到期前发送心跳
+LEASE_SECONDS = int(os.getenv("TRANSCRIPTION_LEASE_SECONDS", "120"))
+# 心跳间隔
+HEARTBEAT_SECONDS = max(LEASE_SECONDS // 4, 1)
+# 检查任务是否被取消的间隔（秒），决定取消后 worker 多快停下
+CANCEL_CHECK_SECONDS = float(os.getenv("TRANSCRIPTION_CANCEL_CHECK_SECONDS", "2"))
+# 最大尝试次数，超过后标记为失败
+MAX_ATTEMPTS = int(os.getenv("TRANSCRIPTION_MAX_ATTEMPTS", "3"))
+# 公平调度统计用户用量的时间窗口
+FAIR_SHARE_WINDOW_SECONDS = int(os.getenv("TRANSCRIPTION_FAIR_SHARE_WINDOW", "3600"))
+
+# 优先级，数值越小越先执行
+PRIORITY_CLASSES = {
+    "interactive": 0,  # 播放页发起的单个视频
+    "normal": 1,
+    "bulk": 2,  # 批量导入
+}
+DEFAULT_PRIORITY = PRIORITY_CLASSES["normal"]
+
+
+def enqueue(db: Session, task: TranscriptionTask) -> TranscriptionTask:
+    """将任务放入队列，等待 worker 领取"""
+    task.status = "pending"
+    task.progress = 0
+    if task.priority is None:
+        task.priority = DEFAULT_PRIORITY
+    task.attempts = 0
+    task.worker_id = None
+    task.lease_expires_at = None
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def _claimable():
+    """可领取的任务：排队中，或租约已过期的处理中任务"""
+    now = datetime.utcnow()
+    return or_(
+        TranscriptionTask.status == "pending",
+        and_(
+            TranscriptionTask.status == "processing",
+            TranscriptionTask.lease_expires_at < now
+        )
+    )
+
+
+def _user_usage(db: Session, user_ids: Iterable[int]) -> Dict[int, float]:
+    """各用户在统计窗口内占用的音频时长（处理中 + 最近完成）"""
+    since = datetime.utcnow() - timedelta(seconds=FAIR_SHARE_WINDOW_SECONDS)
+    rows = db.query(
+        TranscriptionTask.user_id,
+        func.sum(func.coalesce(TranscriptionTask.duration, 0))
+    ).filter(
+        TranscriptionTask.user_id.in_(list(user_ids)),
+        or_(
+            TranscriptionTask.status == "processing",
+            and_(
+                TranscriptionTask.status == "success",
+                TranscriptionTask.updated_at >= since
+            )
+        )
+    ).group_by(TranscriptionTask.user_id).all()
+    return {user_id: float(usage or 0) for user_id, usage in rows}
+
+
+def _fair_order(db: Session) -> List[tuple]:
+    """按 (优先级, 加权用量, 最早提交时间) 排列有待领取任务的 (优先级, 用户)"""
+    priority = func.coalesce(TranscriptionTask.priority, DEFAULT_PRIORITY)
+    heads = db.query(
+        priority,
+        TranscriptionTask.user_id,
+        func.min(TranscriptionTask.created_at)
+    ).filter(_claimable()).group_by(priority, TranscriptionTask.user_id).all()
+    if not heads:
+        return []
+
+    user_ids = {user_id for _, user_id, _ in heads}
+    usage = _user_usage(db, user_ids)
+    weights = dict(db.query(User.id, User.queue_weight).filter(User.id.in_(user_ids)).all())
+
+    def share(user_id):
+        return usage.get(user_id, 0.0) / (weights.get(user_id) or 1.0)
+
+    return sorted(heads, key=lambda head: (head[0], share(head[1]), head[2]))
+
+
+def lease_next(db: Session, worker_id: str) -> Optional[TranscriptionTask]:
+    """领取下一个任务
+
+    先按优先级，同一优先级内按用户加权用量做公平调度，避免单个用户批量提交时
+    阻塞其他用户。使用 SELECT ... FOR UPDATE SKIP LOCKED，多个 worker 并发
+    领取时互不阻塞。
+    """
+    while True:
+        task = None
+        for priority, user_id, _ in _fair_order(db):
+            task = db.query(TranscriptionTask).filter(
+                _claimable(),
+                func.coalesce(TranscriptionTask.priority, DEFAULT_PRIORITY) == priority,
+                TranscriptionTask.user_id == user_id
+            ).order_by(
+                TranscriptionTask.created_at
+            ).with_for_update(skip_locked=True).limit(1).first()
+            if task:
+                break
+
+        if not task:
+            db.commit()
+            return None
+
+        if task.status == "processing":
+            logger.warning(
+                f"Lease of task {task.id} held by {task.worker_id} expired, reclaiming"
+            )
+
+        if (task.attempts or 0) >= MAX_ATTEMPTS:
+            task.status = "error"
+            task.error = task.error or f"Exceeded {MAX_ATTEMPTS} attempts"
+            task.worker_id = None
+            task.lease_expires_at = None
+            publish_task(db, task)
+            db.commit()
+            continue
+
+        _claim(task, worker_id)
+        publish_task(db, task)
+        db.commit()
+        return task
+
+
+def lease_more(
+    db: Session,
+    worker_id: str,
+    model: Optional[str],
+    limit: int
+) -> List[TranscriptionTask]:
+    """额外领取最多 limit 个使用相同模型的排队任务，用于批量推理
+
+    与 lease_next 一样按公平调度的顺序依次从各 (优先级, 用户) 中领取，
+    批量领取不会让某个用户绕过公平调度。
+    """
+    if limit <= 0:
+        return []
+    tasks = []
+    for priority, user_id, _ in _fair_order(db):
+        if len(tasks) >= limit:
+            break
+        tasks += db.query(TranscriptionTask).filter(
+            TranscriptionTask.status == "pending",
+            TranscriptionTask.model == model,
+            # 级联和精修任务需要逐个处理
+            TranscriptionTask.cascade_model.is_(None),
+            func.coalesce(TranscriptionTask.mode, "transcribe") == "transcribe",
+            TranscriptionTask.attempts < MAX_ATTEMPTS,
+            func.coalesce(TranscriptionTask.priority, DEFAULT_PRIORITY) == priority,
+            TranscriptionTask.user_id == user_id
+        ).order_by(
+            TranscriptionTask.created_at
+        ).with_for_update(skip_locked=True).limit(limit - len(tasks)).all()
+
+    for task in tasks:
+        _claim(task, worker_id)
+        publish_task(db, task)
+    db.commit()
+    return tasks
+
+
+def _claim(task: TranscriptionTask, worker_id: str) -> None:
+    now = datetime.utcnow()
+    task.status = "processing"
+    task.attempts = (task.attempts or 0) + 1
+    task.worker_id = worker_id
+    task.heartbeat_at = now
+    task.lease_expires_at = now + timedelta(seconds=LEASE_SECONDS)
+
+
+def heartbeat(db: Session, task_id: int, worker_id: str) -> bool:
+    """续约，返回 False 表示租约已被其他 worker 接管"""
+    now = datetime.utcnow()
+    updated = db.query(TranscriptionTask).filter(
+        TranscriptionTask.id == task_id,
+        TranscriptionTask.worker_id == worker_id,
+        TranscriptionTask.status == "processing"
+    ).update({
+        TranscriptionTask.heartbeat_at: now,
+        TranscriptionTask.lease_expires_at: now + timedelta(seconds=LEASE_SECONDS)
+    }, synchronize_session=False)
+    db.commit()
+    return updated > 0
+
+
+def is_leased(db: Session, task_id: int, worker_id: str) -> bool:
+    """任务仍在由该 worker 处理，被取消、删除或接管时返回 False"""
+    leased = db.query(TranscriptionTask.id).filter(
+        TranscriptionTask.id == task_id,
+        TranscriptionTask.worker_id == worker_id,
+        TranscriptionTask.status == "processing"
+    ).first() is not None
+    db.commit()
+    return leased
+
+
+def cancel(db: Session, task: TranscriptionTask) -> None:
+    """取消任务
+
+    排队中的任务不会再被领取；处理中的任务由 worker 的 LeaseKeeper 检测到后
+    在片段之间停止。
+    """
+    if task.status in ("pending", "processing"):
+        logger.info(f"Cancelling task {task.id} ({task.status})")
+    task.status = "cancelled"
+    task.lease_expires_at = None
+    publish_task(db, task)
+    db.commit()
+
+
+def release(db: Session, task_id: int, worker_id: str) -> None:
+    """任务结束后释放租约"""
+    db.query(TranscriptionTask).filter(
+        TranscriptionTask.id == task_id,
+        TranscriptionTask.worker_id == worker_id
+    ).update({
+        TranscriptionTask.worker_id: None,
+        TranscriptionTask.lease_expires_at: None
+    }, synchronize_session=False)
+    db.commit()
+
+
+def fail(db: Session, task_id: int, worker_id: str, error: str) -> None:
+    """任务失败，未超过最大尝试次数时重新排队"""
+    # 已被取消的任务不再重新排队
+    task = db.query(TranscriptionTask).filter(
+        TranscriptionTask.id == task_id,
+        TranscriptionTask.worker_id == worker_id,
+        TranscriptionTask.status == "processing"
+    ).with_for_update().first()
+    if not task:
+        db.commit()
+        return
+
+    if (task.attempts or 0) < MAX_ATTEMPTS:
+        logger.warning(f"Task {task_id} failed (attempt {task.attempts}), requeueing: {error}")
+        task.status = "pending"
+    else:
+        logger.error(f"Task {task_id} failed after {task.attempts} attempts: {error}")
+        task.status = "error"
+    task.error = error
+    task.worker_id = None
+    task.lease_expires_at = None
+    publish_task(db, task)
+    db.commit()
+
+
+class LeaseKeeper:
+    """在后台线程中为正在处理的任务发送心跳
+
+    两次心跳之间也会检查任务状态，任务被取消、删除或租约被接管时设置 lost，
+    转录过程据此尽快停止。
+    """
+
+    def __init__(
+        self,
+        task_id: int,
+        worker_id: str,
+        interval: float = HEARTBEAT_SECONDS,
+        check_interval: float = CANCEL_CHECK_SECONDS
+    ):
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.check_interval = min(check_interval, interval)
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{task_id}", daemon=True
+        )
+
+    def _run(self):
+        # 心跳使用独立会话，避免与转录线程共享连接
+        db = SessionLocal()
+        last_beat = time.monotonic()
+        try:
+            while not self._stop.wait(self.check_interval):
+                try:
+                    if time.monotonic() - last_beat >= self.interval:
+                        leased = heartbeat(db, self.task_id, self.worker_id)
+                        last_beat = time.monotonic()
+                    else:
+                        leased = is_leased(db, self.task_id, self.worker_id)
+                    if not leased:
+                        logger.warning(f"Lost lease on task {self.task_id} (cancelled or reclaimed)")
+                        self.lost.set()
+                        return
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Heartbeat failed for task {self.task_id}: {str(e)}")
+        finally:
+            db.close()
+
+    def start(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止心跳，可重复调用"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,107 @@
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.media_analysis import MediaAnalysis
+from app.services.audio_cache import SAMPLE_RATE
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# 用于检测语言的多语言模型，英文专用模型无法检测
+DETECT_MODEL = os.getenv("LANGUAGE_DETECT_MODEL", "base")
+# 取多少秒语音用于检测
+DETECT_SPEECH_SECONDS = 30.0
+# 最多在开头多少秒内寻找语音，避免对长静音开头的文件扫描整段音频
+DETECT_SCAN_SECONDS = 600.0
+
+
+def speech_sample(
+    audio: np.ndarray,
+    seconds: float = DETECT_SPEECH_SECONDS,
+    intervals: Optional[List[Tuple[float, float]]] = None
+) -> np.ndarray:
+    """拼接开头的语音片段，最多 seconds 秒；检测不到语音时取开头一段
+
+    传入预先计算的语音区间（秒）时不再运行 VAD。
+    """
+    head = audio[:int(DETECT_SCAN_SECONDS * SAMPLE_RATE)]
+    if intervals is None:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        speeches = get_speech_timestamps(head, VadOptions(min_silence_duration_ms=500))
+    else:
+        speeches = [
+            {"start": int(start * SAMPLE_RATE), "end": int(end * SAMPLE_RATE)}
+            for start, end in intervals if start < DETECT_SCAN_SECONDS
+        ]
+    limit = int(seconds * SAMPLE_RATE)
+    pieces, total = [], 0
+    for speech in speeches:
+        piece = head[speech["start"]:min(speech["end"], speech["start"] + limit - total)]
+        pieces.append(piece)
+        total += len(piece)
+        if total >= limit:
+            break
+    if not pieces:
+        return np.asarray(audio[:limit], dtype=np.float32)
+    return np.concatenate(pieces).astype(np.float32)
+
+
+def detect_language(
+    audio: np.ndarray,
+    intervals: Optional[List[Tuple[float, float]]] = None
+) -> Tuple[str, float]:
+    """只用开头约 30 秒语音检测语言，返回 (语言, 置信度)"""
+    model = model_registry.get(DETECT_MODEL)
+    # transcribe 在返回前完成语言检测，片段是惰性生成的，不迭代就不会解码
+    _, info = model.transcribe(speech_sample(audio, intervals=intervals), vad_filter=False)
+    return info.language, info.language_probability
+
+
+def cached_language(db: Session, content_hash: Optional[str]) -> Optional[str]:
+    """查询相同内容之前检测到的语言"""
+    if not content_hash:
+        return None
+    analysis = db.query(MediaAnalysis).filter(
+        MediaAnalysis.content_hash == content_hash
+    ).first()
+    return analysis.language if analysis else None
+
+
+def detect_language_cached(
+    db: Session,
+    content_hash: Optional[str],
+    audio: np.ndarray,
+    intervals: Optional[List[Tuple[float, float]]] = None
+) -> str:
+    """按内容指纹缓存语言检测结果，同一文件只检测一次"""
+    language = cached_language(db, content_hash)
+    if language:
+        return language
+
+    language, probability = detect_language(audio, intervals)
+    logger.info(f"Detected language {language} ({probability:.2f}) for {content_hash}")
+    if not content_hash:
+        return language
+
+    analysis = db.query(MediaAnalysis).filter(
+        MediaAnalysis.content_hash == content_hash
+    ).first()
+    if analysis is None:
+        analysis = MediaAnalysis(content_hash=content_hash)
+    analysis.language = language
+    analysis.language_probability = probability
+    # 在保存点内写入，冲突时只回滚这一条，调用方未提交的修改不受影响
+    try:
+        with db.begin_nested():
+            db.add(analysis)
+    except IntegrityError:
+        # 其他 worker 同时写入了同一内容的结果
+        logger.info(f"Language for {content_hash} was written concurrently")
+    db.commit()
+    return language
@@ -0,0 +1,206 @@
+import os
+import json
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 模型缓存目录
+MODEL_DOWNLOAD_ROOT = "./models"
+# python -m app.tune_cpu 生成的 CPU 推理参数
+CPU_TUNING_FILE = os.getenv("CPU_TUNING_FILE", os.path.join(MODEL_DOWNLOAD_ROOT, "cpu_tuning.json"))
+
+# 未做调优时的 CPU 推理参数
+DEFAULT_CPU_TUNING = {"compute_type": "int8", "cpu_threads": 4, "num_workers": 1}
+
+ModelKey = Tuple[str, str, str]
+
+
+def _current_rss() -> int:
+    """获取当前进程常驻内存（字节）"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # 非 Linux 平台退化为峰值常驻内存
+        import resource
+        import sys
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+@lru_cache(maxsize=None)
+def cpu_tuning() -> Dict[str, Any]:
+    """读取 CPU 调优结果，文件不存在或无效时使用默认参数"""
+    tuning = dict(DEFAULT_CPU_TUNING)
+    try:
+        with open(CPU_TUNING_FILE, encoding="utf-8") as f:
+            best = json.load(f)["best"]
+        tuning.update({key: best[key] for key in DEFAULT_CPU_TUNING if key in best})
+        logger.info(f"Using CPU tuning from {CPU_TUNING_FILE}: {tuning}")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring invalid CPU tuning file {CPU_TUNING_FILE}: {str(e)}")
+    return tuning
+
+
+@lru_cache(maxsize=None)
+def default_device() -> Tuple[str, str]:
+    """根据硬件选择默认设备和计算精度"""
+    # torch 导入较慢，推迟到第一次真正需要时
+    import torch
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    compute_type = "float16" if device == "cuda" else cpu_tuning()["compute_type"]
+    return device, compute_type
+
+
+@dataclass
+class ModelEntry:
+    """注册表中的一个已加载模型"""
+    model: Any  # faster_whisper.WhisperModel
+    load_seconds: float
+    rss_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    in_use: int = 0
+    hits: int = 0
+
+
+class ModelRegistry:
+    """进程级 Whisper 模型注册表
+
+    按 (模型名, 设备, 计算精度) 只加载一次，并发任务共享同一个实例。
+    """
+
+    def __init__(self, download_root: str = MODEL_DOWNLOAD_ROOT):
+        self.download_root = download_root
+        # CPU 线程数和并发 worker 数取自调优结果
+        tuning = cpu_tuning()
+        self.model_kwargs = {
+            "num_workers": tuning["num_workers"],
+            "cpu_threads": tuning["cpu_threads"]
+        }
+        self._entries: Dict[ModelKey, ModelEntry] = {}
+        self._lock = threading.Lock()
+        # 每个 key 一把加载锁，避免同一模型被并发重复加载
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+    def _key(
+        self,
+        model_name: str,
+        device: Optional[str],
+        compute_type: Optional[str]
+    ) -> ModelKey:
+        if device is None:
+            device, default_compute = default_device()
+        else:
+            default_compute = "float16" if device == "cuda" else cpu_tuning()["compute_type"]
+        return model_name, device, compute_type or default_compute
+
+    def get(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None
+    ):
+        """获取共享模型，不存在时加载"""
+        return self._get_entry(self._key(model_name, device, compute_type)).model
+
+    def _get_entry(self, key: ModelKey) -> ModelEntry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+        entry.hits += 1
+        return entry
+
+    @contextmanager
+    def acquire(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None
+    ):
+        """在任务期间持有模型引用，用于统计并发使用情况"""
+        entry = self._get_entry(self._key(model_name, device, compute_type))
+        with self._lock:
+            entry.in_use += 1
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+
+    def _load(self, key: ModelKey) -> ModelEntry:
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # 等锁期间可能已被其他线程加载
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+
+            from faster_whisper import WhisperModel
+
+            model_name, device, compute_type = key
+            logger.info(f"Loading Whisper model '{model_name}' on {device} ({compute_type})")
+
+            rss_before = _current_rss()
+            start = time.perf_counter()
+            model = WhisperModel(
+                model_size_or_path=model_name,
+                device=device,
+                compute_type=compute_type,
+                download_root=self.download_root,
+                **self.model_kwargs
+            )
+            load_seconds = time.perf_counter() - start
+            rss_bytes = max(_current_rss() - rss_before, 0)
+
+            entry = ModelEntry(model=model, load_seconds=load_seconds, rss_bytes=rss_bytes)
+            with self._lock:
+                self._entries[key] = entry
+
+            logger.info(
+                f"Model '{model_name}' loaded in {load_seconds:.2f}s, "
+                f"RSS +{rss_bytes / 1024**2:.1f}MB"
+            )
+            return entry
+
+    def unload(self, model_name: str, device: Optional[str] = None, compute_type: Optional[str] = None) -> bool:
+        """卸载空闲模型，正在使用时不卸载"""
+        key = self._key(model_name, device, compute_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.in_use > 0:
+                return False
+            del self._entries[key]
+        return True
+
+    def stats(self) -> List[dict]:
+        """返回每个已加载模型的加载耗时和内存占用"""
+        with self._lock:
+            items = list(self._entries.items())
+        return [
+            {
+                "model": model_name,
+                "device": device,
+                "compute_type": compute_type,
+                "load_seconds": round(entry.load_seconds, 3),
+                "rss_mb": round(entry.rss_bytes / 1024**2, 1),
+                "in_use": entry.in_use,
+                "hits": entry.hits,
+                "loaded_at": entry.loaded_at,
+            }
+            for (model_name, device, compute_type), entry in items
+        ]
+
+
+# 进程内共享的注册表
+model_registry = ModelRegistry()
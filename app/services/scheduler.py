@@ -0,0 +1,238 @@
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.transcription import TranscriptionTask
+
+logger = logging.getLogger(__name__)
+
+# 目标周转时间（秒），为 0 时不做降级
+SLA_SECONDS = float(os.getenv("TRANSCRIPTION_SLA_SECONDS", "1800"))
+# 至少按多少个 worker 估算排队等待时间
+MIN_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "1"))
+
+# 各模型在 CPU int8 下的大致实时率（处理耗时 / 音频时长）
+MODEL_RTF: Dict[str, float] = {
+    "large-v3": 1.0,
+    "large-v2": 1.0,
+    "medium": 0.55,
+    "turbo": 0.45,
+    "distil-large-v3": 0.4,
+    "small": 0.2,
+    "base": 0.08,
+    "tiny": 0.04,
+}
+# 未知模型按最慢估算
+DEFAULT_RTF = 1.0
+
+# 统计历史实时率的时间窗口（秒），样本足够时用实测值代替上面的估计值
+RTF_HISTORY_SECONDS = int(os.getenv("TRANSCRIPTION_RTF_HISTORY_SECONDS", str(7 * 24 * 3600)))
+RTF_MIN_SAMPLES = 3
+# 历史实时率在进程内缓存的时间（秒），避免每次查询状态都做聚合
+RTF_CACHE_SECONDS = 60
+_rtf_cache: Tuple[float, Dict[str, float]] = (float("-inf"), {})
+
+# 降级顺序，从慢到快
+MODEL_LADDER: List[str] = sorted(MODEL_RTF, key=MODEL_RTF.get, reverse=True)
+
+# 英文专用模型遇到其他语言时换用的多语言模型
+MULTILINGUAL_FALLBACK: Dict[str, str] = {
+    "distil-large-v3": "turbo",
+    "distil-large-v2": "large-v2",
+    "distil-medium.en": "medium",
+    "distil-small.en": "small",
+}
+
+# 按语言指定模型，例如 "zh:large-v3,ja:medium"
+LANGUAGE_MODELS: Dict[str, str] = dict(
+    item.strip().split(":", 1)
+    for item in os.getenv("TRANSCRIPTION_LANGUAGE_MODELS", "").split(",")
+    if ":" in item
+)
+
+
+def is_english_only(model: str) -> bool:
+    return model.endswith(".en") or model.startswith("distil-")
+
+
+def route_model(model: Optional[str], language: Optional[str]) -> Optional[str]:
+    """按语言选择模型：优先使用为该语言配置的模型，英文专用模型遇到其他语言时换用多语言模型"""
+    if not language:
+        return model
+    if language in LANGUAGE_MODELS:
+        return LANGUAGE_MODELS[language]
+    if model and language != "en" and is_english_only(model):
+        if model in MULTILINGUAL_FALLBACK:
+            return MULTILINGUAL_FALLBACK[model]
+        return model[:-3] if model.endswith(".en") else "large-v3"
+    return model
+
+
+# 只转录语音部分，有语音区间图时按语音时长估算
+_work_duration = func.coalesce(TranscriptionTask.speech_duration, TranscriptionTask.duration)
+
+
+def historical_rtf(db: Session) -> Dict[str, float]:
+    """各模型最近完成任务的实测实时率（转录耗时 / 语音时长）"""
+    global _rtf_cache
+    cached_at, rates = _rtf_cache
+    if time.monotonic() - cached_at < RTF_CACHE_SECONDS:
+        return rates
+
+    since = datetime.utcnow() - timedelta(seconds=RTF_HISTORY_SECONDS)
+    rows = db.query(
+        TranscriptionTask.model,
+        func.sum(TranscriptionTask.processing_seconds),
+        func.sum(_work_duration),
+        func.count(TranscriptionTask.id)
+    ).filter(
+        TranscriptionTask.status == "success",
+        TranscriptionTask.processing_seconds.isnot(None),
+        # 级联任务包含精修耗时，不代表单个模型的速度
+        TranscriptionTask.cascade_model.is_(None),
+        _work_duration > 0,
+        TranscriptionTask.updated_at >= since
+    ).group_by(TranscriptionTask.model).all()
+
+    rates = {
+        model: float(seconds) / float(duration)
+        for model, seconds, duration, count in rows
+        if model and count >= RTF_MIN_SAMPLES and duration
+    }
+    _rtf_cache = (time.monotonic(), rates)
+    return rates
+
+
+def model_rtf(model: Optional[str], rates: Optional[Dict[str, float]] = None) -> float:
+    model = model or "base"
+    if rates and model in rates:
+        return rates[model]
+    return MODEL_RTF.get(model, DEFAULT_RTF)
+
+
+def estimate_seconds(
+    model: Optional[str],
+    duration: Optional[float],
+    rates: Optional[Dict[str, float]] = None
+) -> float:
+    """估算某个模型转录给定时长音频所需的时间，rates 为历史实时率"""
+    return (duration or 0) * model_rtf(model, rates)
+
+
+def work_duration(task: TranscriptionTask) -> Optional[float]:
+    """任务需要转录的时长：有语音区间图时为语音时长，否则为音频时长"""
+    if task.speech_duration is not None:
+        return task.speech_duration
+    return task.duration
+
+
+def remaining_seconds(task: TranscriptionTask, rates: Optional[Dict[str, float]] = None) -> float:
+    """估算任务自身还需要的处理时间"""
+    return estimate_seconds(task.model, work_duration(task), rates) * (1 - (task.progress or 0) / 100)
+
+
+def backlog_seconds(db: Session, exclude_id: Optional[int] = None) -> float:
+    """估算队列中所有未完成任务还需要的处理时间"""
+    rates = historical_rtf(db)
+    query = db.query(
+        TranscriptionTask.model,
+        _work_duration,
+        TranscriptionTask.progress
+    ).filter(TranscriptionTask.status.in_(("pending", "processing")))
+    if exclude_id is not None:
+        query = query.filter(TranscriptionTask.id != exclude_id)
+    return sum(
+        estimate_seconds(model, duration, rates) * (1 - (progress or 0) / 100)
+        for model, duration, progress in query
+    )
+
+
+def active_workers(db: Session) -> int:
+    """租约未过期的 worker 数量，不少于配置值"""
+    count = db.query(
+        func.count(func.distinct(TranscriptionTask.worker_id))
+    ).filter(
+        TranscriptionTask.status == "processing",
+        TranscriptionTask.lease_expires_at > datetime.utcnow()
+    ).scalar() or 0
+    return max(count, MIN_WORKERS, 1)
+
+
+def queue_position(db: Session, task: TranscriptionTask) -> Tuple[int, float]:
+    """估算排队位置和预计等待时间（秒）
+
+    优先级更高或同优先级更早提交的排队任务视为排在前面，再加上正在处理任务的
+    剩余时间。同一优先级内的公平调度会让实际顺序略有不同。
+    """
+    priority = func.coalesce(TranscriptionTask.priority, 1)
+    task_priority = 1 if task.priority is None else task.priority
+    rates = historical_rtf(db)
+    rows = db.query(
+        TranscriptionTask.status,
+        TranscriptionTask.model,
+        _work_duration,
+        TranscriptionTask.progress
+    ).filter(
+        TranscriptionTask.id != task.id,
+        or_(
+            TranscriptionTask.status == "processing",
+            and_(
+                TranscriptionTask.status == "pending",
+                or_(
+                    priority < task_priority,
+                    and_(
+                        priority == task_priority,
+                        TranscriptionTask.created_at < task.created_at
+                    )
+                )
+            )
+        )
+    ).all()
+
+    position = sum(1 for status, _, _, _ in rows if status == "pending")
+    remaining = sum(
+        estimate_seconds(model, duration, rates) * (1 - (progress or 0) / 100)
+        for _, model, duration, progress in rows
+    )
+    return position, remaining / active_workers(db)
+
+
+def schedule_model(db: Session, task: TranscriptionTask) -> None:
+    """根据需要转录的时长和当前积压为任务选择模型
+
+    只会在请求的模型基础上降级：预计周转时间超过 SLA 时依次换用更快的模型，
+    都无法满足时使用最快的模型。选择结果和原因记录在任务上。
+    """
+    requested = task.model or "base"
+    task.requested_model = requested
+    duration = work_duration(task)
+
+    if not SLA_SECONDS or not duration or requested not in MODEL_LADDER:
+        task.schedule_reason = "requested"
+        return
+
+    rates = historical_rtf(db)
+    wait = backlog_seconds(db, exclude_id=task.id) / active_workers(db)
+    candidates = [
+        model for model in MODEL_LADDER[MODEL_LADDER.index(requested):]
+        if model == requested or not (is_english_only(model) and task.language != "en")
+    ]
+
+    chosen = candidates[-1]
+    for model in candidates:
+        if wait + estimate_seconds(model, duration, rates) <= SLA_SECONDS:
+            chosen = model
+            break
+
+    task.model = chosen
+    task.schedule_reason = (
+        f"duration={duration:.0f}s wait={wait:.0f}s "
+        f"eta={wait + estimate_seconds(chosen, duration, rates):.0f}s sla={SLA_SECONDS:.0f}s"
+    )
+    if chosen != requested:
+        logger.info(f"Downgraded task model {requested} -> {chosen}: {task.schedule_reason}")
@@ -0,0 +1,151 @@
+import os
+import bisect
+import logging
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.segment_codec import encode_intervals, segment_dict
+from app.models.media_analysis import MediaAnalysis
+from app.services.audio_cache import SAMPLE_RATE, audio_duration
+
+logger = logging.getLogger(__name__)
+
+# 语音总时长低于该值（秒）的文件视为静音，直接完成不再转录
+MIN_SPEECH_SECONDS = float(os.getenv("TRANSCRIPTION_MIN_SPEECH_SECONDS", "1.0"))
+# 与转录时 VAD 的参数保持一致
+VAD_MIN_SILENCE_MS = 500
+VAD_SPEECH_PAD_MS = 400
+
+Interval = Tuple[float, float]
+
+
+def detect_speech(audio: np.ndarray) -> List[Interval]:
+    """只运行 VAD，返回语音区间 [(开始, 结束), ...]（秒）"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    options = VadOptions(
+        min_silence_duration_ms=VAD_MIN_SILENCE_MS,
+        speech_pad_ms=VAD_SPEECH_PAD_MS
+    )
+    return [
+        (speech["start"] / SAMPLE_RATE, speech["end"] / SAMPLE_RATE)
+        for speech in get_speech_timestamps(audio, options)
+    ]
+
+
+def total_speech(intervals: List[Interval]) -> float:
+    return sum(end - start for start, end in intervals)
+
+
+def clip_intervals(
+    intervals: List[Interval],
+    start: float = 0.0,
+    end: Optional[float] = None
+) -> List[Interval]:
+    """截取落在 [start, end) 内的部分，用于从检查点继续或按分片转录"""
+    clipped = []
+    for s, e in intervals:
+        s, e = max(s, start), e if end is None else min(e, end)
+        if e > s:
+            clipped.append((s, e))
+    return clipped
+
+
+def is_silent(analysis: MediaAnalysis) -> bool:
+    return (analysis.speech_seconds or 0.0) < MIN_SPEECH_SECONDS
+
+
+def analyze_speech(db: Session, content_hash: Optional[str], audio: np.ndarray) -> MediaAnalysis:
+    """按内容指纹缓存语音区间图，同一文件只运行一次 VAD"""
+    analysis = None
+    if content_hash:
+        analysis = db.query(MediaAnalysis).filter(
+            MediaAnalysis.content_hash == content_hash
+        ).first()
+        if analysis is not None and analysis.speech_map is not None:
+            return analysis
+
+    intervals = detect_speech(audio)
+    if analysis is None:
+        analysis = MediaAnalysis(content_hash=content_hash)
+    analysis.duration = audio_duration(audio)
+    analysis.speech_seconds = total_speech(intervals)
+    analysis.speech_map = encode_intervals(intervals)
+    logger.info(
+        f"Speech map for {content_hash}: {len(intervals)} intervals, "
+        f"{analysis.speech_seconds:.0f}s speech of {analysis.duration:.0f}s"
+    )
+    if not content_hash:
+        return analysis
+
+    # 在保存点内写入，冲突时只回滚这一条，调用方（例如批量转录中前面的任务）的修改不受影响
+    try:
+        with db.begin_nested():
+            db.add(analysis)
+    except IntegrityError:
+        # 其他进程同时写入了同一内容的结果
+        logger.info(f"Speech map for {content_hash} was written concurrently")
+    db.commit()
+    return analysis
+
+
+def cached_analysis(db: Session, content_hash: Optional[str]) -> Optional[MediaAnalysis]:
+    """查询相同内容已生成的语音区间图，不解码音频；没有时返回 None"""
+    if not content_hash:
+        return None
+    return db.query(MediaAnalysis).filter(
+        MediaAnalysis.content_hash == content_hash,
+        MediaAnalysis.speech_map.isnot(None)
+    ).first()
+
+
+class SpeechTimeline:
+    """把语音区间拼接成一段连续音频，并把拼接后的时间映射回原音频"""
+
+    def __init__(self, intervals: List[Interval], total_samples: int):
+        self.spans = []
+        self.offsets = []  # 每个区间在拼接音频中的起点（秒）
+        position = 0
+        for start, end in intervals:
+            s = min(int(start * SAMPLE_RATE), total_samples)
+            e = min(int(end * SAMPLE_RATE), total_samples)
+            if e <= s:
+                continue
+            self.spans.append((s, e))
+            self.offsets.append(position / SAMPLE_RATE)
+            position += e - s
+        self.duration = position / SAMPLE_RATE
+
+    def audio(self, audio: np.ndarray) -> np.ndarray:
+        return np.concatenate([audio[s:e] for s, e in self.spans]).astype(np.float32)
+
+    def original_time(self, time: float, end: bool = False) -> float:
+        # 结束时间正好落在两个区间交界处时归到前一个区间
+        find = bisect.bisect_left if end else bisect.bisect_right
+        index = max(find(self.offsets, time) - 1, 0)
+        s, e = self.spans[index]
+        return min(s / SAMPLE_RATE + time - self.offsets[index], e / SAMPLE_RATE)
+
+
+def transcribe_speech(model, audio: np.ndarray, intervals: List[Interval], **options):
+    """只把语音区间拼接后送入模型，返回 (映射回原时间轴的片段迭代器, info)
+
+    intervals 为空时返回 (空迭代器, None)。
+    """
+    timeline = SpeechTimeline(intervals, len(audio))
+    if not timeline.spans:
+        return iter(()), None
+
+    segments, info = model.transcribe(timeline.audio(audio), vad_filter=False, **options)
+
+    def remap() -> Iterator[dict]:
+        for segment in segments:
+            item = segment_dict(segment)
+            item["start"] = timeline.original_time(item["start"])
+            item["end"] = timeline.original_time(item["end"], end=True)
+            yield item
+
+    return remap(), info
@@ -3,9 +3,12 @@ import logging
 from sqlalchemy.orm import Session
 from app.models.summary import VideoSummary, SummaryType
 from app.models.video_source import VideoTranscript
-from transformers import AutoTokenizer, MarianMTModel
-import torch
+from app.services.text_splitter import split_segments, split_text
+from app.services.summary_cache import cache_key, summary_cache, text_hash
+from app.services.summary_batcher import SummaryBatcher
+from app.services.events import publish_summary
 import os
+import threading
 from dotenv import load_dotenv
 import warnings
 
@@ -18,32 +21,151 @@ logger = logging.getLogger(__name__)
 # 加载环境变量
 load_dotenv("app/.env")
 
+# 使用中文翻译模型
+SUMMARY_MODEL_NAME = "Helsinki-NLP/opus-mt-zh-en"
+# MarianMT 单次输入的最大 token 数
+MAX_INPUT_TOKENS = 512
+# 一次 generate 最多处理的分段数，也是微批处理一批最多合并的分段数
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+# map-reduce 最多归约的轮数
+MAX_REDUCE_ROUNDS = 4
+# 生成参数
+GENERATION_KWARGS = dict(num_beams=4, length_penalty=2.0, early_stopping=True)
+
 class SummaryService:
     def __init__(self):
         # 设置模型缓存目录
         os.environ['TRANSFORMERS_CACHE'] = './models'
         os.environ['HF_HOME'] = './models'
-        
-        # 初始化模型
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        try:
-            # 使用中文翻译模型
-            model_name = "Helsinki-NLP/opus-mt-zh-en"
-            
-            # 分别加载tokenizer和模型
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                model_name,
-                local_files_only=True  # 只使用本地文件
-            )
-            self.model = MarianMTModel.from_pretrained(
-                model_name,
-                local_files_only=True  # 只使用本地文件
-            ).to(self.device)
-            
-        except Exception as e:
-            logger.error(f"Error initializing models: {str(e)}")
-            raise
+
+        # 模型在第一次使用时才加载，避免拖慢应用启动
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+        self.device = None
+        # 未配置情感分析模型时摘要不包含情感分布
+        self.sentiment_analyzer = None
+        # 并发请求的分段合并成批，统一在一个线程中推理
+        self.batcher = SummaryBatcher(self._generate_batch, max_batch=SUMMARY_BATCH_SIZE)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def tokenizer(self):
+        self.load()
+        return self._tokenizer
+
+    @property
+    def model(self):
+        self.load()
+        return self._model
+
+    def load(self) -> None:
+        """加载 tokenizer 和模型，多次调用只加载一次"""
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            # transformers 和 torch 导入较慢，推迟到真正需要时
+            from transformers import AutoTokenizer, MarianMTModel
+            import torch
+
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            try:
+                model_name = SUMMARY_MODEL_NAME
+
+                # 分别加载tokenizer和模型
+                self._tokenizer = AutoTokenizer.from_pretrained(
+                    model_name,
+                    local_files_only=True  # 只使用本地文件
+                )
+                self._model = MarianMTModel.from_pretrained(
+                    model_name,
+                    local_files_only=True  # 只使用本地文件
+                ).to(self.device)
+
+            except Exception as e:
+                logger.error(f"Error initializing models: {str(e)}")
+                raise
+
+    def _generate_batch(self, texts: List[str], max_length: int) -> List[str]:
+        """一次 generate 处理整批，结果与输入一一对应
+
+        批大小由 batcher 控制（不超过 SUMMARY_BATCH_SIZE），输入只补齐到本批最长的分段。
+        """
+        import torch
+
+        if not texts:
+            return []
+        input_ids = self.tokenizer(
+            texts, truncation=True, max_length=MAX_INPUT_TOKENS
+        )["input_ids"]
+        batch = self.tokenizer.pad({"input_ids": input_ids}, return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(**batch, max_length=max_length, **GENERATION_KWARGS)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def summarize(
+        self,
+        text: str,
+        max_length: int = 150,
+        segments: Optional[List[dict]] = None
+    ) -> str:
+        """分层 map-reduce 摘要
+
+        先批量为每个分段生成部分摘要，再把部分摘要拼接后重新分段归约，直到一段能放下。
+        每轮输入缩小为上一轮的 max_length / MAX_INPUT_TOKENS 左右，总耗时与文本长度成正比。
+        提供转录片段时第一轮按片段边界分段。
+        """
+        if segments:
+            chunks = split_segments(self.tokenizer, segments, MAX_INPUT_TOKENS)
+        else:
+            chunks = self._split_text(text)
+        for _ in range(MAX_REDUCE_ROUNDS):
+            partials = [summary for summary in self.batcher.generate(chunks, max_length) if summary]
+            if len(partials) <= 1:
+                return partials[0] if partials else ""
+            combined = "\n".join(partials)
+            next_chunks = self._split_text(combined)
+            # 部分摘要已经放不下更少的分段时不再归约
+            if len(next_chunks) >= len(chunks):
+                return combined
+            chunks = next_chunks
+        # 达到轮数上限仍有多段时，拼接后截断到单次输入上限再摘要一次
+        logger.warning(
+            f"Summary still has {len(chunks)} chunks after {MAX_REDUCE_ROUNDS} reduce rounds, "
+            f"truncating to {MAX_INPUT_TOKENS} tokens"
+        )
+        final = self.batcher.generate(["\n".join(chunks)], max_length)
+        return final[0] if final else ""
+
+    def _cache_key(self, text: str, max_length: int, summary_type: Optional[SummaryType]) -> str:
+        params = dict(GENERATION_KWARGS, max_input_tokens=MAX_INPUT_TOKENS)
+        return cache_key(text, SUMMARY_MODEL_NAME, summary_type, max_length, params)
+
+    def _cache_attrs(self, text: str, max_length: int, summary_type: Optional[SummaryType]) -> dict:
+        return dict(
+            text_hash=text_hash(text),
+            model=SUMMARY_MODEL_NAME,
+            summary_type=getattr(summary_type, "value", summary_type),
+            max_length=max_length
+        )
+
+    def summarize_cached(self, text: str, max_length: int = 150, db: Optional[Session] = None) -> str:
+        """带缓存的文本摘要，相同文本和参数只生成一次；没有数据库会话时只用进程内缓存"""
+        key = self._cache_key(text, max_length, None)
+        cached = summary_cache.get(key, db)
+        if cached is not None:
+            return cached["summary"]
+        summary = self.summarize(text, max_length)
+        summary_cache.put(key, {"summary": summary}, db, **self._cache_attrs(text, max_length, None))
+        if db is not None:
+            db.commit()
+        return summary
 
     def generate_summary(
         self,
@@ -54,34 +176,23 @@ class SummaryService:
         user_id: Optional[int] = None,
         summary_type: Optional[SummaryType] = None,
         db: Optional[Session] = None
-    ) -> str:
-        """生成文本摘要"""
+    ):
+        """生成文本摘要；提供转录记录和数据库会话时生成并保存视频摘要"""
         try:
             # 如果提供了数据库相关参数，则是视频摘要模式
-            if all([transcript_id, source_id, user_id, summary_type, db]):
+            if all([transcript_id, user_id, summary_type, db]):
                 return self._generate_video_summary(
                     transcript_id=transcript_id,
                     source_id=source_id,
                     user_id=user_id,
                     summary_type=summary_type,
-                    db=db
+                    db=db,
+                    max_length=max_length
                 )
-            
-            # 否则是普通文本摘要模式
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-            inputs = inputs.to(self.device)
-            
-            outputs = self.model.generate(
-                **inputs,
-                max_length=max_length,
-                num_beams=4,
-                length_penalty=2.0,
-                early_stopping=True
-            )
-            
-            summary = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return summary
-            
+
+            # 否则是普通文本摘要模式，长文本分段后归约，不再截断
+            return self.summarize_cached(text, max_length, db)
+
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
             raise
@@ -89,40 +200,95 @@ class SummaryService:
     def _generate_video_summary(
         self,
         transcript_id: int,
-        source_id: int,
+        source_id: Optional[int],
         user_id: int,
         summary_type: SummaryType,
-        db: Session
+        db: Session,
+        max_length: int = 150
     ) -> VideoSummary:
         """生成视频摘要"""
-        # ... 原有的视频摘要生成逻辑 ...
-        pass
-
-    def _split_text(self, text: str, max_length: int = 1024) -> List[str]:
-        """长文本分割成小段"""
-        sentences = text.split("。")
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for sentence in sentences:
-            sentence_length = len(sentence)
-            if current_length + sentence_length > max_length:
-                chunks.append("。".join(current_chunk) + "。")
-                current_chunk = [sentence]
-                current_length = sentence_length
+        try:
+            # 获取转录文本
+            transcript = db.query(VideoTranscript).filter(
+                VideoTranscript.id == transcript_id
+            ).first()
+
+            if not transcript or not transcript.text:
+                raise ValueError("No transcript text available")
+
+            # 创建摘要记录
+            summary = new_summary(transcript, user_id, summary_type, source_id)
+            db.add(summary)
+            db.commit()
+            db.refresh(summary)
+
+            return self.run_video_summary(summary, db, max_length)
+
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            db.rollback()
+            raise
+
+    def run_video_summary(self, summary: VideoSummary, db: Session, max_length: int = 150) -> VideoSummary:
+        """为已创建的摘要记录生成内容，状态依次变为 processing、success 或 error 并发布事件"""
+        summary.status = "processing"
+        summary.error = None
+        publish_summary(db, summary)
+        db.commit()
+
+        try:
+            transcript = db.query(VideoTranscript).filter(
+                VideoTranscript.id == summary.transcript_id
+            ).first()
+            if not transcript or not transcript.text:
+                raise ValueError("No transcript text available")
+
+            # 相同内容（即使来自其他转录记录）和参数的结果直接复用
+            key = self._cache_key(transcript.text, max_length, summary.summary_type)
+            result = summary_cache.get(key, db)
+            if result is None:
+                result = {
+                    # 分段批量生成后归约
+                    "summary": self.summarize(
+                        transcript.text, max_length, segments=transcript.segments
+                    ),
+                    "key_points": self._generate_key_points(transcript.text),
+                    "topics": self._extract_topics(transcript.text),
+                    "sentiment": self._analyze_sentiment(transcript.text),
+                }
+                summary_cache.put(
+                    key, result, db,
+                    **self._cache_attrs(transcript.text, max_length, summary.summary_type)
+                )
             else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
-        
-        if current_chunk:
-            chunks.append("。".join(current_chunk) + "。")
-        
-        return chunks
+                logger.info(f"Summary cache hit for transcript {transcript.id}")
 
-    def _analyze_sentiment(self, text: str) -> Dict:
+            for field, value in result.items():
+                setattr(summary, field, value)
+            summary.status = "success"
+            publish_summary(db, summary)
+            db.commit()
+            db.refresh(summary)
+
+        except Exception as e:
+            db.rollback()
+            summary.status = "error"
+            summary.error = str(e)
+            publish_summary(db, summary)
+            db.commit()
+            raise
+
+        return summary
+
+    def _split_text(self, text: str, max_tokens: int = MAX_INPUT_TOKENS) -> List[str]:
+        """按中英文句末标点切分，用模型的 tokenizer 计数装箱成不超过 max_tokens 的分段"""
+        return split_text(self.tokenizer, text, max_tokens)
+
+    def _analyze_sentiment(self, text: str) -> Optional[Dict]:
         """分析文本情感"""
-        chunks = self._split_text(text, max_length=512)
+        if self.sentiment_analyzer is None:
+            return None
+        chunks = self._split_text(text, max_tokens=512)
         sentiments = []
         for chunk in chunks:
             result = self.sentiment_analyzer(chunk)
@@ -148,78 +314,21 @@ class SummaryService:
         # TODO: 实现关键点提取
         return ["关键点1", "关键点2"]
 
-    async def generate_summary(
-        self,
-        transcript_id: int,
-        source_id: Optional[int],
-        user_id: int,
-        summary_type: SummaryType,
-        db: Session
-    ) -> Optional[VideoSummary]:
-        """生成视频摘要"""
-        try:
-            # 获取转录文本
-            transcript = db.query(VideoTranscript).filter(
-                VideoTranscript.id == transcript_id
-            ).first()
-            
-            if not transcript or not transcript.text:
-                raise ValueError("No transcript text available")
-
-            # 创建摘要记录
-            summary = VideoSummary(
-                transcript_id=transcript_id,
-                source_id=source_id or transcript.source_id,  # 从转录记录中获取
-                user_id=user_id,
-                title=transcript.title,
-                summary_type=summary_type,
-                status="processing"
-            )
-            
-            db.add(summary)
-            db.commit()
-            db.refresh(summary)
+def new_summary(
+    transcript: VideoTranscript,
+    user_id: int,
+    summary_type: SummaryType,
+    source_id: Optional[int] = None
+) -> VideoSummary:
+    """为转录记录创建一条摘要记录，尚未生成内容"""
+    return VideoSummary(
+        transcript_id=transcript.id,
+        source_id=source_id or transcript.source_id,  # 从转录记录中获取
+        user_id=user_id,
+        title=transcript.title,
+        summary_type=summary_type,
+        status="pending"
+    )
 
-            try:
-                # 分段处理长文本
-                text_chunks = self._split_text(transcript.text)
-                
-                # 生成摘要
-                summaries = []
-                for chunk in text_chunks:
-                    result = self.summarizer(chunk, max_length=150, min_length=30)
-                    summaries.extend(result)
-                
-                # 合并摘要
-                final_summary = " ".join(s["summary_text"] for s in summaries)
-                
-                # 提取关键点
-                key_points = self._generate_key_points(transcript.text)
-                
-                # 提取主题
-                topics = self._extract_topics(transcript.text)
-                
-                # 情感分析
-                sentiment = self._analyze_sentiment(transcript.text)
-                
-                # 更新摘要记录
-                summary.summary = final_summary
-                summary.key_points = key_points
-                summary.topics = topics
-                summary.sentiment = sentiment
-                summary.status = "success"
-                db.commit()
-                db.refresh(summary)
-
-            except Exception as e:
-                summary.status = "error"
-                summary.error = str(e)
-                db.commit()
-                raise
-
-            return summary
-
-        except Exception as e:
-            logger.error(f"Error generating summary: {str(e)}")
-            db.rollback()
-            raise 
\ No newline at end of file
+# 进程内共享的摘要服务，模型在首次使用或预热时加载
+summary_service = SummaryService()
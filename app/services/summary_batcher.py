@@ -0,0 +1,96 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 收到第一个分段后最多等待多久凑批（毫秒）
+SUMMARY_MAX_WAIT_MS = float(os.getenv("SUMMARY_MAX_WAIT_MS", "10"))
+
+GenerateFn = Callable[[List[str], int], List[str]]
+
+
+@dataclass
+class _Request:
+    text: str
+    max_length: int
+    future: Future = field(default_factory=Future)
+
+
+class SummaryBatcher:
+    """摘要模型的动态微批处理
+
+    各请求提交的分段进入同一个队列，后台线程收到第一个分段后最多等待 max_wait_ms 或凑满
+    max_batch 个，合并成一批调用一次 generate，再把结果分发回各自的 Future。所有推理都在
+    这一个线程中进行，并发请求不再各自争抢 CPU。
+    """
+
+    def __init__(
+        self,
+        generate: GenerateFn,
+        max_batch: int = 8,
+        max_wait_ms: float = SUMMARY_MAX_WAIT_MS
+    ):
+        self.generate_batch = generate
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, texts: List[str], max_length: int) -> List[Future]:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="summary-batcher", daemon=True)
+                self._thread.start()
+        requests = [_Request(text, max_length) for text in texts]
+        for request in requests:
+            self._queue.put(request)
+        return [request.future for request in requests]
+
+    def generate(self, texts: List[str], max_length: int) -> List[str]:
+        """提交分段并等待结果，结果与输入一一对应"""
+        return [future.result() for future in self.submit(texts, max_length)]
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # 队列中已有的分段不必等待
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _execute(self, batch: List[_Request]) -> None:
+        # generate 的 max_length 对整批生效，按它分组
+        groups = defaultdict(list)
+        for request in batch:
+            if request.future.set_running_or_notify_cancel():
+                groups[request.max_length].append(request)
+
+        for max_length, requests in groups.items():
+            try:
+                results = self.generate_batch([request.text for request in requests], max_length)
+            except Exception as e:
+                logger.error(f"Summary batch of {len(requests)} failed: {str(e)}")
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            self._execute(batch)
+            logger.debug(f"Summary batch of {len(batch)} took {time.perf_counter() - start:.3f}s")
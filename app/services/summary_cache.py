@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.summary_cache import SummaryCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# 进程内 LRU 缓存的条目数，0 表示只使用数据库
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "256"))
+
+# 缓存的摘要结果字段
+RESULT_FIELDS = ("summary", "key_points", "topics", "sentiment")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    text: str,
+    model: str,
+    summary_type: Optional[Any],
+    max_length: int,
+    params: Dict[str, Any]
+) -> str:
+    """由文本内容、模型、摘要类型、长度和生成参数得到缓存键"""
+    raw = json.dumps({
+        "text": text_hash(text),
+        "model": model,
+        "type": getattr(summary_type, "value", summary_type),
+        "max_length": max_length,
+        "params": params,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """摘要结果缓存：进程内 LRU 在前，数据库表在后，多个进程共享数据库中的结果"""
+
+    def __init__(self, maxsize: int = SUMMARY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+        """查找缓存结果，没有数据库会话时只查进程内缓存"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return dict(result)
+        if db is None:
+            return None
+
+        entry = db.query(SummaryCacheEntry).filter(SummaryCacheEntry.cache_key == key).first()
+        if entry is None:
+            return None
+        result = {field: getattr(entry, field) for field in RESULT_FIELDS}
+        self._remember(key, result)
+        return dict(result)
+
+    def put(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        db: Optional[Session] = None,
+        **attrs
+    ) -> None:
+        """保存结果，attrs 为记录在数据库中的键组成部分（text_hash、model 等），便于排查
+
+        数据库记录只 flush，不提交，由调用方提交。
+        """
+        result = {field: result.get(field) for field in RESULT_FIELDS}
+        self._remember(key, result)
+        if db is None:
+            return
+
+        # 在保存点内写入，冲突时只回滚这一条，不影响调用方会话中的其他修改；随调用方一起提交
+        try:
+            with db.begin_nested():
+                db.add(SummaryCacheEntry(cache_key=key, **attrs, **result))
+        except IntegrityError:
+            # 其他进程已写入相同的结果
+            logger.debug(f"Summary cache entry {key} already exists")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.summary import VideoSummary
+from app.services.events import publish_summary
+from app.services.summary import summary_service
+
+logger = logging.getLogger(__name__)
+
+# 同时执行的摘要任务数，推理本身由 summary_service.batcher 串行合批
+SUMMARY_JOB_WORKERS = int(os.getenv("SUMMARY_JOB_WORKERS", "4"))
+# 处理中的摘要超过该时长（秒）未更新，视为所在进程已退出，可以重新领取
+SUMMARY_STALE_SECONDS = int(os.getenv("SUMMARY_STALE_SECONDS", "1800"))
+
+# 摘要任务在后台线程中执行，不占用事件循环
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_JOB_WORKERS, thread_name_prefix="summary-job")
+
+
+def enqueue(db: Session, summary: VideoSummary) -> VideoSummary:
+    """把摘要记录置为排队状态并提交到后台执行，立即返回"""
+    summary.status = "pending"
+    summary.error = None
+    db.add(summary)
+    db.flush()
+    publish_summary(db, summary)
+    db.commit()
+    db.refresh(summary)
+    _executor.submit(run_job, summary.id)
+    return summary
+
+
+def _claimable():
+    """可领取的摘要：排队中，或长时间未更新的处理中记录"""
+    stale = datetime.utcnow() - timedelta(seconds=SUMMARY_STALE_SECONDS)
+    return or_(
+        VideoSummary.status == "pending",
+        and_(
+            VideoSummary.status == "processing",
+            VideoSummary.updated_at < stale
+        )
+    )
+
+
+def _claim(db: Session, summary_id: int) -> bool:
+    """把可领取的摘要改为处理中，多个进程同时恢复任务时只有一个能领到"""
+    updated = db.query(VideoSummary).filter(
+        VideoSummary.id == summary_id,
+        _claimable()
+    ).update({
+        VideoSummary.status: "processing",
+        VideoSummary.updated_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.commit()
+    return updated > 0
+
+
+def run_job(summary_id: int) -> None:
+    db = SessionLocal()
+    try:
+        if not _claim(db, summary_id):
+            logger.info(f"Summary {summary_id} is no longer claimable, skipping")
+            return
+        summary = db.query(VideoSummary).filter(VideoSummary.id == summary_id).first()
+        summary_service.run_video_summary(summary, db)
+        logger.info(f"Summary {summary_id} finished")
+    except Exception as e:
+        # 错误已记录在摘要记录上
+        logger.error(f"Summary job {summary_id} failed: {str(e)}")
+    finally:
+        db.close()
+
+
+def resume_pending() -> int:
+    """重新提交进程退出前尚未执行或未执行完的摘要，返回提交的数量"""
+    db = SessionLocal()
+    try:
+        summary_ids = [
+            summary_id for (summary_id,) in
+            db.query(VideoSummary.id).filter(_claimable())
+        ]
+    finally:
+        db.close()
+    for summary_id in summary_ids:
+        _executor.submit(run_job, summary_id)
+    if summary_ids:
+        logger.info(f"Resumed {len(summary_ids)} pending or stale summaries")
+    return len(summary_ids)
+
+
+def _watch(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            resume_pending()
+        except Exception as e:
+            logger.error(f"Resuming stale summaries failed: {str(e)}")
+
+
+def watch_stale(interval: float = SUMMARY_STALE_SECONDS) -> threading.Thread:
+    """后台定期重新提交长时间未更新的处理中摘要（所在进程在执行中途退出）"""
+    thread = threading.Thread(target=_watch, args=(interval,), name="summary-reclaim", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,78 @@
+import re
+import math
+import logging
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 句子：以中日文全角句末标点、拉丁句末标点（句点后需跟空白，避免切开小数和缩写）或换行结尾
+_SENTENCE = re.compile(r".*?(?:[。！？；…!?;]+[”’」』）)\"']*|\.(?=\s)|\n|$)", re.S)
+# 分句：句子仍然超长时再按逗号、顿号、冒号切分
+_CLAUSE = re.compile(r".*?(?:[，、,：:]+|$)", re.S)
+
+
+def _pieces(pattern: re.Pattern, text: str) -> List[str]:
+    return [match.group(0) for match in pattern.finditer(text) if match.group(0)]
+
+
+def count_tokens(tokenizer, texts: List[str]) -> List[int]:
+    """一次批量分词，返回各段的 token 数（不含特殊 token）"""
+    if not texts:
+        return []
+    return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+
+def _fit(tokenizer, units: List[str], budget: int) -> Tuple[List[str], List[int]]:
+    """把超出预算的单元依次按句、按分句、按长度切开，返回 (单元, token 数)"""
+    fitted, counts = [], []
+    for unit, count in zip(units, count_tokens(tokenizer, units)):
+        if count <= budget or len(unit) <= 1:
+            if unit.strip():
+                fitted.append(unit)
+                counts.append(count)
+            continue
+        for pattern in (_SENTENCE, _CLAUSE):
+            pieces = _pieces(pattern, unit)
+            if len(pieces) > 1:
+                break
+        else:
+            # 没有任何标点时按 token 密度估算长度等分
+            size = math.ceil(len(unit) / max(math.ceil(count / budget), 2))
+            pieces = [unit[i:i + size] for i in range(0, len(unit), size)]
+        sub_units, sub_counts = _fit(tokenizer, pieces, budget)
+        fitted.extend(sub_units)
+        counts.extend(sub_counts)
+    return fitted, counts
+
+
+def _pack(units: List[str], counts: List[int], budget: int) -> List[str]:
+    """按顺序贪心装箱，每段尽量接近预算"""
+    chunks, current, total = [], [], 0
+    for unit, count in zip(units, counts):
+        if current and total + count > budget:
+            chunks.append("".join(current).strip())
+            current, total = [], 0
+        current.append(unit)
+        total += count
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def split_text(tokenizer, text: str, max_tokens: int) -> List[str]:
+    """按句切分文本并装箱成不超过 max_tokens 个 token 的分段
+
+    max_tokens 包含模型追加的结束符。每个句子只分词一次，耗时与文本长度成正比。
+    """
+    budget = max(max_tokens - 1, 1)
+    units, counts = _fit(tokenizer, _pieces(_SENTENCE, text), budget)
+    return _pack(units, counts, budget)
+
+
+def split_segments(tokenizer, segments: List[dict], max_tokens: int) -> List[str]:
+    """以转录片段为基本单元装箱，只在片段边界处分段，单个片段超长时才切开"""
+    budget = max(max_tokens - 1, 1)
+    # 片段之间换行，与转录全文一致
+    units = [segment["text"].strip() + "\n" for segment in segments]
+    units, counts = _fit(tokenizer, units, budget)
+    return _pack(units, counts, budget)
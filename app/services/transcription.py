@@ -2,25 +2,132 @@ import os
 # 设置环境变量以解决 OpenMP 冲突
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
-from faster_whisper import WhisperModel
-import torch
 from pathlib import Path
 from sqlalchemy.orm import Session
 import logging
 import warnings
+import threading
 import time
 from app.models.transcription import TranscriptionTask
 from app.models.video_source import VideoTranscript
-from typing import Optional
+from app.core.segment_codec import segment_count, segment_dict
+from app.services.events import publish_task
+from app.services.fingerprint import content_fingerprint
+from app.services.language_detection import detect_language_cached
+from app.services.scheduler import route_model
+from app.services.cascade import refine_segments
+from app.services.speech_map import Interval, analyze_speech, clip_intervals, is_silent, transcribe_speech
+from app.services.model_registry import model_registry, default_device
+from app.services.audio_cache import load_audio, audio_duration
+from app.services.chunked_transcription import use_parallel, transcribe_chunked
+from app.schemas.settings import TranscriptionSettings
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
+# 每累计多少个片段或间隔多少秒写一次数据库
+FLUSH_SEGMENTS = int(os.getenv("TRANSCRIPTION_FLUSH_SEGMENTS", "20"))
+FLUSH_SECONDS = float(os.getenv("TRANSCRIPTION_FLUSH_SECONDS", "3"))
+
+
+class TranscriptionCancelled(Exception):
+    """任务在转录过程中被取消或失去租约"""
+
+
+class SegmentWriter:
+    """边转录边分批写入片段和进度
+
+    片段在内存中累积，达到数量或时间阈值时才提交一次，避免进度更新成为数据库热点。
+    设置了 stop_event 时，每个片段之前检查一次，被设置后抛出 TranscriptionCancelled。
+    """
+
+    def __init__(
+        self,
+        task: TranscriptionTask,
+        db: Session,
+        duration: float,
+        segments: Optional[list] = None,
+        batch_size: int = FLUSH_SEGMENTS,
+        interval: float = FLUSH_SECONDS,
+        stop_event: Optional[threading.Event] = None
+    ):
+        self.task = task
+        self.db = db
+        self.duration = duration
+        self.batch_size = batch_size
+        self.interval = interval
+        self.stop_event = stop_event
+        # 从检查点恢复时带上已完成的片段
+        self.segments = list(segments or [])
+        self._published = len(self.segments)
+        self._written = len(self.segments)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def check_stopped(self) -> None:
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise TranscriptionCancelled(f"Task {self.task.id} was cancelled")
+
+    def add(self, segment: dict) -> None:
+        self.check_stopped()
+        self.segments.append(segment)
+        self._pending += 1
+        if (
+            self._pending >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.interval
+        ):
+            self.flush()
+
+    def replace(self, segments: List[dict]) -> None:
+        """整体替换片段（例如级联精修后），立即写入并重新推送全部片段"""
+        self.segments = list(segments)
+        self.task.segments = self.segments
+        self._written = len(self.segments)
+        self.task.segments_revision = (self.task.segments_revision or 0) + 1
+        self._published = 0
+        self._pending = max(self._pending, 1)
+        self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        # 只追加新片段，已写入的部分不再重写；全文可从编码数据中直接读取
+        self.task.append_segments(self.segments[self._written:])
+        self._written = len(self.segments)
+        # 检查点：已写入片段的结束时间，任务中断后从这里继续
+        self.task.checkpoint_time = self.segments[-1]["end"]
+        if self.duration:
+            self.task.progress = min(int(self.segments[-1]["end"] / self.duration * 100), 99)
+        # 新片段随进度一起推送给订阅的客户端
+        publish_task(self.db, self.task, self.segments[self._published:], self._published)
+        self.db.commit()
+        self._published = len(self.segments)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        logger.debug(f"Flushed {len(self.segments)} segments for task {self.task.id}: {self.task.progress}%")
+
+
+# 并行转录的分片长度（秒），可由用户设置中的 chunkSize 覆盖
+DEFAULT_CHUNK_SECONDS = TranscriptionSettings().chunkSize
+
+
 class TranscriptionService:
     def __init__(self):
+        # 模型在第一次使用时才加载，创建服务本身不产生开销
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
         try:
+            import torch
+
             # 检查 CUDA 是否可用
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.compute_type = "float16" if self.device == "cuda" else "int8"
+            self.device, self.compute_type = default_device()
             
             if self.device == "cuda":
                 # 获取 GPU 信息
@@ -31,26 +138,31 @@ class TranscriptionService:
             else:
                 logger.warning("No CUDA device available! Transcription will be slow on CPU.")
 
-            # 加载模型
-            model_name = "base"
-            logger.info(f"Loading Whisper model '{model_name}' on {self.device}")
-            
-            # 设置 num_workers=1 以避免多线程问题
-            self.model = WhisperModel(
-                model_size_or_path=model_name,
-                device=self.device,
-                compute_type=self.compute_type,
-                download_root="./models",
-                num_workers=1,
-                cpu_threads=4  # 限制CPU线程数
-            )
-            
-            logger.info(f"Model loaded successfully on {self.device}")
-            
+            # 从共享注册表获取模型，同一进程内只加载一次
+            return model_registry.get("base", self.device, self.compute_type)
+
         except Exception as e:
             logger.error(f"Error initializing transcription service: {str(e)}")
             raise
 
+    def _transcribe(self, audio, language: Optional[str]):
+        """使用服务自带的模型单次转录整段音频"""
+        segments, info = self.model.transcribe(
+            audio=audio,
+            language=language,  # 使用指定的语言
+            task="transcribe",
+            beam_size=5,
+            vad_filter=True,
+            vad_parameters=dict(
+                min_silence_duration_ms=500,
+                speech_pad_ms=400
+            ),
+            initial_prompt="这是一段视频的音频内容。",
+            condition_on_previous_text=True,
+            temperature=0.0
+        )
+        return (segment_dict(segment) for segment in segments)
+
     async def process_video(self, task_id: int, video_path: str, source_id: int, db: Session):
         """处理视频转录任务"""
         task = None
@@ -61,49 +173,29 @@ class TranscriptionService:
 
             task.status = "processing"
             task.progress = 0
+            task.segments = []
             db.commit()
 
-            # 执行转录
-            segments, info = self.model.transcribe(
-                audio=video_path,
-                language=task.language,  # 使用指定的语言
-                task="transcribe",
-                beam_size=5,
-                vad_filter=True,
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,
-                    speech_pad_ms=400
-                ),
-                initial_prompt="这是一段视频的音频内容。",
-                condition_on_previous_text=True,
-                temperature=0.0
-            )
+            # 音频只解码一次并缓存
+            audio = load_audio(video_path)
+            duration = audio_duration(audio)
+
+            if use_parallel(duration):
+                # 长视频在静音处切分，多进程并行转录
+                _, segments = transcribe_chunked(
+                    audio, task.language, "base", DEFAULT_CHUNK_SECONDS
+                )
+            else:
+                segments = self._transcribe(audio, task.language)
+
+            # 边转录边写入片段和进度
+            writer = SegmentWriter(task, db, duration)
+            for segment in segments:
+                writer.add(segment)
+            writer.flush()
 
-            # 更新任务状态和结果
-            segments_data = [
-                {
-                    "start": float(segment.start),
-                    "end": float(segment.end),
-                    "text": segment.text.strip()
-                }
-                for segment in segments
-            ]
-            
-            task.status = "success"
-            task.text = " ".join(segment.text for segment in segments)
-            task.segments = segments_data
-            task.progress = 100
-            db.commit()
-            
             # 保存转录结果到 VideoTranscript
-            transcript = VideoTranscript(
-                source_id=source_id,
-                video_path=task.video_path,  # 使用相对路径
-                text=task.text,
-                segments=segments_data
-            )
-            db.add(transcript)
-            db.commit()
+            save_transcript(task, db)
 
         except Exception as e:
             logger.error(f"Error in transcription task {task_id}: {str(e)}")
@@ -113,29 +205,156 @@ class TranscriptionService:
                 db.commit()
             raise
 
-    def _update_progress(self, task_id: int, progress: float, db: Session):
-        """更新转录进度"""
-        try:
-            task = db.query(TranscriptionTask).get(task_id)
-            if task and task.status == "processing":
-                task.progress = min(int(progress * 100), 99)
-                db.commit()
-                logger.debug(f"Updated progress for task {task_id}: {task.progress}%")
-        except Exception as e:
-            logger.error(f"Error updating progress for task {task_id}: {str(e)}") 
-
     def get_transcript(self, transcript_id: int, db: Session) -> Optional[VideoTranscript]:
         """获取转录记录"""
         return db.query(VideoTranscript).filter(
             VideoTranscript.id == transcript_id
         ).first()
 
+def save_transcript(task: TranscriptionTask, db: Session) -> VideoTranscript:
+    """标记任务完成，并将结果保存到转录记录表
+
+    追加写入的片段先合并成一份编码数据，再直接移交给转录记录，任务只保留引用，结果只存一份。
+    """
+    task.compact_segments()
+
+    # 获取文件名（不带扩展名）
+    title = Path(task.video_path).stem
+
+    # 创建与 segments 等长的标签列表
+    labels = [0] * segment_count(task.segments_blob)
+
+    # 保存到转录记录表
+    transcript = VideoTranscript(
+        source_id=task.source_id,
+        video_path=task.video_path,
+        title=title,  # 添加标题
+        segments_blob=task.segments_blob,
+        labels=labels,  # 添加标签列表
+        language=task.language,
+        model=task.model,
+        content_hash=task.content_hash
+    )
+    db.add(transcript)
+
+    # 更新任务状态
+    task.status = "success"
+    task.progress = 100
+    task.transcript = transcript
+    task.segments_blob = None
+    publish_task(db, task)
+    db.commit()
+    return transcript
+
+def find_reusable_transcript(
+    db: Session,
+    content_hash: str,
+    model: Optional[str],
+    language: Optional[str]
+) -> Optional[VideoTranscript]:
+    """查找相同内容、模型和语言的已有转录，未指定语言时不限语言"""
+    query = db.query(VideoTranscript).filter(
+        VideoTranscript.content_hash == content_hash,
+        VideoTranscript.model == model
+    )
+    if language:
+        query = query.filter(VideoTranscript.language == language)
+    return query.order_by(VideoTranscript.created_at.desc()).first()
+
+def reuse_transcript(
+    db: Session,
+    task: TranscriptionTask,
+    transcript: VideoTranscript
+) -> TranscriptionTask:
+    """直接用已有转录完成任务，不再排队"""
+    logger.info(f"Reusing transcript {transcript.id} for {task.video_path} ({task.content_hash})")
+    task.language = transcript.language
+    db.add(task)
+
+    # 当前来源下已有转录记录时更新它并关联，否则补一条，便于按路径查询
+    existing = db.query(VideoTranscript).filter(
+        VideoTranscript.source_id == task.source_id,
+        VideoTranscript.video_path == task.video_path
+    ).order_by(VideoTranscript.created_at.desc()).first()
+    if existing:
+        if existing.id != transcript.id:
+            # 复制编码数据，无需解码
+            if transcript.segments_blob is not None:
+                existing.segments_blob = transcript.segments_blob
+                existing.legacy_segments = None
+                existing.legacy_text = None
+            else:
+                existing.segments = transcript.segments
+            existing.labels = [0] * existing.count_segments()
+            existing.language = transcript.language
+            existing.model = transcript.model
+            existing.content_hash = transcript.content_hash
+        task.transcript = existing
+        task.segment_count = existing.count_segments()
+        task.status = "success"
+        task.progress = 100
+        db.flush()
+        publish_task(db, task)
+        db.commit()
+    else:
+        # 复制编码数据，无需解码
+        if transcript.segments_blob is not None:
+            task.segments_blob = transcript.segments_blob
+            task.segment_count = transcript.count_segments()
+        else:
+            task.segments = transcript.segments
+        save_transcript(task, db)
+    db.refresh(task)
+    return task
+
+def _transcribe_single(
+    writer: SegmentWriter,
+    audio,
+    language: Optional[str],
+    model_name: str,
+    intervals: List[Interval],
+    offset: float = 0.0
+) -> None:
+    """单次调用模型转录语音区间，offset 之前的部分已在检查点中完成"""
+    task, db = writer.task, writer.db
+    intervals = clip_intervals(intervals, offset)
+    if not intervals:
+        return
+    # 用检查点前的最后几句作为提示，保持上下文连贯
+    prompt = " ".join(segment["text"] for segment in writer.segments[-3:]) or None
+
+    # 从共享注册表获取模型，避免每个任务重新加载
+    with model_registry.acquire(model_name) as model:
+        # 只把语音区间拼接后送入模型，片段时间映射回原音频
+        segments, info = transcribe_speech(
+            model,
+            audio,
+            intervals,
+            language=language,
+            task="transcribe",
+            beam_size=5,
+            initial_prompt=prompt
+        )
+
+        # 语言检测在 transcribe 返回前已完成，先写入以便轮询端看到
+        task.language = info.language
+        db.commit()
+
+        # 边转录边分批写入片段，轮询端可以看到部分结果
+        for segment in segments:
+            writer.add(segment)
+        writer.flush()
+        writer.check_stopped()
+
 def transcribe_video_task(
     task_id: int,
     video_path: str,
     language: Optional[str] = None,
     model_name: str = "base",
-    db: Session = None
+    db: Session = None,
+    chunk_seconds: Optional[float] = None,
+    stop_event: Optional[threading.Event] = None,
+    cascade_model: Optional[str] = None
 ) -> None:
     """
     处理视频转录任务
@@ -146,9 +365,14 @@ def transcribe_video_task(
         language: 转录语言，默认为None（自动检测）
         model_name: 模型名称，默认为"base"
         db: 数据库会话
+        chunk_seconds: 长视频并行转录的分片长度（秒）
+        stop_event: 被设置时在片段之间停止并抛出 TranscriptionCancelled
+        cascade_model: 级联精修模型，转录完成后用它重转置信度低的片段
     """
+    task = None
+    started = time.monotonic()
     try:
-        print("开始转录：", language, model_name)
+        logger.info(f"开始转录：task={task_id}, language={language}, model={model_name}")
         # 获取任务
         task = db.query(TranscriptionTask).filter(
             TranscriptionTask.id == task_id
@@ -158,74 +382,143 @@ def transcribe_video_task(
             logger.error(f"Task {task_id} not found")
             return
 
-        # 更新任务状态
+        # 重试的任务从检查点继续，已完成的片段不再重新转录
+        done = task.segments
+        resume_from = task.checkpoint_time if done else None
+        if resume_from:
+            logger.info(f"Resuming task {task_id} from {resume_from:.1f}s")
+            # 沿用中断前检测到的语言，保证前后一致
+            language = language or task.language
+        else:
+            done = []
+            task.segments = []
+            task.checkpoint_time = None
+            task.progress = 0
         task.status = "processing"
-        task.progress = 0
         db.commit()
 
-        # 选择设备
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
+        # 解码后的音频会被缓存，重新转录或换模型时不再重复解码视频
+        audio = load_audio(video_path)
+        duration = audio_duration(audio)
 
-        # 初始化模型
-        model = WhisperModel(
-            model_name,
-            device=device,
-            compute_type=compute_type,
-            download_root="./models"
-        )
+        # 语音区间图通常在提交时已生成（按内容缓存），之后只转录语音部分
+        task.content_hash = task.content_hash or content_fingerprint(video_path)
+        analysis = analyze_speech(db, task.content_hash, audio)
+        intervals = analysis.speech_intervals
+        task.duration = duration
+        task.speech_duration = analysis.speech_seconds
+        if is_silent(analysis):
+            logger.info(f"Task {task_id} has {analysis.speech_seconds:.1f}s of speech, skipping")
+            save_transcript(task, db)
+            return
 
-        # 转录音频
-        segments, info = model.transcribe(
-            video_path,
-            language=language,
-            task="transcribe",
-            beam_size=5,
-            vad_filter=True
-        )
+        # 未指定语言时先用开头的语音单独检测（按内容缓存），再选择适合该语言的模型
+        if not language:
+            language = detect_language_cached(db, task.content_hash, audio, intervals)
+            routed = route_model(model_name, language)
+            if routed != model_name:
+                logger.info(f"Routing task {task_id} from {model_name} to {routed} for language {language}")
+                model_name = task.model = routed
+            task.language = language
+            db.commit()
+        writer = SegmentWriter(task, db, duration, segments=done, stop_event=stop_event)
 
-        # 处理转录结果
-        text_segments = []
-        full_text = []
-        
-        for segment in segments:
-            text_segments.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text
-            })
-            full_text.append(segment.text)
-
-        # 更新任务状态
-        task.status = "success"
-        task.progress = 100
-        task.text = "\n".join(full_text)
-        task.segments = text_segments
-        task.language = info.language
-        db.commit()
+        if use_parallel(duration - (resume_from or 0)):
+            # 长视频在静音处切分，多进程并行转录
+            task.language, segments = transcribe_chunked(
+                audio, language, model_name, chunk_seconds or DEFAULT_CHUNK_SECONDS,
+                offset=resume_from or 0.0, intervals=intervals
+            )
+            db.commit()
+
+            try:
+                for segment in segments:
+                    writer.add(segment)
+            finally:
+                # 提前停止时取消尚未开始的分片，释放进程池
+                segments.close()
+            writer.flush()
+            writer.check_stopped()
+        else:
+            _transcribe_single(
+                writer, audio, language, model_name, intervals, offset=resume_from or 0.0
+            )
+
+        if cascade_model and cascade_model != model_name:
+            refined, regions = refine_segments(
+                audio, writer.segments, task.language, cascade_model, check=writer.check_stopped
+            )
+            if regions:
+                writer.replace(refined)
 
-        # 获取文件名（不带扩展名）
-        title = Path(task.video_path).stem
+        # 断点续转的任务只统计本次耗时，偏低，不参与实时率统计
+        if not resume_from:
+            task.processing_seconds = time.monotonic() - started
+        save_transcript(task, db)
 
-        # 创建与 segments 等长的标签列表
-        labels = [0] * len(text_segments)
+    except TranscriptionCancelled:
+        # 任务状态已由取消方写入，丢弃未提交的修改即可
+        logger.info(f"Transcription of task {task_id} stopped")
+        db.rollback()
+        raise
+
+    except Exception as e:
+        # 由调用方（worker 中的 job_queue.fail）决定重试还是标记失败，
+        # 已写入的片段和检查点保留，重试时从检查点继续
+        logger.error(f"Transcription error: {str(e)}")
+        raise
+
+def refine_video_task(
+    task_id: int,
+    video_path: str,
+    db: Session,
+    stop_event: Optional[threading.Event] = None
+) -> None:
+    """只用 cascade_model 重转已有转录记录中置信度低的片段，结果写回该记录"""
+    task = db.query(TranscriptionTask).filter(TranscriptionTask.id == task_id).first()
+    if not task:
+        logger.error(f"Task {task_id} not found")
+        return
 
-        # 保存到转录记录表
-        transcript = VideoTranscript(
-            source_id=task.source_id,
-            video_path=task.video_path,
-            title=title,  # 添加标题
-            text=task.text,
-            segments=task.segments,
-            labels=labels  # 添加标签列表
+    def check_stopped():
+        if stop_event is not None and stop_event.is_set():
+            raise TranscriptionCancelled(f"Task {task_id} was cancelled")
+
+    try:
+        transcript = task.transcript
+        if transcript is None:
+            raise ValueError(f"Task {task_id} has no transcript to refine")
+
+        task.status = "processing"
+        task.progress = 0
+        publish_task(db, task)
+        db.commit()
+
+        audio = load_audio(video_path)
+        segments, regions = refine_segments(
+            audio, transcript.segments, transcript.language, task.cascade_model, check=check_stopped
         )
-        db.add(transcript)
+        if regions:
+            # 片段数量变化后原标签无法对应，重新生成
+            if len(segments) != transcript.count_segments():
+                transcript.labels = [0] * len(segments)
+            # 全文由编码后的片段派生，无需单独写入
+            transcript.segments = segments
+            task.segments_revision = (task.segments_revision or 0) + 1
+        logger.info(f"Refined {regions} regions of transcript {transcript.id}")
+
+        task.segment_count = transcript.count_segments()
+        task.status = "success"
+        task.progress = 100
+        publish_task(db, task)
         db.commit()
 
+    except TranscriptionCancelled:
+        logger.info(f"Refinement of task {task_id} stopped")
+        db.rollback()
+        raise
+
     except Exception as e:
-        logger.error(f"Transcription error: {str(e)}")
-        if task:
-            task.status = "error"
-            task.error = str(e)
-            db.commit()
-        raise 
\ No newline at end of file
+        # 由 job_queue.fail 决定重试还是标记失败
+        logger.error(f"Refinement error: {str(e)}")
+        raise
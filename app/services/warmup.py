@@ -0,0 +1,66 @@
+import os
+import threading
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# 启动后在后台预热的模型，逗号分隔：summary 表示摘要模型，whisper:<名称> 表示转录模型
+WARMUP_MODELS = [
+    name.strip()
+    for name in os.getenv("WARMUP_MODELS", "summary").split(",")
+    if name.strip()
+]
+
+
+class Readiness:
+    """记录各模型的预热状态，供就绪探针查询"""
+
+    def __init__(self, models):
+        self.models = list(models)
+        self._state: Dict[str, str] = {name: "pending" for name in self.models}
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def ready(self) -> bool:
+        return all(state == "ready" for state in self._state.values())
+
+    def state(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._state)
+
+    def _set(self, name: str, state: str) -> None:
+        with self._lock:
+            self._state[name] = state
+
+    def _load(self, name: str) -> None:
+        if name == "summary":
+            from app.services.summary import summary_service
+            summary_service.load()
+        elif name.startswith("whisper:"):
+            from app.services.model_registry import model_registry
+            model_registry.get(name.split(":", 1)[1])
+        else:
+            raise ValueError(f"Unknown warm-up model '{name}'")
+
+    def _run(self) -> None:
+        for name in self.models:
+            self._set(name, "loading")
+            try:
+                self._load(name)
+                self._set(name, "ready")
+                logger.info(f"Warm-up of '{name}' finished")
+            except Exception as e:
+                self._set(name, "error")
+                logger.error(f"Warm-up of '{name}' failed: {str(e)}")
+
+    def start(self) -> None:
+        """在后台线程中依次加载模型，不阻塞应用启动"""
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, name="model-warmup", daemon=True).start()
+
+
+readiness = Readiness(WARMUP_MODELS)
@@ -0,0 +1,191 @@
+"""CPU 推理参数调优
+
+在本机用 ./models 中的 Whisper 模型跑一段短音频，遍历 cpu_threads、num_workers
+和 compute_type 的组合，输出每种组合的实时率，并把最快的配置写入
+models/cpu_tuning.json，服务启动时自动读取：
+
+    python -m app.tune_cpu
+    python -m app.tune_cpu --audio sample.mp4 --seconds 60
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.audio_cache import SAMPLE_RATE, load_audio
+from app.services.model_registry import CPU_TUNING_FILE, MODEL_DOWNLOAD_ROOT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+
+
+def synthetic_audio(seconds: float) -> np.ndarray:
+    """生成类语音的合成音频：带谐波和音节包络的基频扫动，加少量噪声"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.6)
+    audio = 0.3 * voice * syllables + 0.01 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def _thread_grid(cpu_count: int) -> List[int]:
+    threads, n = [], 1
+    while n < cpu_count:
+        threads.append(n)
+        n *= 2
+    return threads + [cpu_count]
+
+
+def _transcribe(model, audio: np.ndarray, language: Optional[str]) -> None:
+    # 固定温度、不依赖上文，保证每种组合的解码工作量一致
+    segments, _ = model.transcribe(
+        audio,
+        language=language,
+        beam_size=5,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        vad_filter=False
+    )
+    for _ in segments:
+        pass
+
+
+def benchmark(
+    model_name: str,
+    audio: np.ndarray,
+    language: Optional[str],
+    compute_type: str,
+    cpu_threads: int,
+    num_workers: int
+) -> dict:
+    """测量一种组合的实时率（处理耗时 / 音频时长），num_workers 路并发计为总吞吐"""
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(
+        model_size_or_path=model_name,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+        download_root=MODEL_DOWNLOAD_ROOT
+    )
+    # 预热一次，排除首次调用的初始化开销
+    _transcribe(model, audio[:SAMPLE_RATE * 5], language)
+
+    threads = [
+        threading.Thread(target=_transcribe, args=(model, audio, language))
+        for _ in range(num_workers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    del model
+
+    audio_seconds = len(audio) / SAMPLE_RATE * num_workers
+    return {
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads,
+        "num_workers": num_workers,
+        "seconds": round(elapsed, 3),
+        "rtf": round(elapsed / audio_seconds, 4),
+    }
+
+
+def main() -> None:
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="CPU 推理参数调优")
+    parser.add_argument("--model", default="base", help="要测试的 Whisper 模型")
+    parser.add_argument("--audio", help="测试用的音视频文件，默认使用合成音频")
+    parser.add_argument("--seconds", type=float, default=30.0, help="测试音频时长（秒）")
+    parser.add_argument("--language", default=None, help="固定语言，默认自动检测")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=_thread_grid(cpu_count),
+        help="要测试的 cpu_threads 取值"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2],
+        help="要测试的 num_workers 取值"
+    )
+    parser.add_argument(
+        "--compute-types",
+        nargs="+",
+        default=COMPUTE_TYPES,
+        help="要测试的计算精度"
+    )
+    parser.add_argument("--output", default=CPU_TUNING_FILE, help="调优结果写入路径")
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = np.asarray(load_audio(args.audio)[:int(args.seconds * SAMPLE_RATE)])
+    else:
+        audio = synthetic_audio(args.seconds)
+
+    results = []
+    combos = [
+        (compute_type, threads, workers)
+        for compute_type, threads, workers in itertools.product(
+            args.compute_types, args.threads, args.workers
+        )
+        # 总线程数超过核心数只会相互争抢
+        if threads * workers <= cpu_count
+    ]
+    for compute_type, threads, workers in combos:
+        try:
+            result = benchmark(args.model, audio, args.language, compute_type, threads, workers)
+        except Exception as e:
+            logger.warning(f"{compute_type} threads={threads} workers={workers} failed: {str(e)}")
+            continue
+        results.append(result)
+        logger.info(
+            f"{compute_type:<13} threads={threads:<3} workers={workers:<2} "
+            f"rtf={result['rtf']:.4f} ({result['seconds']:.1f}s)"
+        )
+
+    if not results:
+        raise SystemExit("No configuration could be benchmarked")
+
+    best = min(results, key=lambda result: result["rtf"])
+    report = {
+        "model": args.model,
+        "audio": args.audio or "synthetic",
+        "audio_seconds": round(len(audio) / SAMPLE_RATE, 1),
+        "cpu_count": cpu_count,
+        "machine": platform.processor() or platform.machine(),
+        "created_at": datetime.utcnow().isoformat(),
+        "best": best,
+        "results": sorted(results, key=lambda result: result["rtf"]),
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(
+        f"Best: {best['compute_type']} threads={best['cpu_threads']} "
+        f"workers={best['num_workers']} rtf={best['rtf']:.4f}, written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""转录 worker
+
+独立于 API 进程运行，从 transcription_tasks 表领取任务并执行转录：
+
+    python -m app.worker
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.transcription import TranscriptionTask
+from app.services import job_queue
+from app.services.audio_cache import load_audio
+from app.services.batch_transcription import is_batchable, transcribe_batch_tasks
+from app.services.transcription import (
+    TranscriptionCancelled,
+    refine_video_task,
+    transcribe_video_task
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _video_path(task: TranscriptionTask) -> str:
+    return str(Path(task.source.path) / task.video_path)
+
+
+class Worker:
+    def __init__(self, worker_id: str, poll_interval: float = 2.0, batch_tasks: int = 1):
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.batch_tasks = batch_tasks
+        self._stopping = False
+
+    def stop(self, *args) -> None:
+        """收到退出信号后处理完当前任务再退出"""
+        logger.info(f"Worker {self.worker_id} stopping after current task")
+        self._stopping = True
+
+    def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started")
+        while not self._stopping:
+            if not self.run_once():
+                time.sleep(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """领取并执行任务，队列为空时返回 False"""
+        db = SessionLocal()
+        try:
+            task = job_queue.lease_next(db, self.worker_id)
+            if not task:
+                return False
+
+            # 开启批量模式时，顺带领取使用相同模型的其他排队任务
+            tasks = [task]
+            if task.mode != "refine" and not task.cascade_model:
+                tasks += job_queue.lease_more(
+                    db, self.worker_id, task.model, self.batch_tasks - 1
+                )
+            if len(tasks) == 1:
+                self._run_task(db, task)
+            else:
+                self._run_batch(db, tasks)
+            return True
+        finally:
+            db.close()
+
+    def _run_task(self, db: Session, task: TranscriptionTask) -> None:
+        task_id = task.id
+        logger.info(f"Worker {self.worker_id} leased task {task_id} (attempt {task.attempts})")
+
+        with job_queue.LeaseKeeper(task_id, self.worker_id) as keeper:
+            self._execute(db, task, keeper)
+
+    def _execute(self, db: Session, task: TranscriptionTask, keeper: job_queue.LeaseKeeper) -> None:
+        """在已有的 LeaseKeeper 下执行任务，结束后释放租约或交给 fail 决定是否重试"""
+        task_id = task.id
+
+        # 用户设置中的 chunkSize 决定长视频并行转录的分片长度
+        user_settings = (task.user.settings or {}) if task.user else {}
+        chunk_seconds = user_settings.get("transcription", {}).get("chunkSize")
+
+        try:
+            if task.mode == "refine":
+                refine_video_task(task_id, _video_path(task), db, stop_event=keeper.lost)
+            else:
+                transcribe_video_task(
+                    task_id,
+                    _video_path(task),
+                    task.language,
+                    task.model or "base",
+                    db,
+                    chunk_seconds=chunk_seconds,
+                    stop_event=keeper.lost,
+                    cascade_model=task.cascade_model
+                )
+        except TranscriptionCancelled:
+            # 任务被取消或租约被接管，立即空出 worker 领取下一个任务
+            logger.info(f"Worker {self.worker_id} stopped task {task_id}")
+            job_queue.release(db, task_id, self.worker_id)
+            return
+        except Exception as e:
+            db.rollback()
+            job_queue.fail(db, task_id, self.worker_id, str(e))
+            return
+
+        job_queue.release(db, task_id, self.worker_id)
+
+    def _run_batch(self, db: Session, tasks: List[TranscriptionTask]) -> None:
+        """短视频合并成一批推理，较长的视频仍逐个转录"""
+        logger.info(f"Worker {self.worker_id} leased {len(tasks)} tasks for batching")
+        task_ids = [task.id for task in tasks]
+        batch, singles = [], []
+
+        with ExitStack() as stack:
+            # 每个任务只有一个 LeaseKeeper，从领取一直到该任务结束
+            keepers = {
+                task_id: stack.enter_context(job_queue.LeaseKeeper(task_id, self.worker_id))
+                for task_id in task_ids
+            }
+
+            for task in tasks:
+                try:
+                    audio = load_audio(_video_path(task))
+                except Exception as e:
+                    keepers[task.id].stop()
+                    job_queue.fail(db, task.id, self.worker_id, str(e))
+                    continue
+                if is_batchable(audio):
+                    batch.append((task, audio))
+                else:
+                    singles.append(task)
+
+            if batch:
+                try:
+                    transcribe_batch_tasks(batch, batch[0][0].model or "base", db)
+                    for task, _ in batch:
+                        keepers[task.id].stop()
+                        job_queue.release(db, task.id, self.worker_id)
+                except Exception as e:
+                    db.rollback()
+                    for task, _ in batch:
+                        keepers[task.id].stop()
+                        job_queue.fail(db, task.id, self.worker_id, str(e))
+
+            # 等待期间心跳持续，避免排在后面的任务租约过期
+            for task in singles:
+                self._execute(db, task, keepers[task.id])
+                keepers[task.id].stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="转录任务 worker")
+    parser.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="worker 标识，默认为 主机名-进程号"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="队列为空时的轮询间隔（秒）"
+    )
+    parser.add_argument(
+        "--batch-tasks",
+        type=int,
+        default=int(os.getenv("TRANSCRIPTION_BATCH_TASKS", "1")),
+        help="一次领取并批量推理的最大任务数，1 表示不批量"
+    )
+    args = parser.parse_args()
+
+    worker = Worker(args.worker_id, poll_interval=args.poll_interval, batch_tasks=args.batch_tasks)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""转录性能基准
+
+生成固定时长的测试音频，分别通过 TranscriptionService.process_video 和
+transcribe_video_task 用本地 base 模型转录，统计实时率、峰值内存、首个片段
+耗时和数据库写入耗时，结果以 JSON 输出，便于在版本之间对比：
+
+    python -m benchmarks.bench_transcription
+    python -m benchmarks.bench_transcription --lengths 60 600 --output bench.json
+    python -m benchmarks.bench_transcription --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+# 音频缓存放到临时目录，不污染正式缓存；必须在导入 app 模块之前设置
+_workdir = tempfile.mkdtemp(prefix="bench-transcription-")
+os.environ.setdefault("AUDIO_CACHE_DIR", os.path.join(_workdir, "audio"))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base_class import Base  # noqa: E402
+from app.models import TranscriptionTask, VideoSource, VideoTranscript  # noqa: E402
+from app.services import transcription  # noqa: E402
+from app.services.audio_cache import SAMPLE_RATE, cache_path, load_audio  # noqa: E402
+from app.services.model_registry import _current_rss, model_registry  # noqa: E402
+from app.tune_cpu import synthetic_audio  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODES = ["process_video", "transcribe_video_task"]
+
+
+def _write_wav(path: Path, audio: np.ndarray) -> None:
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def make_sample(source: np.ndarray, seconds: float, dest: Path) -> Path:
+    """把源音频循环或截取到指定时长并写成 wav"""
+    samples = int(seconds * SAMPLE_RATE)
+    audio = np.resize(np.asarray(source, dtype=np.float32), samples)
+    _write_wav(dest, audio)
+    return dest
+
+
+class RssSampler:
+    """在后台线程中定期采样常驻内存，记录峰值"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = _current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+
+
+class DbTimer:
+    """通过 SQLAlchemy 游标事件累计数据库语句耗时"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.seconds = 0.0
+        self.statements = 0
+        self.commits = 0
+        self._started = threading.local()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started.value = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.seconds += time.perf_counter() - self._started.value
+        self.statements += 1
+
+    def _commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "commit", self._commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        event.remove(self.engine, "commit", self._commit)
+
+
+@contextmanager
+def first_segment_timer():
+    """记录第一个片段交给 SegmentWriter 的时间"""
+    original = transcription.SegmentWriter.add
+    marks = {}
+
+    def add(writer, segment):
+        marks.setdefault("first", time.perf_counter())
+        return original(writer, segment)
+
+    transcription.SegmentWriter.add = add
+    try:
+        yield marks
+    finally:
+        transcription.SegmentWriter.add = original
+
+
+def run_once(
+    mode: str,
+    video: Path,
+    seconds: float,
+    language: Optional[str],
+    db_session,
+    engine,
+    service: transcription.TranscriptionService
+) -> dict:
+    db = db_session()
+    try:
+        source = VideoSource(name="bench", path=str(video.parent))
+        db.add(source)
+        db.commit()
+        task = TranscriptionTask(
+            source_id=source.id,
+            video_path=video.name,
+            status="pending",
+            language=language,
+            model="base"
+        )
+        db.add(task)
+        db.commit()
+        task_id = task.id
+
+        # 每次都从冷缓存开始，解码耗时计入结果
+        cache_path(str(video)).unlink(missing_ok=True)
+
+        with RssSampler() as rss, DbTimer(engine) as db_timer, first_segment_timer() as marks:
+            start = time.perf_counter()
+            if mode == "process_video":
+                asyncio.run(service.process_video(task_id, str(video), source.id, db))
+            else:
+                transcription.transcribe_video_task(task_id, str(video), language, "base", db)
+            elapsed = time.perf_counter() - start
+
+        db.expire_all()
+        task = db.query(TranscriptionTask).get(task_id)
+        first = marks.get("first")
+        return {
+            "mode": mode,
+            "audio_seconds": seconds,
+            "status": task.status,
+            "segments": len(task.segments or []),
+            "seconds": round(elapsed, 3),
+            "rtf": round(elapsed / seconds, 4),
+            "first_segment_seconds": round(first - start, 3) if first else None,
+            "peak_rss_mb": round(rss.peak / 1024**2, 1),
+            "db_seconds": round(db_timer.seconds, 4),
+            "db_statements": db_timer.statements,
+            "db_commits": db_timer.commits,
+        }
+    finally:
+        db.close()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    """与基线结果对比，返回实时率变慢超过容差的条目"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (item["mode"], item["audio_seconds"]): item
+            for item in json.load(f)["results"]
+        }
+    regressions = []
+    for item in results:
+        base = baseline.get((item["mode"], item["audio_seconds"]))
+        if not base:
+            continue
+        ratio = item["rtf"] / base["rtf"] if base["rtf"] else 1.0
+        item["baseline_rtf"] = base["rtf"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{item['mode']} {item['audio_seconds']:.0f}s: "
+                f"rtf {base['rtf']:.4f} -> {item['rtf']:.4f} ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="转录性能基准")
+    parser.add_argument(
+        "--lengths",
+        type=float,
+        nargs="+",
+        default=[30, 120, 600],
+        help="测试音频时长（秒）"
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--audio", help="用真实音视频作为素材，默认使用合成音频")
+    parser.add_argument("--language", default="en", help="转录语言，传空字符串表示自动检测")
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{os.path.join(_workdir, 'bench.db')}",
+        help="数据库地址，默认使用临时 SQLite"
+    )
+    parser.add_argument("--output", help="结果写入的 JSON 文件，默认输出到标准输出")
+    parser.add_argument("--baseline", help="用于对比的历史结果 JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="实时率允许变慢的比例，超过时以非零状态退出"
+    )
+    args = parser.parse_args()
+    language = args.language or None
+
+    engine = create_engine(args.database_url)
+    # 只建转录用到的表
+    Base.metadata.create_all(
+        engine,
+        tables=[VideoSource.__table__, VideoTranscript.__table__, TranscriptionTask.__table__]
+    )
+    db_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    source = load_audio(args.audio) if args.audio else synthetic_audio(max(args.lengths))
+
+    # 模型加载单独计时，不计入每次转录
+    rss_before = _current_rss()
+    start = time.perf_counter()
+    service = transcription.TranscriptionService()
+    service.model
+    model_registry.get("base")
+    load_seconds = time.perf_counter() - start
+    logger.info(f"Model loaded in {load_seconds:.2f}s")
+
+    results = []
+    for seconds in args.lengths:
+        video = make_sample(source, seconds, Path(_workdir) / f"sample_{seconds:.0f}s.wav")
+        for mode in args.modes:
+            result = run_once(mode, video, seconds, language, db_session, engine, service)
+            results.append(result)
+            logger.info(
+                f"{mode:<22} {seconds:>6.0f}s rtf={result['rtf']:.4f} "
+                f"first={result['first_segment_seconds']}s rss={result['peak_rss_mb']}MB "
+                f"db={result['db_seconds']:.3f}s/{result['db_commits']} commits"
+            )
+
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "audio": args.audio or "synthetic",
+        "language": language,
+        "database": engine.url.get_backend_name(),
+        "model": {
+            "name": "base",
+            "load_seconds": round(load_seconds, 3),
+            "rss_mb": round((_current_rss() - rss_before) / 1024**2, 1),
+            "kwargs": model_registry.model_kwargs,
+        },
+        "settings": {
+            "flush_segments": transcription.FLUSH_SEGMENTS,
+            "flush_seconds": transcription.FLUSH_SECONDS,
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(output)
+
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { Select, Button, message } from "antd";
 import { FileTextOutlined } from "@ant-design/icons";
 import axios from "axios";
@@ -12,10 +12,17 @@ const SummaryTypes = {
   BULLET_POINTS: "BULLET_POINTS",
 };
 
+// 摘要在后台生成，轮询状态的间隔（毫秒）
+const SUMMARY_POLL_INTERVAL = 2000;
+
+const isSummaryRunning = (summary) =>
+  summary.status === "pending" || summary.status === "processing";
+
 const VideoSummary = ({ transcriptId, transcriptText }) => {
   const [summaryType, setSummaryType] = useState(SummaryTypes.GENERAL);
   const [summaries, setSummaries] = useState([]);
   const [loading, setLoading] = useState(false);
+  const pollTimersRef = useRef({});
 
   // 加载已有摘要
   useEffect(() => {
@@ -24,6 +31,49 @@ const VideoSummary = ({ transcriptId, transcriptText }) => {
     }
   }, [transcriptId]);
 
+  // 卸载或切换转录时停止轮询
+  useEffect(() => {
+    return () => {
+      Object.values(pollTimersRef.current).forEach(clearTimeout);
+      pollTimersRef.current = {};
+    };
+  }, [transcriptId]);
+
+  const updateSummary = (summary) => {
+    setSummaries((prev) =>
+      prev.some((s) => s.id === summary.id)
+        ? prev.map((s) => (s.id === summary.id ? summary : s))
+        : [...prev, summary]
+    );
+  };
+
+  const pollSummary = (summaryId) => {
+    clearTimeout(pollTimersRef.current[summaryId]);
+    pollTimersRef.current[summaryId] = setTimeout(async () => {
+      try {
+        const { data } = await axios.get(`/api/summaries/status/${summaryId}`, {
+          headers: {
+            Authorization: `Bearer ${localStorage.getItem("token")}`,
+          },
+        });
+        updateSummary(data);
+        if (isSummaryRunning(data)) {
+          pollSummary(summaryId);
+          return;
+        }
+        delete pollTimersRef.current[summaryId];
+        if (data.status === "success") {
+          message.success("摘要生成成功");
+        } else {
+          message.error(data.error || "生成摘要失败");
+        }
+      } catch (err) {
+        console.error("获取摘要状态失败:", err);
+        pollSummary(summaryId);
+      }
+    }, SUMMARY_POLL_INTERVAL);
+  };
+
   const loadSummaries = async () => {
     try {
       const { data } = await axios.get(`/api/summaries/${transcriptId}`, {
@@ -32,6 +82,7 @@ const VideoSummary = ({ transcriptId, transcriptText }) => {
         },
       });
       setSummaries(data);
+      data.filter(isSummaryRunning).forEach((s) => pollSummary(s.id));
     } catch (err) {
       console.error("加载摘要失败:", err);
     }
@@ -45,10 +96,12 @@ const VideoSummary = ({ transcriptId, transcriptText }) => {
 
     // 检查是否已存在相同类型的摘要
     const existingSummary = summaries.find(
-      (s) => s.summary_type === summaryType
+      (s) => s.summary_type === summaryType && s.status !== "error"
     );
     if (existingSummary) {
-      message.info("该类型的摘要已存在");
+      message.info(
+        isSummaryRunning(existingSummary) ? "该类型的摘要正在生成" : "该类型的摘要已存在"
+      );
       return;
     }
 
@@ -68,8 +121,12 @@ const VideoSummary = ({ transcriptId, transcriptText }) => {
         }
       );
 
-      setSummaries([...summaries, data]);
-      message.success("摘要生成成功");
+      // 摘要在后台生成，接口立即返回排队中的记录
+      updateSummary(data);
+      if (isSummaryRunning(data)) {
+        message.info("摘要已开始生成");
+        pollSummary(data.id);
+      }
     } catch (err) {
       console.error("生成摘要失败:", err);
       message.error(err.response?.data?.detail || "生成摘要失败");
@@ -105,7 +162,13 @@ const VideoSummary = ({ transcriptId, transcriptText }) => {
         {summaries.map((summary, index) => (
           <div key={summary.id || index} className={styles.summaryItem}>
             <h4>{summary.title || `${summary.summary_type} 摘要`}</h4>
-            <div className={styles.summaryContent}>{summary.summary}</div>
+            <div className={styles.summaryContent}>
+              {summary.status === "error"
+                ? `生成失败：${summary.error || "未知错误"}`
+                : isSummaryRunning(summary)
+                ? "摘要生成中..."
+                : summary.summary}
+            </div>
             {summary.key_points && summary.key_points.length > 0 && (
               <div className={styles.keyPoints}>
                 <h5>关键点：</h5>
@@ -49,6 +49,10 @@ const VideoPlayer = () => {
   const [transcriptionStartTime, setTranscriptionStartTime] = useState(null);
   const [elapsedTime, setElapsedTime] = useState(0);
   const elapsedTimeRef = useRef(null);
+  // 增量轮询的游标：已收到的片段数、片段版本和上次响应的 ETag
+  const pollCursorRef = useRef({ segmentCount: 0, revision: 0, etag: null });
+  // 事件流连接正常时由服务端推送进度，不再定时轮询
+  const eventStreamOpenRef = useRef(false);
   const [currentSubtitle, setCurrentSubtitle] = useState("");
   const [showSubtitle, setShowSubtitle] = useState(false);
   const [transcriptLanguage, setTranscriptLanguage] = useState("zh");
@@ -234,6 +238,7 @@ const VideoPlayer = () => {
         language: transcriptLanguage,
         force: true,
         model: selectedModel,
+        priority: "interactive", // 播放页发起的转录优先于批量导入
       });
 
       if (response.data.taskId) {
@@ -245,6 +250,7 @@ const VideoPlayer = () => {
           error: null,
           progress: 0,
         });
+        pollCursorRef.current = { segmentCount: 0, revision: 0, etag: null };
         pollTranscriptionStatus(response.data.taskId);
       }
     } catch (error) {
@@ -262,37 +268,106 @@ const VideoPlayer = () => {
     }
   };
 
+  // 合并服务端返回的状态：sinceSegment 大于 0 时追加新片段，全文由片段拼接
+  const applyTranscriptUpdate = (data) => {
+    setTranscriptStatus((prev) => {
+      let segments = prev.segments || [];
+      if (data.segments) {
+        segments =
+          data.sinceSegment > 0
+            ? [...segments.slice(0, data.sinceSegment), ...data.segments]
+            : data.segments;
+      }
+      return {
+        ...prev,
+        taskId: data.taskId,
+        status: data.status,
+        text: segments.length
+          ? segments.map((segment) => segment.text).join("\n")
+          : null,
+        segments,
+        error: data.error,
+        progress: data.progress || 0,
+      };
+    });
+  };
+
+  const handleTranscriptFinished = (data) => {
+    if (data.status === "success") {
+      message.success("转录完成！");
+      // 清除计时器
+      if (elapsedTimeRef.current) {
+        clearInterval(elapsedTimeRef.current);
+      }
+    } else if (data.status === "error") {
+      message.error("转录失败：" + data.error);
+    } else if (data.status === "cancelled" && elapsedTimeRef.current) {
+      clearInterval(elapsedTimeRef.current);
+    }
+  };
+
+  // 取消排队中或正在进行的转录
+  const cancelTranscription = async () => {
+    try {
+      const response = await request.post(
+        `/api/videos/transcript/${transcriptStatus.taskId}/cancel`
+      );
+      setTranscriptStatus((prev) => ({ ...prev, status: response.data.status }));
+      if (elapsedTimeRef.current) {
+        clearInterval(elapsedTimeRef.current);
+      }
+      message.info("已取消转录");
+    } catch (error) {
+      message.error(
+        "取消转录失败：" + (error.response?.data?.detail || "未知错误")
+      );
+    }
+  };
+
+  const scheduleNextPoll = (taskId) => {
+    if (eventStreamOpenRef.current) {
+      return;
+    }
+    // 使用 setTimeout 而不是立即调用，避免请求过于频繁
+    setTimeout(() => pollTranscriptionStatus(taskId), POLLING_INTERVAL);
+  };
+
   // 轮询转录任务状态
   const pollTranscriptionStatus = async (taskId) => {
     try {
+      // 只请求新增片段，状态未变化时服务端返回 304
+      const cursor = pollCursorRef.current;
       const response = await request.get(`/api/videos/transcript/${taskId}`, {
         timeout: 10000,
+        params: {
+          since_segment: cursor.segmentCount,
+          revision: cursor.revision,
+        },
+        headers: cursor.etag ? { "If-None-Match": cursor.etag } : {},
+        validateStatus: (status) =>
+          (status >= 200 && status < 300) || status === 304,
       });
 
+      if (response.status === 304) {
+        setPollingCount((prev) => prev + 1);
+        scheduleNextPoll(taskId);
+        return;
+      }
+
       const data = response.data;
-      console.log("转录状态数据:", data);
+      pollCursorRef.current = {
+        segmentCount: data.segmentCount,
+        revision: data.revision,
+        etag: response.headers.etag || null,
+      };
 
-      // 更新转录状态
-      setTranscriptStatus((prev) => {
-        const newState = {
-          ...prev,
-          taskId: data.taskId,
-          status: data.status,
-          text: data.text,
-          segments: data.segments,
-          error: data.error,
-          progress: data.progress || 0,
-        };
-        console.log("更新后的转录状态:", newState);
-        return newState;
-      });
+      applyTranscriptUpdate(data);
 
-      // 根据状态处理
-      if (data.status === "processing") {
+      // 根据状态处理，排队中的任务同样继续轮询
+      if (data.status === "processing" || data.status === "pending") {
         if (pollingCount < MAX_POLLING_ATTEMPTS) {
           setPollingCount((prev) => prev + 1);
-          // 使用 setTimeout 而不是立即调用，避免请求过于频繁
-          setTimeout(() => pollTranscriptionStatus(taskId), POLLING_INTERVAL);
+          scheduleNextPoll(taskId);
         } else {
           message.error("转录任务超时，请稍后重试");
           setTranscriptStatus((prev) => ({
@@ -301,14 +376,8 @@ const VideoPlayer = () => {
             error: "任务超时",
           }));
         }
-      } else if (data.status === "success") {
-        message.success("转录完成！");
-        // 清除计时器
-        if (elapsedTimeRef.current) {
-          clearInterval(elapsedTimeRef.current);
-        }
-      } else if (data.status === "error") {
-        message.error("转录失败：" + data.error);
+      } else {
+        handleTranscriptFinished(data);
       }
     } catch (error) {
       console.error("轮询错误详情:", error);
@@ -318,7 +387,7 @@ const VideoPlayer = () => {
       ) {
         console.log("Polling timeout, retrying...");
         setPollingCount((prev) => prev + 1);
-        setTimeout(() => pollTranscriptionStatus(taskId), POLLING_INTERVAL);
+        scheduleNextPoll(taskId);
       } else {
         message.error("获取转录状态失败");
         setTranscriptStatus((prev) => ({
@@ -421,6 +490,18 @@ const VideoPlayer = () => {
           {transcriptStatus.status === "success" ? "重新转录" : "开始转录"}
         </Button>
 
+        {/* 取消按钮 */}
+        {["processing", "pending"].includes(transcriptStatus.status) && (
+          <Button
+            danger
+            onClick={cancelTranscription}
+            className="transcript-cancel-button"
+            block
+          >
+            取消转录
+          </Button>
+        )}
+
         {/* 字幕和视图控制 */}
         <div className="view-controls">
           <Radio.Group
@@ -465,8 +546,9 @@ const VideoPlayer = () => {
             />
           )}
 
-          {transcriptStatus.status === "success" &&
-            transcriptStatus.segments && (
+          {(transcriptStatus.status === "success" ||
+            transcriptStatus.status === "processing") &&
+            transcriptStatus.segments?.length > 0 && (
               <>
                 {transcriptView === "segments" ? (
                   <div className="transcript-content">
@@ -519,6 +601,64 @@ const VideoPlayer = () => {
     [navigate, sourceId, sourcePath]
   );
 
+  // 订阅服务端推送的任务事件，连接断开时退回轮询
+  useEffect(() => {
+    const taskId = transcriptStatus.taskId;
+    const token = localStorage.getItem("token");
+    if (!taskId || !token || !window.EventSource) {
+      return undefined;
+    }
+
+    const source = new EventSource(
+      `${request.defaults.baseURL}/api/videos/events?access_token=${encodeURIComponent(token)}`
+    );
+    source.onopen = () => {
+      eventStreamOpenRef.current = true;
+    };
+    source.onerror = () => {
+      if (eventStreamOpenRef.current) {
+        eventStreamOpenRef.current = false;
+        pollTranscriptionStatus(taskId);
+      }
+    };
+    // 断线或积压时服务端要求重新同步，拉取一次增量
+    source.addEventListener("resync", () => pollTranscriptionStatus(taskId));
+    source.addEventListener("transcription", (event) => {
+      const data = JSON.parse(event.data);
+      if (data.taskId !== taskId) {
+        return;
+      }
+      const cursor = pollCursorRef.current;
+      // 从头推送的片段可以直接替换，其余情况下有缺口或版本变化时重新拉取
+      const fullReplace = data.segments && data.sinceSegment === 0;
+      const missed = fullReplace
+        ? false
+        : data.revision !== cursor.revision ||
+          (data.segments
+            ? data.sinceSegment > cursor.segmentCount
+            : data.segmentCount > cursor.segmentCount);
+      if (data.resync || missed) {
+        pollTranscriptionStatus(taskId);
+        return;
+      }
+
+      applyTranscriptUpdate(data);
+      pollCursorRef.current = {
+        segmentCount: data.segmentCount,
+        revision: data.revision,
+        etag: null,
+      };
+      if (!["processing", "pending"].includes(data.status)) {
+        handleTranscriptFinished(data);
+      }
+    });
+
+    return () => {
+      eventStreamOpenRef.current = false;
+      source.close();
+    };
+  }, [transcriptStatus.taskId]);
+
   // 在组件加载时检查是否有未完成的转录任务
   useEffect(() => {
     const checkTranscriptionStatus = async () => {
@@ -527,7 +667,7 @@ const VideoPlayer = () => {
           const response = await request.get(
             `/api/videos/transcript/${transcriptStatus.taskId}`
           );
-          if (response.data.status === "processing") {
+          if (["processing", "pending"].includes(response.data.status)) {
             pollTranscriptionStatus(transcriptStatus.taskId);
           } else {
             setTranscriptStatus((prev) => ({
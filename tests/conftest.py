@@ -0,0 +1,32 @@
+import os
+
+# 测试使用内存 SQLite，须在导入 app 之前设置
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.base_class import Base  # noqa: E402
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(element, compiler, **kw):
+    # users.settings 使用 Postgres 的 JSONB，在 SQLite 中按 JSON 建表
+    return "JSON"
+
+
+@pytest.fixture
+def db():
+    """每个测试一个独立的内存 SQLite 会话，包含全部模型的表"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
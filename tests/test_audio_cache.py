@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.services import audio_cache
+
+
+@pytest.fixture
+def decodes(tmp_path, monkeypatch):
+    """把解码替换为按文件内容生成的假音频，记录每次解码"""
+    calls = []
+
+    def decode_to_file(video_path, dest):
+        calls.append(video_path)
+        with open(video_path, "rb") as f:
+            np.frombuffer(f.read(), dtype=np.uint8).astype(np.float32).tofile(dest)
+
+    monkeypatch.setattr(audio_cache, "AUDIO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(audio_cache, "_decode_to_file", decode_to_file)
+    return calls
+
+
+def write_video(path, content: bytes, mtime: int):
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_second_load_hits_cache(tmp_path, decodes):
+    video = write_video(tmp_path / "a.mp4", b"\x01\x02\x03", 1_000_000)
+
+    first = audio_cache.load_audio(video)
+    second = audio_cache.load_audio(video)
+
+    assert decodes == [video]
+    assert isinstance(second, np.memmap)
+    assert second.tolist() == first.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_modified_file_is_decoded_again(tmp_path, decodes):
+    video = write_video(tmp_path / "a.mp4", b"\x01\x02\x03", 1_000_000)
+    audio_cache.load_audio(video)
+    old_path = audio_cache.cache_path(video)
+
+    write_video(tmp_path / "a.mp4", b"\x04\x05\x06\x07", 1_000_100)
+
+    assert audio_cache.cache_path(video) != old_path
+    assert audio_cache.load_audio(video).tolist() == [4.0, 5.0, 6.0, 7.0]
+    assert decodes == [video, video]
+
+
+def test_eviction_drops_least_recently_used(tmp_path, decodes, monkeypatch):
+    # 每个缓存文件 4 个 float32 样本共 16 字节，只够放下两个
+    monkeypatch.setattr(audio_cache, "AUDIO_CACHE_MAX_BYTES", 32)
+    videos = [write_video(tmp_path / f"{i}.mp4", bytes([i] * 4), 1_000_000 + i) for i in range(3)]
+    for i, video in enumerate(videos[:2]):
+        audio_cache.load_audio(video)
+        # 显式设置较早的使用时间，避免依赖文件系统时间精度
+        os.utime(audio_cache.cache_path(video), (2_000_000 + i, 2_000_000 + i))
+
+    # 命中缓存会刷新使用时间，第一个文件不再是最久未用的
+    audio_cache.load_audio(videos[0])
+    audio_cache.load_audio(videos[2])
+
+    assert [audio_cache.cache_path(video).exists() for video in videos] == [True, False, True]
+    assert decodes == [videos[0], videos[1], videos[2]]
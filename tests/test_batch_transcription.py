@@ -0,0 +1,17 @@
+from app.services.batch_transcription import WINDOW_SECONDS, speech_windows
+
+
+def test_merges_speech_into_windows():
+    assert speech_windows([(0.0, 5.0), (10.0, 20.0), (25.0, 28.0), (31.0, 40.0)]) == [
+        (0.0, 28.0), (31.0, 40.0)
+    ]
+
+
+def test_long_speech_is_cut_at_window_length():
+    windows = speech_windows([(5.0, 80.0)])
+    assert windows == [(5.0, 35.0), (35.0, 65.0), (65.0, 80.0)]
+    assert all(end - start <= WINDOW_SECONDS for start, end in windows)
+
+
+def test_no_speech():
+    assert speech_windows([]) == []
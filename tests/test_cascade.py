@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models import TranscriptionTask, VideoTranscript
+from app.services import cascade, transcription
+from app.services.audio_cache import SAMPLE_RATE
+from app.services.cascade import is_weak, weak_regions
+
+GOOD = {"avg_logprob": -0.2, "no_speech_prob": 0.1, "compression_ratio": 1.5}
+
+
+def test_is_weak_by_any_metric():
+    assert not is_weak(GOOD)
+    assert not is_weak({"text": "no confidence"})
+    assert is_weak(dict(GOOD, avg_logprob=-1.5))
+    assert is_weak(dict(GOOD, no_speech_prob=0.9))
+    assert is_weak(dict(GOOD, compression_ratio=3.0))
+
+
+def test_adjacent_weak_segments_form_one_region():
+    weak = dict(GOOD, avg_logprob=-2.0)
+    segments = [GOOD, weak, weak, GOOD, weak, GOOD, weak]
+    assert weak_regions(segments) == [(1, 2), (4, 4), (6, 6)]
+    assert weak_regions([GOOD, GOOD]) == []
+
+
+class FakeModel:
+    """精修模型：把送入的音频区域转成一个高置信度片段"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append((len(audio), options))
+        segment = SimpleNamespace(
+            start=0.1, end=len(audio) / SAMPLE_RATE - 0.1, text=" refined ", avg_logprob=-0.1
+        )
+        return iter([segment]), None
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+
+    @contextmanager
+    def acquire(model_name="base", device=None, compute_type=None):
+        yield model
+
+    monkeypatch.setattr(cascade.model_registry, "acquire", acquire)
+    return model
+
+
+def test_refine_video_task_replaces_weak_region(db, monkeypatch, fake_model):
+    weak = {"start": 2.0, "end": 4.0, "text": "mumble", "avg_logprob": -2.0}
+    transcript = VideoTranscript(source_id=1, video_path="a.mp4", language="en", labels=[0, 0, 0])
+    transcript.segments = [
+        dict(GOOD, start=0.0, end=2.0, text="first"),
+        weak,
+        dict(GOOD, start=4.0, end=6.0, text="last"),
+    ]
+    db.add(transcript)
+    db.commit()
+    task = TranscriptionTask(
+        source_id=1, video_path="a.mp4", mode="refine", cascade_model="large-v3",
+        status="processing", transcript_id=transcript.id
+    )
+    db.add(task)
+    db.commit()
+    monkeypatch.setattr(transcription, "load_audio", lambda path: np.zeros(6 * SAMPLE_RATE, dtype=np.float32))
+
+    transcription.refine_video_task(task.id, "a.mp4", db)
+
+    db.refresh(task)
+    db.refresh(transcript)
+    assert task.status == "success"
+    assert task.progress == 100
+    assert task.segments_revision == 1
+    assert [segment["text"] for segment in transcript.segments] == ["first", "refined", "last"]
+    assert transcript.text == "first\nrefined\nlast"
+    assert task.segment_count == 3
+    # 区域向两侧扩展，但不越过相邻片段
+    assert fake_model.calls[0][0] == 2 * SAMPLE_RATE
+    assert fake_model.calls[0][1]["initial_prompt"] == "first"
+
+
+def test_refine_without_weak_segments_keeps_transcript(db, monkeypatch, fake_model):
+    transcript = VideoTranscript(source_id=1, video_path="a.mp4", language="en")
+    transcript.segments = [dict(GOOD, start=0.0, end=2.0, text="fine")]
+    db.add(transcript)
+    db.commit()
+    task = TranscriptionTask(
+        video_path="a.mp4", mode="refine", cascade_model="large-v3",
+        status="processing", transcript_id=transcript.id
+    )
+    db.add(task)
+    db.commit()
+    monkeypatch.setattr(transcription, "load_audio", lambda path: np.zeros(2 * SAMPLE_RATE, dtype=np.float32))
+
+    transcription.refine_video_task(task.id, "a.mp4", db)
+
+    assert task.status == "success"
+    assert task.segments_revision in (None, 0)
+    assert fake_model.calls == []
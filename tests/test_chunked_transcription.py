@@ -0,0 +1,27 @@
+import numpy as np
+
+from app.services import chunked_transcription as chunked
+from app.services.audio_cache import SAMPLE_RATE
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_short_audio_is_one_chunk():
+    assert chunked.split_at_silences(silence(10), 30, intervals=[]) == [(0, 10 * SAMPLE_RATE)]
+
+
+def test_cuts_in_the_middle_of_silences():
+    intervals = [(0.0, 12.0), (14.0, 25.0), (27.0, 40.0), (42.0, 58.0)]
+    chunks = chunked.split_at_silences(silence(60), 20, intervals=intervals)
+    assert chunks == [(0, 26 * SAMPLE_RATE), (26 * SAMPLE_RATE, 60 * SAMPLE_RATE)]
+
+
+def test_chunks_cover_audio_from_start():
+    intervals = [(float(i), i + 8.0) for i in range(0, 100, 10)]
+    start = 15 * SAMPLE_RATE
+    chunks = chunked.split_at_silences(silence(100), 20, start=start, intervals=intervals)
+    assert chunks[0][0] == start
+    assert chunks[-1][1] == 100 * SAMPLE_RATE
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
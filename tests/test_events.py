@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import events
+from app.services.events import EventBroker
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = EventBroker()
+    # 不连接数据库，直接把通知交给 _dispatch
+    monkeypatch.setattr(broker, "_run", lambda: None)
+    return broker
+
+
+async def drain(queue):
+    # 让 call_soon_threadsafe 排入的回调先执行
+    await asyncio.sleep(0)
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_events_fan_out_to_every_connection_of_the_user(broker):
+    async def run():
+        first, second, other = broker.subscribe(1), broker.subscribe(1), broker.subscribe(2)
+        broker._dispatch(json.dumps({"userId": 1, "taskId": 7, "progress": 50}))
+        broker._dispatch("not json")
+        return await drain(first), await drain(second), await drain(other)
+
+    first, second, other = asyncio.run(run())
+
+    assert first == second == [{"taskId": 7, "progress": 50}]
+    assert other == []
+
+
+def test_unsubscribed_queue_receives_nothing(broker):
+    async def run():
+        kept, dropped = broker.subscribe(1), broker.subscribe(1)
+        broker.unsubscribe(1, dropped)
+        broker._dispatch(json.dumps({"userId": 1, "taskId": 7}))
+        result = await drain(kept), await drain(dropped)
+        broker.unsubscribe(1, kept)
+        return result
+
+    kept, dropped = asyncio.run(run())
+
+    assert kept == [{"taskId": 7}]
+    assert dropped == []
+    assert 1 not in broker._subscribers
+
+
+def test_slow_subscriber_is_told_to_resync(broker, monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_QUEUE_SIZE", 2)
+
+    async def run():
+        queue = broker.subscribe(1)
+        for progress in range(3):
+            broker._dispatch(json.dumps({"userId": 1, "progress": progress}))
+        return await drain(queue)
+
+    assert asyncio.run(run()) == [{"resync": True}]
+
+
+def test_publish_is_skipped_outside_postgres(db):
+    # SQLite 没有 NOTIFY，发布不应报错也不应执行任何语句
+    events.publish(db, 1, {"taskId": 1})
+    events.publish(db, None, {"taskId": 1})
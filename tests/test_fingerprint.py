@@ -0,0 +1,35 @@
+from app.services import fingerprint
+from app.services.fingerprint import content_fingerprint
+
+
+def test_same_content_same_fingerprint(tmp_path):
+    a, b = tmp_path / "a.mp4", tmp_path / "sub.mp4"
+    a.write_bytes(b"video" * 1000)
+    b.write_bytes(b"video" * 1000)
+    assert content_fingerprint(str(a)) == content_fingerprint(str(b))
+    assert content_fingerprint(str(a)).startswith(f"{5000:x}-")
+
+
+def test_different_content_or_size(tmp_path):
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    a.write_bytes(b"x" * 100)
+    b.write_bytes(b"y" * 100)
+    c.write_bytes(b"x" * 101)
+    assert len({content_fingerprint(str(path)) for path in (a, b, c)}) == 3
+
+
+def test_large_file_is_sampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "BLOCK_SIZE", 4)
+    monkeypatch.setattr(fingerprint, "SAMPLE_BLOCKS", 3)
+    data = bytearray(b"a" * 40)
+    path = tmp_path / "big"
+    path.write_bytes(bytes(data))
+    before = content_fingerprint(str(path))
+
+    # 采样块之外的字节不影响指纹，采样块内的字节会改变指纹
+    data[10] = ord("b")
+    path.write_bytes(bytes(data))
+    assert content_fingerprint(str(path)) == before
+    data[0] = ord("b")
+    path.write_bytes(bytes(data))
+    assert content_fingerprint(str(path)) != before
@@ -0,0 +1,90 @@
+import pytest
+
+from app.models import TranscriptionTask, User
+from app.services import job_queue
+
+WORKER = "worker-1"
+
+
+def add_user(db, name="alice", weight=1.0):
+    user = User(username=name, email=f"{name}@example.com", queue_weight=weight)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_task(db, user, path="a.mp4", **kwargs):
+    return job_queue.enqueue(db, TranscriptionTask(user_id=user.id, video_path=path, **kwargs))
+
+
+def test_failed_task_is_requeued_until_max_attempts(db):
+    task = add_task(db, add_user(db))
+
+    for attempt in range(1, job_queue.MAX_ATTEMPTS + 1):
+        leased = job_queue.lease_next(db, WORKER)
+        assert leased.id == task.id
+        assert leased.attempts == attempt
+        job_queue.fail(db, task.id, WORKER, "boom")
+        db.refresh(task)
+        assert task.status == ("pending" if attempt < job_queue.MAX_ATTEMPTS else "error")
+        assert task.worker_id is None
+
+    assert job_queue.lease_next(db, WORKER) is None
+
+
+def test_retry_keeps_checkpoint(db):
+    task = add_task(db, add_user(db))
+    leased = job_queue.lease_next(db, WORKER)
+    leased.segments = [{"start": 0.0, "end": 2.5, "text": "hello"}]
+    leased.checkpoint_time = 2.5
+    db.commit()
+
+    job_queue.fail(db, task.id, WORKER, "boom")
+    db.refresh(task)
+    assert task.status == "pending"
+    assert task.checkpoint_time == 2.5
+    assert task.segments[0]["text"] == "hello"
+
+
+def test_task_failing_in_process_is_requeued(db, monkeypatch):
+    from app.services import transcription
+    task = add_task(db, add_user(db))
+    job_queue.lease_next(db, WORKER)
+
+    def broken(video_path):
+        raise RuntimeError("decode failed")
+
+    monkeypatch.setattr(transcription, "load_audio", broken)
+    with pytest.raises(RuntimeError):
+        transcription.transcribe_video_task(task.id, "missing.mp4", "en", "base", db)
+
+    # 与 worker 一致：回滚后交给 fail 决定是否重试
+    db.rollback()
+    job_queue.fail(db, task.id, WORKER, "decode failed")
+    db.refresh(task)
+    assert task.status == "pending"
+    assert task.error == "decode failed"
+
+
+def test_cancelled_task_is_not_requeued(db):
+    task = add_task(db, add_user(db))
+    leased = job_queue.lease_next(db, WORKER)
+    job_queue.cancel(db, leased)
+
+    job_queue.fail(db, task.id, WORKER, "stopped")
+    db.refresh(task)
+    assert task.status == "cancelled"
+    assert job_queue.lease_next(db, WORKER) is None
+
+
+def test_lease_more_follows_fair_share(db):
+    heavy, light = add_user(db, "heavy"), add_user(db, "light")
+    for i in range(4):
+        add_task(db, heavy, f"h{i}.mp4", model="base", duration=600)
+    add_task(db, light, "l0.mp4", model="base", duration=600)
+
+    first = job_queue.lease_next(db, WORKER)
+    assert first.user_id == heavy.id
+    # heavy 已有处理中的任务，额外领取时先轮到 light
+    extra = job_queue.lease_more(db, WORKER, "base", 2)
+    assert [task.user_id for task in extra] == [light.id, heavy.id]
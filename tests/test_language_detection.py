@@ -0,0 +1,55 @@
+import numpy as np
+from sqlalchemy import event, insert
+
+from app.models import MediaAnalysis, User
+from app.services import language_detection
+from app.services.audio_cache import SAMPLE_RATE
+
+
+def test_cached_language_skips_detection(db, monkeypatch):
+    calls = []
+
+    def detect_language(audio, intervals=None):
+        calls.append(len(audio))
+        return "de", 0.9
+
+    monkeypatch.setattr(language_detection, "detect_language", detect_language)
+    audio = np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+    assert language_detection.detect_language_cached(db, "h1", audio) == "de"
+    assert language_detection.detect_language_cached(db, "h1", audio) == "de"
+    assert calls == [SAMPLE_RATE]
+    assert db.query(MediaAnalysis).one().language_probability == 0.9
+
+
+def test_conflicting_insert_keeps_callers_changes(db, monkeypatch):
+    monkeypatch.setattr(language_detection, "detect_language", lambda audio, intervals=None: ("de", 0.9))
+
+    inserted = []
+
+    @event.listens_for(db, "before_flush")
+    def concurrent_insert(session, context, instances):
+        # 模拟查询之后、进入保存点之前同一内容的结果已被其他 worker 写入
+        if not inserted and any(isinstance(obj, User) for obj in session.new):
+            inserted.append(True)
+            session.connection().execute(
+                insert(MediaAnalysis.__table__).values(content_hash="h1", language="en")
+            )
+
+    db.add(User(username="alice", email="alice@example.com"))
+    language = language_detection.detect_language_cached(
+        db, "h1", np.zeros(SAMPLE_RATE, dtype=np.float32)
+    )
+
+    assert language == "de"
+    assert db.query(User).count() == 1
+    assert db.query(MediaAnalysis).one().language == "en"
+
+
+def test_speech_sample_uses_given_intervals():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    sample = language_detection.speech_sample(audio, seconds=3, intervals=[(1.0, 2.0), (5.0, 9.0)])
+
+    assert len(sample) == 3 * SAMPLE_RATE
+    assert sample[0] == SAMPLE_RATE
+    assert sample[SAMPLE_RATE] == 5 * SAMPLE_RATE
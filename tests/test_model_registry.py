@@ -0,0 +1,64 @@
+import threading
+import time
+
+import faster_whisper
+import pytest
+
+from app.services.model_registry import ModelRegistry
+
+
+class FakeWhisperModel:
+    loads = 0
+
+    def __init__(self, model_size_or_path, device, compute_type, **kwargs):
+        # 模拟较慢的加载，让并发请求在加载期间到达
+        time.sleep(0.05)
+        FakeWhisperModel.loads += 1
+        self.name = model_size_or_path
+        self.device = device
+        self.compute_type = compute_type
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    FakeWhisperModel.loads = 0
+    monkeypatch.setattr(faster_whisper, "WhisperModel", FakeWhisperModel)
+    return ModelRegistry(download_root="/tmp/models")
+
+
+def test_same_key_loads_once(registry):
+    first = registry.get("base", "cpu", "int8")
+    assert registry.get("base", "cpu", "int8") is first
+    assert registry.get("base", "cpu", "float32") is not first
+    assert FakeWhisperModel.loads == 2
+    hits = {stat["compute_type"]: stat["hits"] for stat in registry.stats()}
+    assert hits == {"int8": 2, "float32": 1}
+
+
+def test_concurrent_loads_share_one_model(registry):
+    models = []
+    threads = [
+        threading.Thread(target=lambda: models.append(registry.get("small", "cpu", "int8")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeWhisperModel.loads == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_unload_skips_models_in_use(registry):
+    with registry.acquire("base", "cpu", "int8") as model:
+        assert registry.stats()[0]["in_use"] == 1
+        assert not registry.unload("base", "cpu", "int8")
+    assert registry.stats()[0]["in_use"] == 0
+
+    assert registry.unload("base", "cpu", "int8")
+    assert registry.stats() == []
+    assert not registry.unload("base", "cpu", "int8")
+    # 卸载后再次获取会重新加载
+    assert registry.get("base", "cpu", "int8") is not model
+    assert FakeWhisperModel.loads == 2
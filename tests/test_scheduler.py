@@ -0,0 +1,63 @@
+import pytest
+
+from app.models import TranscriptionTask
+from app.services import scheduler
+
+
+@pytest.fixture(autouse=True)
+def fixed_rates(monkeypatch):
+    # 不使用历史实时率的进程内缓存，按 MODEL_RTF 估算
+    monkeypatch.setattr(scheduler, "_rtf_cache", (float("-inf"), {}))
+    monkeypatch.setattr(scheduler, "SLA_SECONDS", 1800.0)
+    monkeypatch.setattr(scheduler, "MIN_WORKERS", 1)
+
+
+def add_backlog(db, seconds):
+    db.add(TranscriptionTask(status="pending", model="base", duration=seconds / scheduler.MODEL_RTF["base"]))
+    db.commit()
+
+
+def schedule(db, model, duration, language="en"):
+    task = TranscriptionTask(model=model, duration=duration, language=language)
+    scheduler.schedule_model(db, task)
+    return task
+
+
+def test_keeps_requested_model_within_sla(db):
+    task = schedule(db, "medium", 600)
+    assert task.model == "medium"
+    assert task.requested_model == "medium"
+
+
+def test_downgrades_to_fastest_model_meeting_sla(db):
+    # medium 需要 1980 秒，turbo 1620 秒
+    assert schedule(db, "medium", 3600).model == "turbo"
+
+
+def test_backlog_counts_towards_turnaround(db):
+    add_backlog(db, 240)
+    # 等待 240 秒后 turbo 超出 SLA，distil-large-v3 刚好满足
+    assert schedule(db, "medium", 3600).model == "distil-large-v3"
+
+
+def test_skips_english_only_models_for_other_languages(db):
+    add_backlog(db, 240)
+    assert schedule(db, "medium", 3600, language="zh").model == "small"
+
+
+def test_uses_speech_duration_when_known(db):
+    task = TranscriptionTask(model="medium", duration=3600, speech_duration=600, language="en")
+    scheduler.schedule_model(db, task)
+    assert task.model == "medium"
+
+
+def test_unknown_model_or_duration_is_not_scheduled(db):
+    assert schedule(db, "custom-model", 3600).schedule_reason == "requested"
+    assert schedule(db, "medium", None).model == "medium"
+
+
+def test_route_model_by_language():
+    assert scheduler.route_model("distil-large-v3", "zh") == "turbo"
+    assert scheduler.route_model("small.en", "fr") == "small"
+    assert scheduler.route_model("distil-large-v3", "en") == "distil-large-v3"
+    assert scheduler.route_model("base", None) == "base"
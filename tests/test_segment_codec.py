@@ -0,0 +1,66 @@
+import pytest
+
+from app.core import segment_codec
+from app.core.segment_codec import (
+    decode_intervals,
+    decode_segments,
+    decode_text,
+    encode_intervals,
+    encode_segments,
+    segment_count
+)
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "text": "你好"},
+    {"start": 1.5, "end": 3.25, "text": "hello world"},
+    {"start": 3.25, "end": 4.0, "text": ""},
+]
+
+
+def test_roundtrip_without_confidence():
+    data = encode_segments(SEGMENTS)
+    assert segment_count(data) == 3
+    assert decode_segments(data) == SEGMENTS
+    assert decode_segments(data, 1) == SEGMENTS[1:]
+    assert decode_segments(data, 3) == []
+
+
+def test_roundtrip_with_partial_confidence():
+    segments = [dict(SEGMENTS[0], avg_logprob=-0.25, no_speech_prob=0.1), SEGMENTS[1]]
+    decoded = decode_segments(encode_segments(segments))
+    assert decoded[0]["avg_logprob"] == -0.25
+    assert decoded[0]["no_speech_prob"] == 0.1
+    assert "compression_ratio" not in decoded[0]
+    assert decoded[1] == SEGMENTS[1]
+
+
+def test_text_is_read_without_decoding_segments():
+    assert decode_text(encode_segments(SEGMENTS)) == "你好\nhello world\n"
+    assert decode_text(None) is None
+
+
+def test_empty():
+    data = encode_segments([])
+    assert segment_count(data) == 0
+    assert decode_segments(data) == []
+    assert segment_count(None) == 0
+    assert decode_segments(b"") == []
+
+
+def test_large_body_is_compressed():
+    pytest.importorskip("zstandard")
+    segments = [{"start": float(i), "end": i + 1.0, "text": "重复的文本" * 10} for i in range(200)]
+    data = encode_segments(segments)
+    assert segment_codec.HEADER.unpack_from(data)[1] & segment_codec.FLAG_ZSTD
+    assert decode_segments(data) == segments
+
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        decode_segments(b"JSON" + bytes(segment_codec.HEADER.size))
+
+
+def test_intervals_roundtrip_in_milliseconds():
+    intervals = [(0.0, 1.2346), (2.5, 10.0)]
+    assert decode_intervals(encode_intervals(intervals)) == [(0.0, 1.235), (2.5, 10.0)]
+    assert decode_intervals(encode_intervals([])) == []
@@ -0,0 +1,68 @@
+import pytest
+
+from app.models import TranscriptionSegmentBatch, TranscriptionTask, User
+from app.services import transcription
+
+
+def segment(i):
+    return {"start": float(i), "end": i + 1.0, "text": f"s{i}"}
+
+
+@pytest.fixture
+def task(db):
+    user = User(username="alice", email="alice@example.com")
+    db.add(user)
+    db.commit()
+    task = TranscriptionTask(user_id=user.id, video_path="a.mp4", status="processing")
+    task.segments = []
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_flush_appends_only_new_segments(db, task):
+    writer = transcription.SegmentWriter(task, db, duration=10, batch_size=2, interval=3600)
+    for i in range(5):
+        writer.add(segment(i))
+    writer.flush()
+
+    assert db.query(TranscriptionSegmentBatch).count() == 3
+    assert task.segment_count == 5
+    assert task.segments == [segment(i) for i in range(5)]
+    assert task.segments_from(3) == [segment(3), segment(4)]
+    assert task.text == "s0\ns1\ns2\ns3\ns4"
+    assert task.checkpoint_time == 5.0
+
+
+def test_resume_continues_after_stored_segments(db, task):
+    writer = transcription.SegmentWriter(task, db, duration=10, batch_size=2, interval=3600)
+    for i in range(2):
+        writer.add(segment(i))
+
+    resumed = transcription.SegmentWriter(task, db, duration=10, segments=task.segments, batch_size=2)
+    for i in range(2, 4):
+        resumed.add(segment(i))
+    assert task.segments == [segment(i) for i in range(4)]
+
+
+def test_replace_rewrites_and_drops_batches(db, task):
+    writer = transcription.SegmentWriter(task, db, duration=10, batch_size=1, interval=3600)
+    for i in range(3):
+        writer.add(segment(i))
+    writer.replace([segment(9)])
+
+    assert db.query(TranscriptionSegmentBatch).count() == 0
+    assert task.segments == [segment(9)]
+    assert task.segments_revision == 1
+
+
+def test_save_transcript_moves_segments_to_transcript(db, task):
+    writer = transcription.SegmentWriter(task, db, duration=10, batch_size=1, interval=3600)
+    for i in range(3):
+        writer.add(segment(i))
+
+    transcript = transcription.save_transcript(task, db)
+    assert db.query(TranscriptionSegmentBatch).count() == 0
+    assert transcript.segments == [segment(i) for i in range(3)]
+    assert transcript.text == "s0\ns1\ns2"
+    assert task.segments == transcript.segments
@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.services import speech_map
+from app.services.audio_cache import SAMPLE_RATE
+
+
+def test_clip_intervals():
+    intervals = [(0.0, 2.0), (3.0, 5.0), (6.0, 8.0)]
+    assert speech_map.clip_intervals(intervals, 1.0, 7.0) == [(1.0, 2.0), (3.0, 5.0), (6.0, 7.0)]
+    assert speech_map.clip_intervals(intervals, 5.0) == [(6.0, 8.0)]
+
+
+def test_timeline_concatenates_speech_and_maps_back():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    timeline = speech_map.SpeechTimeline([(1.0, 2.0), (5.0, 7.0)], len(audio))
+
+    assert timeline.duration == 3.0
+    assert len(timeline.audio(audio)) == 3 * SAMPLE_RATE
+    assert timeline.original_time(0.5) == 1.5
+    assert timeline.original_time(1.5) == 5.5
+    # 落在交界处的结束时间归到前一个区间
+    assert timeline.original_time(1.0, end=True) == 2.0
+    assert timeline.original_time(1.0) == 5.0
+
+
+def test_timeline_clamps_to_audio_length():
+    timeline = speech_map.SpeechTimeline([(1.0, 2.0), (20.0, 30.0)], 5 * SAMPLE_RATE)
+    assert timeline.spans == [(SAMPLE_RATE, 2 * SAMPLE_RATE)]
+
+
+def test_conflicting_insert_keeps_callers_changes(db, monkeypatch):
+    from app.models import MediaAnalysis, User
+
+    def detect_speech(audio):
+        # 模拟 VAD 期间同一内容的结果已被写入
+        with db.begin_nested():
+            db.add(MediaAnalysis(content_hash="h1", language="en"))
+        return [(0.0, 2.0)]
+
+    monkeypatch.setattr(speech_map, "detect_speech", detect_speech)
+    db.add(User(username="alice", email="alice@example.com"))
+    analysis = speech_map.analyze_speech(db, "h1", np.zeros(3 * SAMPLE_RATE, dtype=np.float32))
+
+    assert analysis.speech_seconds == 2.0
+    assert db.query(User).count() == 1
+    assert db.query(MediaAnalysis).count() == 1
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from app.services import summary as summary_module
+from app.services.summary import SummaryService
+from app.services.summary_batcher import SummaryBatcher
+
+
+class CharTokenizer:
+    """每个字符算一个 token"""
+
+    def __call__(self, texts, add_special_tokens=False):
+        return {"input_ids": [list(text) for text in texts]}
+
+
+@pytest.fixture
+def service():
+    service = SummaryService()
+    # 跳过模型加载，生成结果为输入的前 max_length 个字符
+    service._tokenizer = CharTokenizer()
+    service._model = object()
+    service.calls = []
+
+    def generate(texts, max_length):
+        service.calls.append(len(texts))
+        return [text[:max_length] for text in texts]
+
+    service.batcher = SummaryBatcher(generate)
+    return service
+
+
+def test_reduces_until_one_chunk(service):
+    text = "abcdefghi. " * 300
+
+    result = service.summarize(text, max_length=100)
+
+    assert result == text[:100]
+    # 每轮的分段数递减，最后一轮只有一段
+    assert service.calls[0] > service.calls[1] > service.calls[-1] == 1
+
+
+def test_segments_define_first_round_chunks(service):
+    # 每个片段 300 个 token，两个放不进同一分段
+    segments = [{"text": f"第{i}段。" * 75} for i in range(4)]
+
+    service.summarize("", max_length=50, segments=segments)
+
+    assert service.calls[0] == 4
+
+
+def test_stops_after_max_reduce_rounds(service, monkeypatch, caplog):
+    monkeypatch.setattr(summary_module, "MAX_REDUCE_ROUNDS", 1)
+    text = "abcdefghi. " * 300
+
+    with caplog.at_level(logging.WARNING, logger="app.services.summary"):
+        result = service.summarize(text, max_length=100)
+
+    # 达到上限后把剩余分段合并成一个输入再生成一次，不返回拼接的部分摘要
+    assert service.calls[-1] == 1
+    assert len(service.calls) == 2
+    assert len(result) == 100
+    assert "after 1 reduce rounds" in caplog.text
@@ -0,0 +1,51 @@
+import threading
+
+from app.services.summary_batcher import SummaryBatcher
+
+
+def test_results_match_inputs():
+    batcher = SummaryBatcher(lambda texts, max_length: [text.upper() for text in texts])
+    assert batcher.generate(["a", "b", "c"], 50) == ["A", "B", "C"]
+
+
+def test_batches_respect_max_batch():
+    sizes = []
+
+    def generate(texts, max_length):
+        sizes.append(len(texts))
+        return texts
+
+    batcher = SummaryBatcher(generate, max_batch=4, max_wait_ms=50)
+    texts = [str(i) for i in range(10)]
+    assert batcher.generate(texts, 50) == texts
+    assert max(sizes) <= 4
+    assert sum(sizes) == 10
+
+
+def test_concurrent_requests_are_merged_by_max_length():
+    calls = []
+    release = threading.Event()
+
+    def generate(texts, max_length):
+        release.wait(1)
+        calls.append((max_length, list(texts)))
+        return [f"{text}:{max_length}" for text in texts]
+
+    batcher = SummaryBatcher(generate, max_batch=8, max_wait_ms=50)
+    first = batcher.submit(["a", "b"], 50)
+    second = batcher.submit(["c"], 80)
+    third = batcher.submit(["d"], 50)
+    release.set()
+
+    assert [future.result(1) for future in first + third] == ["a:50", "b:50", "d:50"]
+    assert second[0].result(1) == "c:80"
+    assert sorted(len(texts) for _, texts in calls) == [1, 3]
+
+
+def test_failure_is_raised_to_every_caller():
+    def generate(texts, max_length):
+        raise RuntimeError("out of memory")
+
+    futures = SummaryBatcher(generate).submit(["a", "b"], 50)
+    for future in futures:
+        assert isinstance(future.exception(1), RuntimeError)
@@ -0,0 +1,38 @@
+from app.models import SummaryCacheEntry, User
+from app.services.summary_cache import SummaryCache, cache_key
+
+RESULT = {"summary": "short", "key_points": ["a"], "topics": [], "sentiment": None}
+
+
+def test_cache_key_depends_on_parameters():
+    base = cache_key("text", "m", None, 150, {"num_beams": 4})
+    assert base == cache_key("text", "m", None, 150, {"num_beams": 4})
+    assert base != cache_key("text", "m", None, 100, {"num_beams": 4})
+    assert base != cache_key("other", "m", None, 150, {"num_beams": 4})
+
+
+def test_lru_evicts_oldest():
+    cache = SummaryCache(maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, RESULT)
+    assert cache.get("a") is None
+    assert cache.get("c")["summary"] == "short"
+
+
+def test_database_entry_is_shared_between_processes(db):
+    SummaryCache().put("k1", RESULT, db, model="m")
+    db.commit()
+    assert SummaryCache().get("k1", db) == RESULT
+
+
+def test_duplicate_put_keeps_callers_changes(db):
+    SummaryCache().put("k1", RESULT, db, model="m")
+    db.commit()
+
+    user = User(username="alice", email="alice@example.com")
+    db.add(user)
+    SummaryCache().put("k1", RESULT, db, model="m")
+    db.commit()
+
+    assert db.query(User).filter(User.username == "alice").count() == 1
+    assert db.query(SummaryCacheEntry).count() == 1
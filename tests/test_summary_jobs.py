@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+from importlib import import_module
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, VideoSummary, VideoTranscript
+from app.models.summary import SummaryType
+from app.services import summary_jobs
+
+# endpoints 包把 summaries 导出为路由对象，这里需要模块本身
+summaries = import_module("app.api.api_v1.endpoints.summaries")
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = FakeExecutor()
+    monkeypatch.setattr(summary_jobs, "_executor", executor)
+    return executor
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="alice", email="alice@example.com")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def transcript(db):
+    transcript = VideoTranscript(video_path="a.mp4", title="a")
+    transcript.segments = [{"start": 0.0, "end": 1.0, "text": "hello"}]
+    db.add(transcript)
+    db.commit()
+    return transcript
+
+
+def add_summary(db, transcript, user, status, updated_at=None):
+    summary = VideoSummary(
+        transcript_id=transcript.id, user_id=user.id,
+        summary_type=SummaryType.GENERAL, status=status, updated_at=updated_at
+    )
+    db.add(summary)
+    db.commit()
+    return summary
+
+
+def test_enqueue_commits_pending_and_submits(db, executor, transcript, user):
+    summary = VideoSummary(transcript_id=transcript.id, user_id=user.id, status="error", error="boom")
+
+    summary_jobs.enqueue(db, summary)
+
+    assert summary.status == "pending"
+    assert summary.error is None
+    assert executor.submitted == [(summary.id,)]
+
+
+def test_only_one_claim_wins(db, transcript, user):
+    summary = add_summary(db, transcript, user, "pending")
+
+    assert summary_jobs._claim(db, summary.id)
+    assert not summary_jobs._claim(db, summary.id)
+    db.refresh(summary)
+    assert summary.status == "processing"
+
+
+def test_resume_submits_pending_and_stale_summaries(db, executor, transcript, user, monkeypatch):
+    monkeypatch.setattr(summary_jobs, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    stale_at = datetime.utcnow() - timedelta(seconds=summary_jobs.SUMMARY_STALE_SECONDS + 60)
+    pending = add_summary(db, transcript, user, "pending")
+    stale = add_summary(db, transcript, user, "processing", updated_at=stale_at)
+    add_summary(db, transcript, user, "processing")
+    add_summary(db, transcript, user, "success")
+
+    assert summary_jobs.resume_pending() == 2
+    assert sorted(executor.submitted) == [(pending.id,), (stale.id,)]
+
+
+def test_run_job_skips_summaries_already_done(db, transcript, user, monkeypatch):
+    runs = []
+
+    def run_video_summary(summary, session):
+        runs.append(summary.id)
+        summary.status = "success"
+        session.commit()
+
+    monkeypatch.setattr(summary_jobs, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr(summary_jobs.summary_service, "run_video_summary", run_video_summary)
+    summary = add_summary(db, transcript, user, "pending")
+
+    summary_jobs.run_job(summary.id)
+    summary_jobs.run_job(summary.id)
+
+    assert runs == [summary.id]
+
+
+def test_create_summary_reuses_existing_summary(db, executor, transcript, user):
+    def create():
+        return asyncio.run(summaries.create_summary(
+            transcript.id, summary_type=SummaryType.GENERAL, db=db, current_user=user
+        ))
+
+    first = create()
+    assert create() is first
+    assert db.query(VideoSummary).count() == 1
+    assert executor.submitted == [(first.id,)]
+
+    # 失败的摘要复用同一条记录重新排队
+    first.status = "error"
+    db.commit()
+    assert create() is first
+    assert first.status == "pending"
+    assert executor.submitted == [(first.id,), (first.id,)]
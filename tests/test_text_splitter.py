@@ -0,0 +1,43 @@
+from app.services.text_splitter import count_tokens, split_segments, split_text
+
+
+class CharTokenizer:
+    """每个字符算一个 token"""
+
+    def __call__(self, texts, add_special_tokens=False):
+        return {"input_ids": [list(text) for text in texts]}
+
+
+tokenizer = CharTokenizer()
+
+
+def test_count_tokens():
+    assert count_tokens(tokenizer, ["abc", ""]) == [3, 0]
+    assert count_tokens(tokenizer, []) == []
+
+
+def test_chunks_fit_budget_and_keep_text():
+    text = "第一句话。第二句话比较长一些！第三句？" * 5
+    chunks = split_text(tokenizer, text, 21)
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_splits_at_sentence_end():
+    chunks = split_text(tokenizer, "aaaa. bbbb. cccc.", 12)
+    assert chunks == ["aaaa. bbbb.", "cccc."]
+
+
+def test_decimal_point_is_not_a_sentence_end():
+    assert split_text(tokenizer, "pi is 3.14 ok", 100) == ["pi is 3.14 ok"]
+
+
+def test_long_sentence_falls_back_to_clauses_then_length():
+    assert split_text(tokenizer, "aaaa，bbbb，cccc", 10) == ["aaaa，", "bbbb，cccc"]
+    chunks = split_text(tokenizer, "x" * 25, 11)
+    assert [len(chunk) for chunk in chunks] == [9, 9, 7]
+
+
+def test_split_segments_packs_whole_segments():
+    segments = [{"text": "abc"}, {"text": "defg"}, {"text": "hi"}]
+    assert split_segments(tokenizer, segments, 10) == ["abc\ndefg", "hi"]
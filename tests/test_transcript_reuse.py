@@ -0,0 +1,45 @@
+from app.models import TranscriptionTask, VideoTranscript
+from app.services import transcription
+
+SEGMENTS = [{"start": 0.0, "end": 1.0, "text": "hello"}]
+
+
+def add_transcript(db, source_id, path, segments, model="base"):
+    transcript = VideoTranscript(
+        source_id=source_id, video_path=path, model=model, language="en", content_hash="h1"
+    )
+    transcript.segments = segments
+    db.add(transcript)
+    db.commit()
+    return transcript
+
+
+def new_task(source_id, path):
+    return TranscriptionTask(
+        source_id=source_id, video_path=path, model="base", content_hash="h1", status="pending"
+    )
+
+
+def test_reuse_updates_existing_record_for_path(db):
+    other = add_transcript(db, 1, "a.mp4", SEGMENTS)
+    stale = add_transcript(db, 2, "b.mp4", [{"start": 0.0, "end": 1.0, "text": "old"}], model="tiny")
+
+    task = transcription.reuse_transcript(db, new_task(2, "b.mp4"), other)
+
+    assert task.status == "success"
+    assert task.transcript_id == stale.id
+    db.refresh(stale)
+    assert stale.segments == SEGMENTS
+    assert stale.text == "hello"
+    assert stale.model == "base"
+    assert db.query(VideoTranscript).count() == 2
+
+
+def test_reuse_creates_record_for_new_path(db):
+    other = add_transcript(db, 1, "a.mp4", SEGMENTS)
+
+    task = transcription.reuse_transcript(db, new_task(2, "b.mp4"), other)
+
+    assert task.transcript_id not in (None, other.id)
+    assert task.transcript.source_id == 2
+    assert task.segments == SEGMENTS
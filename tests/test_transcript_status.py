@@ -0,0 +1,87 @@
+import asyncio
+from importlib import import_module
+
+import pytest
+from fastapi import Response
+
+from app.models import TranscriptionTask, User
+
+# endpoints 包把 videos 导出为路由对象，这里需要模块本身
+videos = import_module("app.api.api_v1.endpoints.videos")
+
+
+def segment(i):
+    return {"start": float(i), "end": i + 1.0, "text": f"s{i}"}
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="alice", email="alice@example.com")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def task(db, user):
+    task = TranscriptionTask(user_id=user.id, video_path="a.mp4", status="processing", progress=40, model="base")
+    task.segments = [segment(i) for i in range(3)]
+    db.add(task)
+    db.commit()
+    return task
+
+
+def get_status(db, user, task, since_segment=None, revision=None, if_none_match=None):
+    response = Response()
+    result = asyncio.run(videos.get_transcript_status(
+        task.id, response, since_segment=since_segment, revision=revision,
+        if_none_match=if_none_match, db=db, current_user=user
+    ))
+    return result, response
+
+
+def test_since_segment_returns_only_new_segments(db, user, task):
+    result, _ = get_status(db, user, task, since_segment=2)
+
+    assert result["segments"] == [segment(2)]
+    assert result["sinceSegment"] == 2
+    assert result["segmentCount"] == 3
+    # 增量请求不返回全文
+    assert result["text"] is None
+
+    result, _ = get_status(db, user, task, since_segment=3)
+    assert result["segments"] == []
+
+    result, _ = get_status(db, user, task)
+    assert result["segments"] == [segment(i) for i in range(3)]
+    assert result["text"] == "s0\ns1\ns2"
+
+
+def test_unchanged_status_returns_304(db, user, task):
+    _, response = get_status(db, user, task, since_segment=3)
+    etag = response.headers["ETag"]
+
+    # 心跳等内部字段变化不影响 ETag
+    task.worker_id = "worker-2"
+    db.commit()
+    result, _ = get_status(db, user, task, since_segment=3, if_none_match=etag)
+    assert result.status_code == 304
+    assert result.headers["ETag"] == etag
+
+    task.append_segments([segment(3)])
+    db.commit()
+    result, response = get_status(db, user, task, since_segment=3, if_none_match=etag)
+    assert response.headers["ETag"] != etag
+    assert result["segments"] == [segment(3)]
+
+
+def test_revision_change_restarts_from_first_segment(db, user, task):
+    task.segments = [dict(segment(i), text=f"r{i}") for i in range(3)]
+    task.segments_revision = 1
+    db.commit()
+
+    result, _ = get_status(db, user, task, since_segment=2, revision=0)
+
+    assert result["sinceSegment"] == 0
+    assert [s["text"] for s in result["segments"]] == ["r0", "r1", "r2"]
+    assert result["revision"] == 1
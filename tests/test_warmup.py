@@ -0,0 +1,61 @@
+import threading
+import time
+
+from app.services import model_registry as registry_module
+from app.services.warmup import Readiness
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_not_ready_until_every_model_is_loaded(monkeypatch):
+    loaded = []
+    release = threading.Event()
+
+    def load(name):
+        if name == "whisper:small":
+            # 第二个模型加载期间仍未就绪
+            release.wait(2)
+        loaded.append(name)
+
+    readiness = Readiness(["summary", "whisper:small"])
+    monkeypatch.setattr(readiness, "_load", load)
+    assert not readiness.ready
+    assert readiness.state() == {"summary": "pending", "whisper:small": "pending"}
+
+    readiness.start()
+    assert wait_until(lambda: readiness.state()["whisper:small"] == "loading")
+    assert readiness.state()["summary"] == "ready"
+    assert not readiness.ready
+
+    release.set()
+    assert wait_until(lambda: readiness.ready)
+    assert loaded == ["summary", "whisper:small"]
+
+
+def test_failed_warmup_stays_not_ready(monkeypatch):
+    readiness = Readiness(["whisper:small", "unknown"])
+    gets = []
+    monkeypatch.setattr(registry_module.model_registry, "get", lambda name: gets.append(name))
+
+    readiness._run()
+
+    assert gets == ["small"]
+    assert readiness.state() == {"whisper:small": "ready", "unknown": "error"}
+    assert not readiness.ready
+
+
+def test_start_runs_only_once(monkeypatch):
+    runs = []
+    readiness = Readiness([])
+    monkeypatch.setattr(readiness, "_run", lambda: runs.append(1))
+
+    readiness.start()
+    readiness.start()
+
+    assert wait_until(lambda: runs == [1])
+    assert readiness.ready